@@ -0,0 +1,269 @@
+"""Monthly partitioning and archival of applications and notifications.
+
+Both tables only ever grow. Two complementary tools keep the live tables
+small; neither is required, and both are driven from the command line
+(run from the backend directory):
+
+    python archival.py partition   # once, offline: convert to monthly partitions (Postgres)
+    python archival.py maintain    # create upcoming monthly partitions
+    python archival.py archive     # move old rows to the *_archive tables
+
+``partition`` rebuilds ``applications`` (by ``date_applied``) and
+``notifications`` (by ``created_at``) as range-partitioned tables with one
+partition per month plus a default partition. The primary key becomes
+(id, date) because Postgres requires the partition key in every unique
+constraint; this also drops the (job_id, user_id) unique constraint from
+db/schema.sql. apply_for_job enforces it instead: it takes a transaction
+advisory lock on (job_id, user_id) before checking the live and archived
+applications, so concurrent applies cannot both pass the check. It locks
+both tables for the duration of the copy, so run it in a maintenance window.
+
+``maintain`` creates the current month's partition and the next
+``PARTITION_MONTHS_AHEAD`` ones. The app also runs it at startup, so rows
+land in the default partition only if nothing has started for months.
+
+``archive`` moves rows older than ``ARCHIVE_AFTER_DAYS`` into
+``applications_archive`` / ``notifications_archive``:
+    - on partitioned tables, whole months past the cutoff are detached (a
+      catalog change; no DELETE, no dead tuples in the live table), copied to
+      the archive and dropped; a month still holding applications to an
+      active job stays attached until those jobs close
+    - applications of closed (inactive) jobs and read notifications older
+      than the cutoff are moved in batches of ``ARCHIVE_BATCH_SIZE``
+
+Archived applications are still returned by the application listings when
+called with ``?include_archived=true``.
+"""
+import argparse
+import logging
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import Table, delete, insert, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import AddConstraint, CreateIndex
+
+import config
+from database import PrimarySessionLocal, engine
+from models import Applications, ApplicationsArchive, Jobs, Notifications, NotificationsArchive
+from revocation import utcnow
+
+logger = logging.getLogger(__name__)
+
+# (live table, archive table, partition key)
+ARCHIVED_TABLES = [
+    (Applications.__table__, ApplicationsArchive.__table__, "date_applied"),
+    (Notifications.__table__, NotificationsArchive.__table__, "created_at"),
+]
+
+
+def month_start(day: datetime) -> datetime:
+    return datetime(day.year, day.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    year, index = divmod(month.month - 1 + months, 12)
+    return datetime(month.year + year, index + 1, 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def is_partitioned(conn, table: str) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"), {"t": table}).scalar() == "p"
+
+
+def create_partition(conn, table: str, month: datetime) -> None:
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    ))
+
+
+def monthly_partitions(conn, table: str) -> list:
+    # (name, month, attached) for every table following the partition naming scheme;
+    # detached ones are left over from an archive run that stopped midway
+    rows = conn.execute(
+        text("SELECT relname, relispartition FROM pg_class WHERE relkind = 'r' AND relname ~ :pattern"),
+        {"pattern": f"^{table}_p[0-9]{{4}}_[0-9]{{2}}$"},
+    ).all()
+    result = []
+    for name, attached in rows:
+        year, month = re.search(r"_p(\d{4})_(\d{2})$", name).groups()
+        result.append((name, datetime(int(year), int(month), 1), attached))
+    return sorted(result, key=lambda row: row[1])
+
+
+def partition_table(conn, table: Table, key: str, months_ahead: int = config.PARTITION_MONTHS_AHEAD) -> bool:
+    # Rebuild table as PARTITION BY RANGE (key), copying its rows; False if already partitioned
+    name = table.name
+    if is_partitioned(conn, name):
+        return False
+    pk = next(iter(table.primary_key.columns)).name
+    legacy = f"{name}_unpartitioned"
+    columns = ", ".join(column.name for column in table.columns)
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence(:t, :c)"), {"t": name, "c": pk}).scalar()
+
+    conn.execute(text(f"LOCK TABLE {name} IN ACCESS EXCLUSIVE MODE"))
+    conn.execute(text(f"ALTER TABLE {name} RENAME TO {legacy}"))
+    conn.execute(text(
+        f"CREATE TABLE {name} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE ({key})"
+    ))
+    conn.execute(text(f"CREATE TABLE {name}_default PARTITION OF {name} DEFAULT"))
+
+    oldest = conn.execute(text(f"SELECT min({key}) FROM {legacy}")).scalar()
+    month = month_start(oldest or utcnow())
+    last = add_months(month_start(utcnow()), months_ahead)
+    while month <= last:
+        create_partition(conn, name, month)
+        month = add_months(month, 1)
+
+    conn.execute(text(f"INSERT INTO {name} ({columns}) SELECT {columns} FROM {legacy}"))
+    if sequence:
+        # Keep the id sequence alive when the old table is dropped
+        conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {name}.{pk}"))
+    conn.execute(text(f"DROP TABLE {legacy}"))
+    # Only now that the old table (and its index names) are gone
+    conn.execute(text(f"ALTER TABLE {name} ADD PRIMARY KEY ({pk}, {key})"))
+    # Indexes and foreign keys on the parent cascade to every partition
+    for index in table.indexes:
+        conn.execute(CreateIndex(index))
+    for foreign_key in table.foreign_key_constraints:
+        conn.execute(AddConstraint(foreign_key))
+    return True
+
+
+def ensure_partitions(conn, table: str, months_ahead: int = config.PARTITION_MONTHS_AHEAD, today=None) -> list[str]:
+    # Create the current and next months_ahead monthly partitions that are missing
+    created = []
+    if not is_partitioned(conn, table):
+        return created
+    current = month_start(today or utcnow())
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        name = partition_name(table, month)
+        if conn.execute(text("SELECT to_regclass(:n)"), {"n": name}).scalar() is not None:
+            continue
+        try:
+            with conn.begin_nested():
+                create_partition(conn, table, month)
+            created.append(name)
+        except Exception:
+            # Fails when the default partition already holds rows for that month
+            logger.exception("Could not create partition %s", name)
+    return created
+
+
+def has_active_job_rows(conn, table: Table, partition: str) -> bool:
+    # Applications to jobs that are still open stay live, whatever their age
+    if "job_id" not in table.c:
+        return False
+    return conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {partition} p JOIN jobs j ON j.job_id = p.job_id WHERE j.is_active)"
+    )).scalar()
+
+
+def detach_old_partitions(bind, table: Table, archive: Table, cutoff: datetime) -> int:
+    # Move whole months that end before cutoff into the archive; returns rows moved
+    moved = 0
+    columns = ", ".join(column.name for column in table.columns)
+    with bind.connect() as conn:
+        if not is_partitioned(conn, table.name):
+            return 0
+        partitions = monthly_partitions(conn, table.name)
+    for name, month, attached in partitions:
+        if add_months(month, 1) > cutoff:
+            continue
+        if attached:
+            # Its own short transaction: DETACH locks the parent until commit
+            with bind.begin() as conn:
+                if has_active_job_rows(conn, table, name):
+                    # Its closed-job rows are still moved row by row (archive_conditions)
+                    continue
+                conn.execute(text(f"ALTER TABLE {table.name} DETACH PARTITION {name}"))
+        with bind.begin() as conn:
+            moved += conn.execute(text(f"INSERT INTO {archive.name} ({columns}) SELECT {columns} FROM {name}")).rowcount
+            conn.execute(text(f"DROP TABLE {name}"))
+    return moved
+
+
+def move_rows(db: Session, table: Table, archive: Table, conditions, batch_size: int = config.ARCHIVE_BATCH_SIZE) -> int:
+    # Copy matching rows to the archive and delete them, one committed batch at a time
+    pk = next(iter(table.primary_key.columns))
+    names = [column.name for column in table.columns]
+    moved = 0
+    while True:
+        ids = [row[0] for row in db.execute(select(pk).where(*conditions).order_by(pk).limit(batch_size))]
+        if not ids:
+            return moved
+        db.execute(insert(archive).from_select(names, select(*table.columns).where(pk.in_(ids))))
+        db.execute(delete(table).where(pk.in_(ids)))
+        db.commit()
+        moved += len(ids)
+
+
+def archive_conditions(table: Table, cutoff: datetime) -> list:
+    if table is Applications.__table__:
+        closed_jobs = select(Jobs.job_id).where(Jobs.is_active.is_(False))
+        return [Applications.date_applied < cutoff, Applications.job_id.in_(closed_jobs)]
+    return [Notifications.is_read.is_(True), Notifications.created_at < cutoff]
+
+
+def partition_all() -> list[str]:
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Partitioning requires PostgreSQL")
+    converted = []
+    with engine.begin() as conn:
+        for table, _, key in ARCHIVED_TABLES:
+            if partition_table(conn, table, key):
+                converted.append(table.name)
+    return converted
+
+
+def maintain_partitions(bind=engine) -> list[str]:
+    # Safe to call from every worker at startup; serialised with an advisory lock
+    if bind.dialect.name != "postgresql":
+        return []
+    created = []
+    with bind.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('hustlehub.partitions'))"))
+        for table, _, _ in ARCHIVED_TABLES:
+            created += ensure_partitions(conn, table.name)
+    return created
+
+
+def archive_all(older_than_days: int = config.ARCHIVE_AFTER_DAYS, batch_size: int = config.ARCHIVE_BATCH_SIZE, now=None) -> dict:
+    cutoff = (now or utcnow()) - timedelta(days=older_than_days)
+    moved = {}
+    for table, archive, _ in ARCHIVED_TABLES:
+        count = detach_old_partitions(engine, table, archive, cutoff)
+        db = PrimarySessionLocal()
+        try:
+            count += move_rows(db, table, archive, archive_conditions(table, cutoff), batch_size)
+        finally:
+            db.close()
+        moved[table.name] = count
+    return moved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Partition and archive applications and notifications")
+    parser.add_argument("command", choices=["partition", "maintain", "archive"])
+    parser.add_argument("--older-than-days", type=int, default=config.ARCHIVE_AFTER_DAYS)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "partition":
+        print(f"Partitioned: {', '.join(partition_all()) or 'nothing (already partitioned)'}")
+    elif args.command == "maintain":
+        print(f"Created partitions: {', '.join(maintain_partitions()) or 'none'}")
+    else:
+        for table, count in archive_all(args.older_than_days).items():
+            print(f"   Archived {count} rows from {table}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""CPU vs. bandwidth trade-off of response compression.
+
+Run from the backend directory:
+    python benchmarks/bench_compression.py [--jobs 50 500 5000]
+
+For a job-feed shaped JSON payload this prints, per coding and level, the
+compressed size, ratio and time to compress, plus the cost of a cache hit in
+CompressedBodyCache (digest + lookup) for cacheable responses.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compression import CompressedBodyCache, brotli, compress
+from fast_json import dumps
+
+
+def make_feed(count):
+    start = datetime(2025, 1, 1)
+    return dumps([
+        {
+            "job_id": i,
+            "employer_id": i % 200,
+            "company_name": f"Company {i % 200}",
+            "title": f"Shift lead {i}",
+            "description": "Help customers, run the register and keep the store tidy. " * 6,
+            "job_type": "part-time",
+            "location": "Austin, TX",
+            "pay_range": "$15-20/hr",
+            "date_posted": start + timedelta(minutes=i),
+            "is_active": True,
+            "has_applied": False,
+            "application_count": 0,
+        }
+        for i in range(count)
+    ])
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, nargs="+", default=[50, 500, 5000])
+    args = parser.parse_args()
+
+    settings = [("gzip", level) for level in (1, 6, 9)]
+    if brotli is not None:
+        settings += [("br", quality) for quality in (1, 4, 11)]
+
+    print(f"{'jobs':>6} {'raw KB':>8} {'coding':>6} {'level':>5} {'out KB':>8} {'ratio':>6} {'ms':>8} {'MB/s':>7}")
+    for count in args.jobs:
+        body = make_feed(count)
+        for encoding, level in settings:
+            kwargs = {"gzip_level": level} if encoding == "gzip" else {"brotli_quality": level}
+            seconds, out = timed(lambda: compress(body, encoding, **kwargs))
+            print(
+                f"{count:>6} {len(body) / 1024:>8.1f} {encoding:>6} {level:>5} {len(out) / 1024:>8.1f}"
+                f" {len(body) / len(out):>6.1f} {seconds * 1000:>8.2f} {len(body) / seconds / 1e6:>7.1f}"
+            )
+        cache = CompressedBodyCache()
+        cache.get_or_compress(body, "gzip", 6, lambda data: compress(data, "gzip"))
+        seconds, _ = timed(lambda: cache.get_or_compress(body, "gzip", 6, lambda data: compress(data, "gzip")))
+        print(f"{count:>6} {'':>8} {'cache':>6} {'hit':>5} {'':>8} {'':>6} {seconds * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
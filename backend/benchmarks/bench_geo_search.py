@@ -0,0 +1,84 @@
+"""Latency of /jobs?near= radius candidate queries on the geohash index.
+
+Run from the backend directory:
+    python benchmarks/bench_geo_search.py [--jobs 1000000] [--radius 25]
+
+Fills a scratch SQLite database with postings clustered around the
+gazetteer's cities (plus a uniform background over the continental US), then
+times the index-backed candidate query plus the exact haversine check for a
+handful of centres. Past the index lookup the time is proportional to the
+number of matches returned.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geo import covering_cells, encode_geohash, geocode, haversine_miles, load_gazetteer
+
+METROS = ["New York, NY", "Los Angeles, CA", "Chicago, IL", "Houston, TX", "Seattle, WA"]
+
+
+def build(path, count):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE jobs (job_id INTEGER PRIMARY KEY, latitude REAL, longitude REAL, geohash TEXT, is_active BOOLEAN)")
+    rng = random.Random(42)
+    centres = sorted(set(load_gazetteer().values()), key=lambda place: place.name)
+    rows = []
+    for job_id in range(count):
+        if rng.random() < 0.7:
+            centre = rng.choice(centres)
+            lat, lon = centre.latitude + rng.gauss(0, 0.5), centre.longitude + rng.gauss(0, 0.5)
+        else:
+            lat, lon = rng.uniform(25, 49), rng.uniform(-124, -67)
+        rows.append((job_id, lat, lon, encode_geohash(lat, lon), rng.random() < 0.8))
+    conn.executemany("INSERT INTO jobs VALUES (?, ?, ?, ?, ?)", rows)
+    conn.execute("CREATE INDEX idx_jobs_active_geohash ON jobs (geohash) WHERE is_active = 1")
+    conn.commit()
+    return conn
+
+
+def search(conn, centre, radius):
+    cells = covering_cells(centre.latitude, centre.longitude, radius)
+    # Same shape as geo.within_radius on SQLite: the partial-index condition in every range
+    clauses = " OR ".join("(is_active = 1 AND geohash >= ? AND geohash < ?)" for _ in cells)
+    params = []
+    for cell in cells:
+        params += [cell, cell[:-1] + chr(ord(cell[-1]) + 1)]
+    rows = conn.execute(
+        f"SELECT job_id, latitude, longitude FROM jobs WHERE {clauses}", params
+    ).fetchall()
+    return [row for row in rows if haversine_miles(centre.latitude, centre.longitude, row[1], row[2]) <= radius], len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--radius", type=float, default=25)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        conn = build(os.path.join(directory, "geo.db"), args.jobs)
+        print(f"Built {args.jobs:,} postings in {time.perf_counter() - started:.1f}s")
+        for name in METROS + ["Boise, ID"]:
+            centre = geocode(name)
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                matches, candidates = search(conn, centre, args.radius)
+                timings.append((time.perf_counter() - started) * 1000)
+            print(f"{name:<16} {len(matches):>7,} within {args.radius:g} mi "
+                  f"({candidates:,} candidates)  median {statistics.median(timings):.2f} ms")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Compare the Pydantic list path with the fast JSON path for job listings.
+
+Run from the backend directory:
+    python benchmarks/bench_list_serialization.py [--rows 1000 10000 100000]
+
+The "pydantic" path mirrors what the list endpoints used to do: build one
+JobCard per row, then let FastAPI validate the list against response_model,
+dump it to JSON-compatible Python and encode it with the stdlib json module.
+The "fast" path builds dicts from projected tuples and renders them with
+FastJSONResponse.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from pydantic import TypeAdapter
+
+import schemas_job
+from fast_json import FastJSONResponse
+from routers.jobs import job_card_dict
+
+
+def make_rows(count):
+    # Synthetic rows shaped like job_card_query results
+    start = datetime(2025, 1, 1)
+    return [
+        (
+            i,
+            i % 500,
+            f"Company {i % 500}",
+            f"Job title {i}",
+            "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 8,
+            "part-time",
+            "Austin, TX",
+            "$15-20/hr",
+            start + timedelta(minutes=i),
+            True,
+        )
+        for i in range(count)
+    ]
+
+
+def pydantic_path(rows, adapter):
+    cards = [
+        schemas_job.JobCard(
+            job_id=row[0],
+            employer_id=row[1],
+            company_name=row[2],
+            title=row[3],
+            description=row[4],
+            job_type=row[5],
+            location=row[6],
+            pay_range=row[7],
+            date_posted=row[8],
+            is_active=row[9],
+        )
+        for row in rows
+    ]
+    validated = adapter.validate_python(cards, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(rows):
+    return FastJSONResponse([job_card_dict(row) for row in rows]).body
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(List[schemas_job.JobCard])
+    print(f"{'rows':>8} {'pydantic ms':>12} {'fast ms':>10} {'speedup':>8}")
+    for count in args.rows:
+        rows = make_rows(count)
+        repeat = max(1, args.repeat if count <= 10_000 else args.repeat // 2)
+        slow = best_of(lambda: pydantic_path(rows, adapter), repeat)
+        fast = best_of(lambda: fast_path(rows), repeat)
+        print(f"{count:>8} {slow * 1000:>12.1f} {fast * 1000:>10.1f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
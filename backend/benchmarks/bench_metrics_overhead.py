@@ -0,0 +1,96 @@
+"""Per-request overhead of the metrics middleware and the SQL cursor hooks.
+
+Run from the backend directory:
+    python benchmarks/bench_metrics_overhead.py [--requests 20000]
+
+Requests are driven straight through the ASGI interface (no HTTP server or
+test client) so the numbers isolate the middleware. The SQL part runs the
+same query against in-memory SQLite with and without per-request stats.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from database import QueryStats, request_query_stats
+from metrics import MetricsMiddleware
+
+
+def build_app():
+    app = FastAPI()
+
+    @app.get("/jobs/{job_id}")
+    async def job(job_id: int):
+        return {"job_id": job_id}
+
+    return app
+
+
+async def drive(app, count):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for i in range(count):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": f"/jobs/{i}",
+            "raw_path": f"/jobs/{i}".encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [],
+            "client": ("127.0.0.1", 1234),
+            "server": ("testserver", 80),
+        }
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / count
+
+
+def sql_overhead(count):
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        started = time.perf_counter()
+        for _ in range(count):
+            conn.execute(text("SELECT 1"))
+        bare = (time.perf_counter() - started) / count
+
+        token = request_query_stats.set(QueryStats())
+        started = time.perf_counter()
+        for _ in range(count):
+            conn.execute(text("SELECT 1"))
+        counted = (time.perf_counter() - started) / count
+        request_query_stats.reset(token)
+    return bare, counted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    app = build_app()
+    plain = asyncio.run(drive(app, args.requests))
+    instrumented = asyncio.run(drive(MetricsMiddleware(app), args.requests))
+    print(f"request without metrics: {plain * 1e6:8.1f} us")
+    print(f"request with metrics:    {instrumented * 1e6:8.1f} us  (+{(instrumented - plain) * 1e6:.1f} us)")
+
+    bare, counted = sql_overhead(args.requests)
+    print(f"SELECT 1 outside request:{bare * 1e6:8.1f} us")
+    print(f"SELECT 1 inside request: {counted * 1e6:8.1f} us  (+{(counted - bare) * 1e6:.1f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Latency of /jobs/recommended scoring on the memory-mapped TF-IDF index.
+
+Run from the backend directory:
+    python benchmarks/bench_recommender.py [--jobs 100000] [--applied 5]
+
+Writes a generation of synthetic postings (titles and descriptions drawn from
+per-category vocabularies, as in a real board) to a scratch directory, loads
+it the way a worker does, then times building a profile from a few applied
+jobs and scoring it against the whole catalog. The database query for the
+top candidates' cards is not included.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recommender import RecommenderIndex
+
+CATEGORIES = {
+    "food": "barista cashier cook server kitchen restaurant cafe espresso dishwasher host prep line",
+    "retail": "retail stocker merchandise inventory sales associate store register customer floor",
+    "delivery": "driver delivery courier route package van warehouse loading logistics dispatch",
+    "care": "caregiver nanny babysitter elderly companion pet sitter dog walker tutoring",
+    "office": "receptionist assistant data entry scheduling admin clerk filing phones calendar",
+    "events": "event staff usher security concert venue setup ticketing promoter bartender",
+}
+FILLER = "flexible hours weekends evenings team friendly fast paced training provided immediate start".split()
+TYPES = ["part-time", "full-time", "gig", "contract"]
+CITIES = ["Boston, MA", "Austin, TX", "Denver, CO", "Seattle, WA", "Miami, FL", "Chicago, IL"]
+
+
+def synthetic_jobs(count, rng):
+    texts = []
+    for _ in range(count):
+        words = CATEGORIES[rng.choice(list(CATEGORIES))].split()
+        title = " ".join(rng.sample(words, 2))
+        description = " ".join(rng.choices(words, k=12) + rng.sample(FILLER, 5))
+        texts.append((title, description, rng.choice(TYPES), rng.choice(CITIES)))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--applied", type=int, default=5)
+    parser.add_argument("--users", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    texts = synthetic_jobs(args.jobs, rng)
+    with tempfile.TemporaryDirectory() as directory:
+        index = RecommenderIndex(directory=directory)
+        started = time.perf_counter()
+        index.load(index.write_generation(list(range(1, args.jobs + 1)), texts))
+        print(f"Built and loaded {args.jobs} jobs in {time.perf_counter() - started:.1f}s")
+        for job_id, text in enumerate(synthetic_jobs(100, rng), start=args.jobs + 1):
+            index.add_job(job_id, *text)
+
+        timings = []
+        for _ in range(args.users):
+            applied = rng.sample(texts, args.applied)
+            started = time.perf_counter()
+            columns, weights = index.profile(applied)
+            index.score(columns, weights)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(f"profile + score: p50 {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Cold-start cost: import time of ``main`` and time to the first served request.
+
+Run from the backend directory:
+    python benchmarks/bench_startup.py [--runs 5] [--top 15] [--json]
+
+Each measurement runs in a fresh interpreter so nothing is cached in-process.
+The import breakdown comes from ``python -X importtime``; the first-request
+time starts a uvicorn worker and polls ``/`` until it answers, which includes
+the lifespan handler (``create_all`` against the configured database).
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(top):
+    # Exclusive ("self") microseconds summed per top-level package, from -X importtime
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        root = name.strip().split(".")[0]
+        packages[root] = packages.get(root, 0) + int(own)
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return sum(packages.values()), ranked
+
+
+def import_time():
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import main"], cwd=BACKEND_DIR, check=True)
+    return time.perf_counter() - started
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_request_time(timeout=30.0):
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    response.read()
+                return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError("server did not answer within the timeout")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    total, ranked = import_profile(args.top)
+    imports = [import_time() for _ in range(args.runs)]
+    first = [first_request_time() for _ in range(args.runs)]
+
+    results = {
+        "import_main_ms": statistics.median(imports) * 1000,
+        "first_request_ms": statistics.median(first) * 1000,
+        "importtime_total_ms": total / 1000,
+        "top_imports_ms": {name: us / 1000 for name, us in ranked},
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"python -c 'import main' (median of {args.runs}): {results['import_main_ms']:8.1f} ms")
+    print(f"process start -> first response:        {results['first_request_ms']:8.1f} ms")
+    print(f"\nslowest top-level imports (-X importtime, {results['importtime_total_ms']:.1f} ms total):")
+    for name, ms in results["top_imports_ms"].items():
+        print(f"  {name:<30}{ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
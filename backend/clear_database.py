@@ -4,7 +4,12 @@ from models import (
     ResourceLikes,
     FinancialResources,
     Notifications,
+    NotificationsArchive,
     Applications,
+    ApplicationsArchive,
+    ApplicationScores,
+    JobSignatures,
+    JobImports,
     Jobs,
     Employers,
     Users,
@@ -32,14 +37,30 @@ def clear_all_data():
         deleted_notifications = db.query(Notifications).delete()
         print(f"   Deleted {deleted_notifications} notifications")
 
+        # Delete archived rows (depend on jobs and users)
+        deleted_archived = db.query(NotificationsArchive).delete() + db.query(ApplicationsArchive).delete()
+        print(f"   Deleted {deleted_archived} archived notifications and applications")
+
+        # Delete relevance scores (depend on jobs)
+        deleted_scores = db.query(ApplicationScores).delete()
+        print(f"   Deleted {deleted_scores} application scores")
+
         # Delete applications (depends on jobs and users)
         deleted_applications = db.query(Applications).delete()
         print(f"   Deleted {deleted_applications} applications")
 
+        # Delete duplicate-detection signatures (depend on jobs)
+        deleted_signatures = db.query(JobSignatures).delete()
+        print(f"   Deleted {deleted_signatures} job signatures")
+
         # Delete jobs (depends on employers)
         deleted_jobs = db.query(Jobs).delete()
         print(f"   Deleted {deleted_jobs} jobs")
 
+        # Delete bulk import records (depend on employers)
+        deleted_imports = db.query(JobImports).delete()
+        print(f"   Deleted {deleted_imports} job imports")
+
         # Delete employers (depends on users)
         deleted_employers = db.query(Employers).delete()
         print(f"   Deleted {deleted_employers} employers")
@@ -0,0 +1,193 @@
+"""Response compression middleware (gzip and Brotli).
+
+The encoding is negotiated from ``Accept-Encoding``; Brotli is preferred when
+the ``brotli`` package is installed and the client accepts it. Responses below
+``COMPRESSION_MIN_SIZE`` bytes, streaming responses and non-text content types
+are passed through untouched. Responses that repeat have their compressed
+bytes cached by content digest, so identical payloads are not recompressed on
+every request: those marked ``Cache-Control: public`` (job details) and those
+carrying an ETag (the feeds and the financial resource lists, which clients
+revalidate) unless marked ``no-store``. The key is the body digest, so
+identical private bodies can safely share an entry.
+"""
+import gzip
+import hashlib
+from collections import OrderedDict
+
+from config import BROTLI_QUALITY, COMPRESSION_CACHE_SIZE, COMPRESSION_MIN_SIZE, GZIP_LEVEL
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised only without brotli
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+)
+
+
+def parse_accept_encoding(header: str) -> dict:
+    # Map each accepted coding to its q-value, e.g. "gzip;q=0.5" -> {"gzip": 0.5}
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(header: str, brotli_available: bool = brotli is not None):
+    # Pick the best supported coding the client accepts, or None for identity
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    candidates = (["br"] if brotli_available else []) + ["gzip"]
+    best, best_q = None, 0.0
+    for coding in candidates:
+        quality = accepted.get(coding, wildcard)
+        if quality > best_q:
+            best, best_q = coding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = GZIP_LEVEL, brotli_quality: int = BROTLI_QUALITY) -> bytes:
+    # Compress a full response body with the chosen coding
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+def is_cacheable(cache_control: str, has_validator: bool = False) -> bool:
+    # Shared-cacheable responses, and any with a validator, have their compressed form kept
+    directives = {d.strip().split("=")[0].lower() for d in cache_control.split(",")}
+    if "no-store" in directives:
+        return False
+    return has_validator or ("public" in directives and not directives & {"private", "no-cache"})
+
+
+class CompressedBodyCache:
+    # Small LRU of compressed bodies keyed by (coding, level, body digest)
+
+    def __init__(self, max_entries: int = COMPRESSION_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compress(self, body: bytes, encoding: str, level: int, compressor) -> bytes:
+        key = (encoding, level, hashlib.blake2b(body, digest_size=16).digest())
+        cached = self.entries.get(key)
+        if cached is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        compressed = compressor(body)
+        self.entries[key] = compressed
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return compressed
+
+
+class CompressionMiddleware:
+    # ASGI middleware applying gzip/Brotli to buffered, compressible responses
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        gzip_level: int = GZIP_LEVEL,
+        brotli_quality: int = BROTLI_QUALITY,
+        cache_size: int = COMPRESSION_CACHE_SIZE,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache = CompressedBodyCache(cache_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = dict((k.lower(), v) for k, v in start_message["headers"])
+            content_type = headers.get(b"content-type", b"").decode("latin-1")
+            if (
+                message.get("more_body", False)
+                or b"content-encoding" in headers
+                or start_message["status"] in (204, 304)
+                or len(body) < self.minimum_size
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                # Streaming, already encoded, tiny or binary: send as-is
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = self._compress(
+                body, encoding, headers.get(b"cache-control", b"").decode("latin-1"), b"etag" in headers
+            )
+            new_headers = [
+                (k, v) for k, v in start_message["headers"]
+                if k.lower() not in (b"content-length", b"vary", b"etag")
+            ]
+            vary = headers.get(b"vary")
+            new_headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+            new_headers.append((b"content-encoding", encoding.encode("latin-1")))
+            new_headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+            etag = headers.get(b"etag")
+            if etag:
+                # A strong validator must differ per representation
+                new_headers.append((b"etag", etag if etag.startswith(b"W/") else b"W/" + etag))
+            await send({**start_message, "headers": new_headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _compress(self, body: bytes, encoding: str, cache_control: str, has_validator: bool = False) -> bytes:
+        level = self.brotli_quality if encoding == "br" else self.gzip_level
+
+        def compressor(data):
+            return compress(data, encoding, gzip_level=self.gzip_level, brotli_quality=self.brotli_quality)
+
+        if is_cacheable(cache_control, has_validator):
+            return self.cache.get_or_compress(body, encoding, level, compressor)
+        return compressor(body)
@@ -0,0 +1,277 @@
+"""Near-duplicate job postings from the same employer, by MinHash/LSH.
+
+Each posting's title and description are cut into word 3-shingles and
+summarised as a ``NUM_PERM``-value MinHash signature; the share of equal
+values estimates the Jaccard similarity of two postings' shingle sets. The
+signature is split into ``BANDS`` bands, and two postings are candidates only
+if some band matches exactly, so a lookup is a handful of dictionary probes
+however many jobs the employer has. Candidates at or above
+``DEDUPE_THRESHOLD`` estimated similarity are duplicates.
+
+Signatures are stored in ``job_signatures``. Each worker keeps an in-memory
+LSH index, loaded per employer on first use and topped up from the table
+before every check, so postings made through other workers are found too.
+A top-up reads rows above the highest job id seen, plus the employer's active
+postings from within ``DEDUPE_REFRESH_OVERLAP_SECONDS`` of the previous
+top-up: ids are assigned at insert, not at commit, so a concurrent repost
+can become visible after a higher id.
+
+``create_job`` and bulk imports (job_import.py) check every new posting
+against the employer's active ones. Depending on ``DEDUPE_MODE``:
+    flag    - the posting is saved with ``duplicate_of`` set to the original
+              and left out of /jobs and /jobs/recommended
+    reject  - the request fails with 409 (an imported row is reported as an error)
+    off     - no check
+
+When an original closes (toggled off or expired) or is deleted, its oldest
+active repost is promoted: its ``duplicate_of`` is cleared, so it shows in
+the feeds again, and the other reposts are pointed at it
+(``promote_duplicates``).
+
+The existing catalog (or postings that raced each other through different
+workers) is deduplicated in one streaming pass, employer by employer:
+    python dedupe.py scan [--dry-run]
+"""
+import argparse
+import re
+import zlib
+from collections import defaultdict
+from datetime import timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from sqlalchemy import select, union_all
+from sqlalchemy.orm import Session
+
+import config
+import models
+from revocation import utcnow
+
+if TYPE_CHECKING:
+    import numpy as np
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+@lru_cache(maxsize=None)
+def _hash_parameters() -> tuple:
+    # Multipliers and offsets of the NUM_PERM hashes, made on the first signature so
+    # numpy stays off the app's import path. Fixed seeds so signatures written by
+    # any worker or run are comparable
+    import numpy as np
+
+    seeds = np.random.default_rng(20240611)
+    multipliers = seeds.integers(1, 2 ** 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+    return multipliers, seeds.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+
+
+def shingles(title: str | None, description: str | None) -> set[str]:
+    words = _WORD.findall(f"{title or ''} {description or ''}".lower())
+    if len(words) < SHINGLE_WORDS:
+        return set(words)
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def signature(title: str | None, description: str | None) -> "np.ndarray":
+    # Minimum of NUM_PERM multiply-shift hashes over the shingles
+    import numpy as np
+
+    multipliers, offsets = _hash_parameters()
+    hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles(title, description)), dtype=np.uint64)
+    if not len(hashes):
+        hashes = np.zeros(1, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        permuted = (multipliers[:, None] * hashes[None, :] + offsets[:, None]) >> np.uint64(32)
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def similarity(first: "np.ndarray", second: "np.ndarray") -> float:
+    import numpy as np
+
+    return float(np.count_nonzero(first == second)) / NUM_PERM
+
+
+def band_keys(sig: "np.ndarray") -> list[bytes]:
+    return [band.tobytes() for band in sig.reshape(BANDS, ROWS_PER_BAND)]
+
+
+class LSHIndex:
+    # Banded MinHash buckets: (employer_id, band, band bytes) -> job ids
+
+    def __init__(self):
+        self.buckets = defaultdict(set)
+        self.signatures = {}
+
+    def add(self, employer_id: int, job_id: int, sig: "np.ndarray") -> None:
+        self.signatures[job_id] = sig
+        for band, key in enumerate(band_keys(sig)):
+            self.buckets[employer_id, band, key].add(job_id)
+
+    def matches(self, employer_id: int, sig: "np.ndarray", threshold: float = config.DEDUPE_THRESHOLD) -> list[int]:
+        # Jobs sharing a band whose estimated similarity reaches threshold
+        candidates = set()
+        for band, key in enumerate(band_keys(sig)):
+            candidates |= self.buckets.get((employer_id, band, key), set())
+        return sorted(job_id for job_id in candidates if similarity(self.signatures[job_id], sig) >= threshold)
+
+
+class DuplicateDetector:
+    # This worker's LSH index over job_signatures, loaded per employer on demand
+
+    def __init__(self):
+        self.index = LSHIndex()
+        # employer_id -> highest job_id loaded from job_signatures
+        self.loaded = {}
+        # employer_id -> when the employer's signatures were last read
+        self.refreshed_at = {}
+
+    def refresh(self, db: Session, employer_id: int) -> None:
+        import numpy as np
+
+        signatures = models.JobSignatures
+        read_at = utcnow()
+        query = select(signatures.job_id, signatures.signature).where(
+            signatures.employer_id == employer_id, signatures.job_id > self.loaded.get(employer_id, 0)
+        )
+        if employer_id in self.refreshed_at:
+            # Postings committed after a higher id was already read
+            since = self.refreshed_at[employer_id] - timedelta(seconds=config.DEDUPE_REFRESH_OVERLAP_SECONDS)
+            query = union_all(query, (
+                select(signatures.job_id, signatures.signature)
+                .join(models.Jobs, models.Jobs.job_id == signatures.job_id)
+                .where(signatures.employer_id == employer_id, models.Jobs.is_active == True, models.Jobs.date_posted >= since)
+            ))
+        rows = db.execute(query).all()
+        for job_id, stored in rows:
+            if job_id not in self.index.signatures:
+                self.index.add(employer_id, job_id, np.frombuffer(stored, dtype=np.uint32))
+        self.loaded[employer_id] = max([self.loaded.get(employer_id, 0)] + [job_id for job_id, _ in rows])
+        self.refreshed_at[employer_id] = read_at
+
+    def find_duplicate(self, db: Session, employer_id: int, sig: "np.ndarray", refresh: bool = True) -> int | None:
+        # The employer's oldest active, not itself duplicate, posting matching sig;
+        # bulk callers refresh once up front and pass refresh=False
+        if refresh:
+            self.refresh(db, employer_id)
+        matches = self.index.matches(employer_id, sig)
+        if not matches:
+            return None
+        return (
+            db.query(models.Jobs.job_id)
+            .filter(models.Jobs.job_id.in_(matches), models.Jobs.is_active == True, models.Jobs.duplicate_of.is_(None))
+            .order_by(models.Jobs.job_id)
+            .limit(1)
+            .scalar()
+        )
+
+    def add(self, employer_id: int, job_id: int, sig: "np.ndarray") -> None:
+        # Only once the employer is loaded; otherwise refresh() reads it from the table
+        if employer_id in self.loaded:
+            self.index.add(employer_id, job_id, sig)
+            self.loaded[employer_id] = max(self.loaded[employer_id], job_id)
+
+
+detector = DuplicateDetector()
+
+
+def promote_duplicates(db: Session, job_ids) -> list[int]:
+    # For each closed or deleted job in job_ids, clear duplicate_of on its oldest
+    # active repost and point the rest at that one; returns the promoted ids (caller commits)
+    job_ids = list(job_ids)
+    if not job_ids:
+        return []
+    successors = {}
+    for job_id, original in (
+        db.query(models.Jobs.job_id, models.Jobs.duplicate_of)
+        .filter(models.Jobs.duplicate_of.in_(job_ids), models.Jobs.is_active == True)
+        .order_by(models.Jobs.job_id)
+    ):
+        successors.setdefault(original, job_id)
+    for original, successor in successors.items():
+        db.query(models.Jobs).filter(models.Jobs.job_id == successor).update(
+            {"duplicate_of": None}, synchronize_session=False
+        )
+        db.query(models.Jobs).filter(models.Jobs.duplicate_of == original).update(
+            {"duplicate_of": successor}, synchronize_session=False
+        )
+    return list(successors.values())
+
+
+def dedupe_catalog(read_db: Session, write_db: Session, dry_run: bool = False, batch_size: int = 1000) -> dict:
+    # One pass over active postings ordered by employer: store missing signatures
+    # and flag each posting matching an earlier one of the same employer
+    import numpy as np
+    import versions
+
+    rows = (
+        read_db.query(
+            models.Jobs.job_id, models.Jobs.employer_id, models.Jobs.title, models.Jobs.description,
+            models.JobSignatures.signature,
+        )
+        .outerjoin(models.JobSignatures, models.JobSignatures.job_id == models.Jobs.job_id)
+        .filter(models.Jobs.is_active == True, models.Jobs.duplicate_of.is_(None))
+        .order_by(models.Jobs.employer_id, models.Jobs.job_id)
+        .yield_per(batch_size)
+    )
+    counts = {"scanned": 0, "signatures": 0, "duplicates": 0}
+    index = LSHIndex()
+    employer = None
+    pending = 0
+    for job_id, employer_id, title, description, stored in rows:
+        if employer_id != employer:
+            # Duplicates never cross employers, so only one employer is held in memory
+            index = LSHIndex()
+            employer = employer_id
+        counts["scanned"] += 1
+        if stored is None:
+            sig = signature(title, description)
+            counts["signatures"] += 1
+            if not dry_run:
+                write_db.add(models.JobSignatures(job_id=job_id, employer_id=employer_id, signature=sig.tobytes()))
+                pending += 1
+        else:
+            sig = np.frombuffer(stored, dtype=np.uint32)
+        matches = index.matches(employer_id, sig)
+        if matches:
+            counts["duplicates"] += 1
+            if not dry_run:
+                write_db.query(models.Jobs).filter(models.Jobs.job_id == job_id).update(
+                    {"duplicate_of": matches[0]}, synchronize_session=False
+                )
+                pending += 1
+            # Later reposts are compared with the original only
+            continue
+        index.add(employer_id, job_id, sig)
+        if pending >= batch_size:
+            write_db.commit()
+            pending = 0
+    if not dry_run:
+        if counts["duplicates"]:
+            versions.bump(write_db, versions.JOBS_CATALOG)
+        write_db.commit()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flag near-duplicate job postings")
+    parser.add_argument("command", choices=["scan"])
+    parser.add_argument("--dry-run", action="store_true", help="count duplicates without changing anything")
+    args = parser.parse_args(argv)
+    from database import PrimarySessionLocal
+
+    read_db, write_db = PrimarySessionLocal(), PrimarySessionLocal()
+    try:
+        counts = dedupe_catalog(read_db, write_db, dry_run=args.dry_run)
+    finally:
+        read_db.close()
+        write_db.close()
+    print(f"Scanned {counts['scanned']} jobs: {counts['signatures']} new signatures, {counts['duplicates']} duplicates")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Edge (CDN / reverse proxy) caching helpers.
+
+Public endpoints tag their responses with ``Surrogate-Key`` so a cache in
+front of the API can evict every response that mentions a job or employer in
+one purge. Writers call ``purge_later`` with the affected keys; the purge runs
+as a background task after the response has been sent.
+
+The purger is chosen with ``EDGE_PURGER``:
+    noop   - do nothing (default, no edge cache deployed)
+    http   - send an HTTP PURGE with the keys to each URL in EDGE_PURGE_URLS
+             (Varnish xkey / Fastly style)
+    local  - record purged keys in memory (development and tests)
+"""
+import logging
+import urllib.request
+from functools import lru_cache
+
+from fastapi import BackgroundTasks
+
+from config import EDGE_PURGE_TIMEOUT, EDGE_PURGE_URLS, EDGE_PURGER, JOB_DETAIL_MAX_AGE, JOB_DETAIL_S_MAXAGE
+
+logger = logging.getLogger(__name__)
+
+JOB_DETAIL_CACHE_CONTROL = f"public, max-age={JOB_DETAIL_MAX_AGE}, s-maxage={JOB_DETAIL_S_MAXAGE}"
+
+
+def job_key(job_id: int) -> str:
+    return f"job-{job_id}"
+
+
+def employer_key(employer_id: int) -> str:
+    return f"employer-{employer_id}"
+
+
+def surrogate_headers(*keys: str) -> dict:
+    # Headers marking a response as edge-cacheable under the given keys
+    return {"Cache-Control": JOB_DETAIL_CACHE_CONTROL, "Surrogate-Key": " ".join(keys)}
+
+
+class NoopPurger:
+    def purge(self, keys: list[str]) -> None:
+        pass
+
+
+class HttpPurger:
+    # Issue "PURGE /" with the keys in Surrogate-Key and xkey-purge headers
+
+    def __init__(self, urls: list[str], timeout: float = EDGE_PURGE_TIMEOUT):
+        self.urls = urls
+        self.timeout = timeout
+
+    def purge(self, keys: list[str]) -> None:
+        header = " ".join(keys)
+        for url in self.urls:
+            request = urllib.request.Request(
+                url,
+                method="PURGE",
+                headers={"Surrogate-Key": header, "xkey-purge": header},
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout):
+                    pass
+            except OSError as exc:
+                # A failed purge only means stale content until s-maxage expires
+                logger.warning("Edge purge of %s via %s failed: %s", header, url, exc)
+
+
+class LocalPurger:
+    # In-memory stand-in that records purged keys
+
+    def __init__(self):
+        self.purged = []
+
+    def purge(self, keys: list[str]) -> None:
+        self.purged.extend(keys)
+
+
+@lru_cache(maxsize=1)
+def get_purger():
+    if EDGE_PURGER == "http":
+        return HttpPurger(EDGE_PURGE_URLS)
+    if EDGE_PURGER == "local":
+        return LocalPurger()
+    return NoopPurger()
+
+
+def purge_later(background_tasks: BackgroundTasks, *keys: str) -> None:
+    # Schedule a purge to run once the response is sent (and the change committed)
+    background_tasks.add_task(get_purger().purge, list(keys))
@@ -0,0 +1,132 @@
+"""Streaming file exports.
+
+Exports can be much larger than any JSON listing, so they are never built in
+memory. The route passes an iterator over a ``yield_per`` query (a server-side
+cursor on Postgres) and these generators turn it into chunks of
+``EXPORT_CHUNK_ROWS`` rows for a ``StreamingResponse``. At any moment only one
+fetch batch and one output chunk are held, whatever the row count.
+
+The generators run in Starlette's threadpool once the response starts, after
+the request's own session is closed, so they open and close their own session
+through ``open_rows``.
+
+``stream_zip`` builds a ZIP archive of files on disk the same way: zipfile
+writes into an unseekable sink (so it emits data descriptors instead of
+seeking back), and whatever it has written is yielded after every
+``ZIP_READ_BYTES`` read from a file. The server only asks for the next chunk
+once the previous one has been sent, so reading follows the client's pace
+and no temp file or whole archive is ever held.
+"""
+import csv
+import io
+import logging
+import os
+import zipfile
+from contextlib import closing
+from datetime import date, datetime
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from fast_json import dumps
+
+logger = logging.getLogger(__name__)
+
+# Rows written per chunk handed to the server
+EXPORT_CHUNK_ROWS = 500
+# Rows fetched per round trip from the server-side cursor
+EXPORT_FETCH_ROWS = 1000
+
+# Bytes read from a file per chunk of a ZIP stream
+ZIP_READ_BYTES = 64 * 1024
+
+# Spreadsheet apps treat cells starting with these as formulas
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def open_rows(session_factory, build_query: Callable) -> Iterator[Sequence[Any]]:
+    # Stream build_query(db) rows through a fresh session that closes when the stream ends
+    with closing(session_factory()) as db:
+        yield from build_query(db).yield_per(EXPORT_FETCH_ROWS)
+
+
+def csv_cell(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        # Keep user text from running as a formula when the file is opened
+        return "'" + value
+    return value
+
+
+def stream_csv(header: Sequence[str], records: Iterable[dict]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for count, record in enumerate(records, start=1):
+        writer.writerow([csv_cell(record[field]) for field in header])
+        if count % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def stream_ndjson(records: Iterable[dict]) -> Iterator[bytes]:
+    chunk = []
+    for record in records:
+        chunk.append(dumps(record))
+        if len(chunk) == EXPORT_CHUNK_ROWS:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+class _ZipSink(io.RawIOBase):
+    # Write-only, unseekable target for ZipFile; drain() hands over what was written
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(files: Iterable[tuple[str, str]]) -> Iterator[bytes]:
+    # ZIP of (archive name, path on disk) pairs; missing or unreadable files are skipped
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for name, path in files:
+            try:
+                handle = open(path, "rb")
+            except OSError:
+                logger.warning("Skipping unreadable file %s", path)
+                continue
+            with handle:
+                stat = os.fstat(handle.fileno())
+                info = zipfile.ZipInfo(name, date_time=datetime.fromtimestamp(stat.st_mtime).timetuple()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                # Known up front so zipfile switches to ZIP64 for very large files
+                info.file_size = stat.st_size
+                with archive.open(info, "w") as entry:
+                    while data := handle.read(ZIP_READ_BYTES):
+                        entry.write(data)
+                        if chunk := sink.drain():
+                            yield chunk
+            # The entry's data descriptor
+            yield sink.drain()
+    # The central directory, written on close
+    yield sink.drain()
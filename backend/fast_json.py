@@ -0,0 +1,51 @@
+"""Fast JSON path for list endpoints.
+
+List endpoints build plain dicts straight from column-projected query rows and
+return them through ``FastJSONResponse``. Returning a ``Response`` instance
+makes FastAPI skip ``response_model`` validation and serialization, so each
+row is only touched once. The ``response_model`` on the route still documents
+the shape in OpenAPI.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterable, Sequence
+
+from fastapi.responses import Response
+
+from tracing import span
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def _default(value: Any):
+    # Fallback encoder for the stdlib json path (orjson handles these natively)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    # Serialize content to compact JSON bytes
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    # JSON response rendered with orjson when available
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        with span("response.serialize", rows=len(content) if isinstance(content, list) else 1):
+            return dumps(content)
+
+
+def rows_to_dicts(rows: Iterable[Sequence[Any]], fields: Sequence[str]) -> list[dict]:
+    # Zip column-projected tuples into dicts keyed by field name
+    return [dict(zip(fields, row)) for row in rows]
@@ -0,0 +1,263 @@
+"""Offline geocoding and radius search for job postings.
+
+Locations are free text ("Brooklyn, NY", "123 Main St, San Francisco, CA
+94105", "Remote"). ``geocode`` resolves them against a local gazetteer CSV
+(``GAZETTEER_PATH``; city, state, coordinates, aliases) without any network
+access, and postings store the result in ``latitude`` / ``longitude`` plus a
+``geohash`` of them. Text that matches nothing (including "Remote") has no
+coordinates and never matches a radius search.
+
+``/jobs?near=&radius=`` takes a place name or "lat,lon" and a radius in miles.
+Candidates come from an index and are then checked exactly with the haversine
+distance:
+    - Postgres with PostGIS installed: ST_DWithin on a geography expression,
+      backed by the GiST index from db/migrations/003_jobs_geo.sql
+    - otherwise (SQLite, plain Postgres): the few geohash cells covering the
+      search circle, each a range scan on the geohash B-tree index
+
+Existing rows are geocoded with:
+    python geo.py backfill
+"""
+import csv
+import math
+import re
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+
+from sqlalchemy import and_, func, or_, text
+from sqlalchemy.orm import Session
+
+import config
+
+EARTH_RADIUS_MILES = 3958.8
+METERS_PER_MILE = 1609.344
+MAX_RADIUS_MILES = 500
+GEOHASH_PRECISION = 9
+# Upper bound on geohash cells (index range scans) per radius query
+MAX_COVER_CELLS = 16
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    latitude: float
+    longitude: float
+
+    @property
+    def geohash(self) -> str:
+        return encode_geohash(self.latitude, self.longitude)
+
+
+def normalize(value: str) -> str:
+    return re.sub(r"\s+", " ", value.lower().replace(".", "")).strip()
+
+
+@lru_cache(maxsize=1)
+def load_gazetteer(path=config.GAZETTEER_PATH) -> dict:
+    # normalized "city, st", "city" and alias keys -> Place; earlier rows win for bare names
+    places = {}
+    with open(path, newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            place = Place(f"{row['name']}, {row['state']}", float(row["latitude"]), float(row["longitude"]))
+            keys = [f"{row['name']}, {row['state']}", row["name"], *filter(None, row["aliases"].split("|"))]
+            for key in keys:
+                places.setdefault(normalize(key), place)
+    return places
+
+
+def parse_coordinates(value: str) -> Place | None:
+    match = re.fullmatch(r"\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*", value)
+    if not match:
+        return None
+    latitude, longitude = float(match.group(1)), float(match.group(2))
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return Place(value.strip(), latitude, longitude)
+
+
+def geocode(value: str | None) -> Place | None:
+    # Best gazetteer match for a free-text location, most specific first
+    if not value or not value.strip():
+        return None
+    coordinates = parse_coordinates(value)
+    if coordinates:
+        return coordinates
+    places = load_gazetteer()
+    # Drop street numbers and ZIP codes: "123 Main St, San Francisco, CA 94105"
+    parts = [normalize(re.sub(r"\b\d+(-\d+)?\b", "", part)) for part in value.split(",")]
+    parts = [part for part in parts if part]
+    candidates = [", ".join(parts)]
+    candidates += [f"{parts[i]}, {parts[i + 1]}" for i in range(len(parts) - 1)]
+    candidates += parts
+    for candidate in candidates:
+        if candidate in places:
+            return places[candidate]
+    return None
+
+
+def coordinates_for(value: str | None) -> dict:
+    # Column values for a location; all None when it cannot be geocoded
+    place = geocode(value)
+    if place is None:
+        return {"latitude": None, "longitude": None, "geohash": None}
+    return {"latitude": place.latitude, "longitude": place.longitude, "geohash": place.geohash}
+
+
+def haversine_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(a)))
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple:
+    # (degrees of latitude, degrees of longitude) covered by one cell
+    total = 5 * precision
+    return 180.0 / 2 ** (total // 2), 360.0 / 2 ** ((total + 1) // 2)
+
+
+def bounding_box(latitude: float, longitude: float, radius_miles: float) -> tuple:
+    dlat = math.degrees(radius_miles / EARTH_RADIUS_MILES)
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    dlon = min(180.0, math.degrees(radius_miles / (EARTH_RADIUS_MILES * cos_lat)))
+    return max(-90.0, latitude - dlat), longitude - dlon, min(90.0, latitude + dlat), longitude + dlon
+
+
+def _samples(start: float, stop: float, step: float) -> list[float]:
+    # Points no more than step apart from start to stop inclusive
+    points = []
+    while start < stop:
+        points.append(start)
+        start += step
+    points.append(stop)
+    return points
+
+
+def covering_cells(latitude: float, longitude: float, radius_miles: float) -> list[str]:
+    # Geohash prefixes whose cells together cover the circle's bounding box,
+    # at the finest precision needing no more than MAX_COVER_CELLS of them
+    south, west, north, east = bounding_box(latitude, longitude, radius_miles)
+    best = [""]
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        cell_lat, cell_lon = cell_size(precision)
+        rows = math.floor((north + 90) / cell_lat) - math.floor((south + 90) / cell_lat) + 1
+        cols = math.floor((east + 180) / cell_lon) - math.floor((west + 180) / cell_lon) + 1
+        if rows * cols > MAX_COVER_CELLS:
+            break
+        # Samples at most one cell apart hit every cell the box touches;
+        # longitudes past +-180 wrap across the antimeridian
+        best = sorted({
+            encode_geohash(lat, (lon + 180) % 360 - 180, precision)
+            for lat in _samples(south, north, cell_lat)
+            for lon in _samples(west, east, cell_lon)
+        })
+    return best
+
+
+def prefix_range(column, prefix: str):
+    # column LIKE 'prefix%' as a B-tree range (the column uses byte ordering)
+    if not prefix:
+        return column.isnot(None)
+    return and_(column >= prefix, column < prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+
+_postgis = {}
+
+
+def postgis_available(db: Session) -> bool:
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return False
+    key = str(bind.url)
+    if key not in _postgis:
+        _postgis[key] = db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'postgis'")).first() is not None
+    return _postgis[key]
+
+
+def within_radius(db: Session, model, center: Place, radius_miles: float, *conditions):
+    # Index-backed candidate filter; callers still check haversine_miles exactly.
+    # conditions (e.g. is_active) are repeated in every geohash range so that
+    # SQLite can answer each one from a partial index.
+    if postgis_available(db):
+        def geography(longitude, latitude):
+            return func.geography(func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326))
+
+        return and_(*conditions, func.ST_DWithin(
+            geography(model.longitude, model.latitude),
+            geography(center.longitude, center.latitude),
+            radius_miles * METERS_PER_MILE,
+        ))
+    cells = covering_cells(center.latitude, center.longitude, radius_miles)
+    return or_(*(and_(*conditions, prefix_range(model.geohash, cell)) for cell in cells))
+
+
+def backfill(db: Session, batch_size: int = 1000) -> int:
+    # Geocode jobs and employers that have a location but no coordinates yet
+    import models
+    import versions
+
+    updated = 0
+    for model, pk in ((models.Jobs, models.Jobs.job_id), (models.Employers, models.Employers.employer_id)):
+        last_id = 0
+        while True:
+            rows = (
+                db.query(pk, model.location)
+                .filter(pk > last_id, model.location.isnot(None), model.geohash.is_(None))
+                .order_by(pk)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            changed = 0
+            for row_id, location in rows:
+                values = coordinates_for(location)
+                if values["geohash"]:
+                    db.query(model).filter(pk == row_id).update(values, synchronize_session=False)
+                    changed += 1
+            if changed and model is models.Jobs:
+                # Radius filters see new coordinates, so cached feeds (ETags) are stale
+                versions.bump(db, versions.JOBS_CATALOG)
+            updated += changed
+            db.commit()
+    return updated
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["backfill"]:
+        sys.exit("usage: python geo.py backfill")
+    from database import PrimarySessionLocal
+
+    session = PrimarySessionLocal()
+    try:
+        print(f"Geocoded {backfill(session)} rows")
+    finally:
+        session.close()
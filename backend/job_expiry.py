@@ -0,0 +1,116 @@
+"""Scheduled deactivation of expired job postings.
+
+New postings get ``expires_at = now + JOB_TTL_DAYS``. Every worker runs a
+background thread that, every ``JOB_EXPIRY_INTERVAL_SECONDS``, deactivates
+postings whose ``expires_at`` has passed, ``JOB_EXPIRY_BATCH_SIZE`` rows per
+transaction:
+
+    UPDATE jobs SET is_active = false
+    WHERE job_id IN (SELECT job_id FROM jobs
+                     WHERE is_active AND expires_at <= now()
+                     ORDER BY expires_at LIMIT n
+                     FOR UPDATE SKIP LOCKED)
+    RETURNING job_id
+
+On Postgres ``SKIP LOCKED`` lets the sweeps of several workers (and an
+employer toggling a posting) run at once without waiting on each other's
+rows; each batch is short so locks are held only briefly. Each batch promotes
+reposts of the expired postings (dedupe.promote_duplicates) and bumps the
+jobs catalog version (so feed ETags change) in the same transaction, and the
+edge cache entries of the expired postings are purged after it commits.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+import config
+import dedupe
+import edge_cache
+import versions
+from database import PrimarySessionLocal
+from models import Jobs
+from revocation import utcnow
+
+logger = logging.getLogger(__name__)
+
+
+def default_expiry(now=None):
+    # Expiry for a posting created or re-activated now
+    return (now or utcnow()) + timedelta(days=config.JOB_TTL_DAYS)
+
+
+def expire_batch(db: Session, batch_size: int, now=None) -> list[int]:
+    # Deactivate up to batch_size expired postings; returns their ids (caller commits)
+    due = (
+        select(Jobs.job_id)
+        .where(Jobs.is_active.is_(True), Jobs.expires_at <= (now or utcnow()))
+        .order_by(Jobs.expires_at)
+        .limit(batch_size)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        # Rows another sweep (or a toggle) holds are left for the next pass
+        due = due.with_for_update(skip_locked=True)
+    stmt = (
+        update(Jobs)
+        .where(Jobs.job_id.in_(due.scalar_subquery()))
+        .values(is_active=False)
+        .returning(Jobs.job_id)
+        .execution_options(synchronize_session=False)
+    )
+    job_ids = [row[0] for row in db.execute(stmt)]
+    if job_ids:
+        dedupe.promote_duplicates(db, job_ids)
+        versions.bump(db, versions.JOBS_CATALOG)
+    return job_ids
+
+
+def expire_jobs(session_factory=PrimarySessionLocal, batch_size: int = config.JOB_EXPIRY_BATCH_SIZE, now=None) -> int:
+    # Sweep in committed batches until no expired postings are left
+    expired = 0
+    while True:
+        db = session_factory()
+        try:
+            job_ids = expire_batch(db, batch_size, now)
+            db.commit()
+        finally:
+            db.close()
+        if job_ids:
+            edge_cache.get_purger().purge([edge_cache.job_key(job_id) for job_id in job_ids])
+        expired += len(job_ids)
+        if len(job_ids) < batch_size:
+            return expired
+
+
+class ExpiryScheduler:
+    # One sweeping thread per worker process
+
+    def __init__(self, interval: float = config.JOB_EXPIRY_INTERVAL_SECONDS):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                expired = expire_jobs()
+                if expired:
+                    logger.info("Deactivated %d expired job postings", expired)
+            except Exception:
+                logger.exception("Job expiry sweep failed")
+
+    def start(self) -> None:
+        # Threads do not survive fork, so start once per process
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            threading.Thread(target=self._run, name="job-expiry", daemon=True).start()
+            self._pid = os.getpid()
+
+
+scheduler = ExpiryScheduler()
@@ -0,0 +1,291 @@
+"""Bulk job import from CSV or NDJSON uploads.
+
+``POST /jobs/import`` takes a file with one posting per CSV row (header row
+naming the ``JobCreate`` fields) or per NDJSON line. Rows are read and
+validated one at a time against ``schemas_job.JobImportRow`` (``JobCreate``
+held to the jobs table's constraints), so a bad row is reported by number and
+the rest still load. Valid rows are prepared exactly as ``create_job`` would
+(expiry, geocoding with the employer's coordinates as fallback, parsed pay,
+duplicate check) and inserted ``JOB_IMPORT_BATCH_SIZE`` at a time, each batch
+one multi-row INSERT and one commit. The employer is resolved once per import.
+
+Uploads up to ``JOB_IMPORT_SYNC_BYTES`` are imported within the request.
+Larger ones are saved under ``JOB_IMPORT_DIR`` and imported by a background
+task after the response; ``GET /jobs/import/{import_id}`` reports progress,
+which is updated with every batch. A batch that fails (while being prepared
+or inserted) has its rows reported and the import moves on. Once the import
+finishes, the employer's Surrogate-Key is purged from the edge cache if any
+posting was imported.
+"""
+import csv
+import io
+import json
+import logging
+import os
+from typing import Iterator
+
+from pydantic import ValidationError
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+import config
+import dedupe
+import edge_cache
+import geo
+import models
+import pay
+import recommender
+import versions
+from database import PrimarySessionLocal
+from job_expiry import default_expiry
+from revocation import utcnow
+from schemas_job import JobImportRow
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".json": "ndjson"}
+
+
+def format_for(filename: str | None) -> str | None:
+    return FORMATS.get(os.path.splitext(filename or "")[1].lower())
+
+
+def read_rows(handle, file_format: str) -> Iterator[tuple]:
+    # (row number, fields or None, parse error or None) for each record of a binary file
+    text = io.TextIOWrapper(handle, encoding="utf-8-sig", newline="" if file_format == "csv" else None)
+    try:
+        if file_format == "csv":
+            for number, row in enumerate(csv.DictReader(text), start=1):
+                # Empty cells are missing values, not empty strings
+                yield number, {key.strip(): (value.strip() or None) if isinstance(value, str) else value
+                               for key, value in row.items() if key}, None
+            return
+        number = 0
+        for line in text:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                yield number, None, f"Invalid JSON: {error}"
+                continue
+            if not isinstance(record, dict):
+                yield number, None, "Each line must be a JSON object"
+                continue
+            yield number, record, None
+    except UnicodeDecodeError:
+        yield None, None, "File is not valid UTF-8"
+    finally:
+        # Leave the underlying file open for its owner
+        text.detach()
+
+
+def validation_messages(error: ValidationError) -> list[str]:
+    return [f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}" for item in error.errors()]
+
+
+class JobImporter:
+    # Validates rows and inserts them in batches for one employer
+
+    def __init__(self, db: Session, employer_id: int, record: models.JobImports,
+                 batch_size: int | None = None, max_errors: int | None = None):
+        self.db = db
+        self.employer_id = employer_id
+        self.record = record
+        # Read at call time so configuration changes apply to the next import
+        self.batch_size = batch_size or config.JOB_IMPORT_BATCH_SIZE
+        self.max_errors = config.JOB_IMPORT_MAX_ERRORS if max_errors is None else max_errors
+        self.batch = []
+        self.errors = []
+        self.total = self.imported = self.failed = 0
+        # Postings without a location of their own are placed at the employer
+        self.employer_coordinates = dict(zip(
+            ("latitude", "longitude", "geohash"),
+            db.query(models.Employers.latitude, models.Employers.longitude, models.Employers.geohash)
+            .filter(models.Employers.employer_id == employer_id)
+            .one(),
+        ))
+        self.dedupe = config.DEDUPE_MODE in ("flag", "reject")
+        if self.dedupe:
+            dedupe.detector.refresh(db, employer_id)
+
+    def error(self, number, messages: list[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": number, "errors": messages})
+
+    def run(self, handle, file_format: str) -> None:
+        for number, fields, problem in read_rows(handle, file_format):
+            self.total += 1
+            if problem:
+                self.error(number, [problem])
+                continue
+            try:
+                job = JobImportRow(**fields)
+            except ValidationError as error:
+                self.error(number, validation_messages(error))
+                continue
+            self.batch.append((number, job))
+            if len(self.batch) >= self.batch_size:
+                self.flush()
+        self.flush()
+
+    def prepare(self, batch: list) -> tuple:
+        # Column values per row, plus same-batch duplicates as {position: original position}
+        kept, repeats = [], {}
+        earlier = dedupe.LSHIndex()
+        expires_at = default_expiry()
+        for number, job in batch:
+            signature = duplicate_of = None
+            if self.dedupe:
+                signature = dedupe.signature(job.title, job.description)
+                duplicate_of = dedupe.detector.find_duplicate(self.db, self.employer_id, signature, refresh=False)
+                original = earlier.matches(self.employer_id, signature) if duplicate_of is None else []
+                if (duplicate_of is not None or original) and config.DEDUPE_MODE == "reject":
+                    target = f"job {duplicate_of}" if duplicate_of is not None else f"row {kept[original[0]][0]}"
+                    self.error(number, [f"Duplicates {target}"])
+                    continue
+                if original:
+                    repeats[len(kept)] = original[0]
+                elif duplicate_of is None:
+                    earlier.add(self.employer_id, len(kept), signature)
+            coordinates = geo.coordinates_for(job.location) if job.location is not None else self.employer_coordinates
+            values = {
+                "employer_id": self.employer_id,
+                "title": job.title,
+                "description": job.description,
+                "job_type": job.job_type,
+                "location": job.location,
+                "pay_range": job.pay_range,
+                "is_active": True,
+                "expires_at": expires_at,
+                "duplicate_of": duplicate_of,
+                **coordinates,
+                **pay.parse_pay_range(job.pay_range).columns(),
+            }
+            kept.append((number, job, values, signature))
+        return kept, repeats
+
+    def insert(self, kept: list, repeats: dict) -> list[int]:
+        # One multi-row INSERT for the batch (ids in row order), then its signatures
+        job_ids = self.db.scalars(
+            insert(models.Jobs).returning(models.Jobs.job_id, sort_by_parameter_order=True),
+            [values for _, _, values, _ in kept],
+        ).all()
+        if repeats:
+            self.db.execute(update(models.Jobs), [
+                {"job_id": job_ids[position], "duplicate_of": job_ids[original]}
+                for position, original in repeats.items()
+            ])
+        signatures = [
+            {"job_id": job_id, "employer_id": self.employer_id, "signature": signature.tobytes()}
+            for job_id, (_, _, _, signature) in zip(job_ids, kept) if signature is not None
+        ]
+        if signatures:
+            self.db.execute(insert(models.JobSignatures), signatures)
+        versions.bump(self.db, versions.JOBS_CATALOG)
+        return job_ids
+
+    def flush(self) -> None:
+        batch, self.batch = self.batch, []
+        failed, logged = self.failed, len(self.errors)
+        kept = None
+        try:
+            kept, repeats = self.prepare(batch) if batch else ([], {})
+            job_ids = self.insert(kept, repeats) if kept else []
+            self.save_progress(self.imported + len(job_ids))
+        except Exception as error:
+            # One bad batch does not stop the import; its rows are reported
+            logger.exception("Job import batch failed")
+            self.db.rollback()
+            if kept is None:
+                # Failed while preparing (geocoding, duplicate check): every row of
+                # the batch is reported, replacing any rejections made before the error
+                self.failed = failed
+                del self.errors[logged:]
+                numbers = [number for number, _ in batch]
+            else:
+                numbers = [number for number, _, _, _ in kept]
+            for number in numbers:
+                self.error(number, [f"Could not be saved: {type(error).__name__}"])
+            self.save_progress(self.imported)
+            return
+        self.imported += len(job_ids)
+        for job_id, (_, _, _, signature) in zip(job_ids, kept):
+            if signature is not None:
+                dedupe.detector.add(self.employer_id, job_id, signature)
+        if config.RECOMMENDER_ENABLED and job_ids:
+            recommender.index.add_jobs([
+                (job_id, job.title, job.description, job.job_type, job.location)
+                for job_id, (_, job, _, _) in zip(job_ids, kept)
+            ])
+
+    def save_progress(self, imported: int) -> None:
+        # Committed with each batch so the status endpoint shows progress
+        self.db.execute(update(models.JobImports).where(models.JobImports.import_id == self.record.import_id).values(
+            total_rows=self.total,
+            imported_rows=imported,
+            failed_rows=self.failed,
+            errors=json.dumps(self.errors),
+        ))
+        self.db.commit()
+
+
+def import_file(db: Session, record: models.JobImports, handle, file_format: str) -> None:
+    # Run an import to completion, recording the outcome on record
+    importer = JobImporter(db, record.employer_id, record)
+    db.query(models.JobImports).filter(models.JobImports.import_id == record.import_id).update({"status": "running"})
+    db.commit()
+    try:
+        importer.run(handle, file_format)
+        status = "completed"
+    except Exception:
+        logger.exception("Job import %s failed", record.import_id)
+        db.rollback()
+        status = "failed"
+    db.query(models.JobImports).filter(models.JobImports.import_id == record.import_id).update(
+        {"status": status, "finished_at": utcnow()}
+    )
+    db.commit()
+    db.refresh(record)
+    if importer.imported:
+        # The employer's edge-cached responses (tagged employer-<id>) predate the new postings
+        edge_cache.get_purger().purge([edge_cache.employer_key(record.employer_id)])
+
+
+def import_saved_file(import_id: int, path: str, file_format: str) -> None:
+    # Background task for large uploads: import from the saved copy, then delete it
+    db = PrimarySessionLocal()
+    try:
+        record = db.get(models.JobImports, import_id)
+        with open(path, "rb") as handle:
+            import_file(db, record, handle, file_format)
+    except Exception:
+        logger.exception("Job import %s failed", import_id)
+        db.rollback()
+        db.query(models.JobImports).filter(models.JobImports.import_id == import_id).update(
+            {"status": "failed", "finished_at": utcnow()}
+        )
+        db.commit()
+    finally:
+        db.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def import_dict(record: models.JobImports) -> dict:
+    # JobImportRead-shaped view of an import
+    return {
+        "import_id": record.import_id,
+        "status": record.status,
+        "filename": record.filename,
+        "total_rows": record.total_rows,
+        "imported_rows": record.imported_rows,
+        "failed_rows": record.failed_rows,
+        "errors": json.loads(record.errors or "[]"),
+        "created_at": record.created_at,
+        "finished_at": record.finished_at,
+    }
@@ -1,22 +1,88 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, ConfigDict
 from typing import List, Annotated, Optional
 from datetime import datetime
 import models
-from database import engine, SessionLocal
+from database import engine, replicas, SessionLocal
 from sqlalchemy.orm import Session
 from routers import auth, financial_resource, jobs, profile, employers, admin
-from dotenv import load_dotenv
-load_dotenv()
+from compression import CompressionMiddleware
+import metrics
+from query_debug import QueryDebugMiddleware
+from tracing import TracingMiddleware
+from profiling import ProfilingMiddleware
+from rate_limit import RateLimitMiddleware
+from replica_routing import ReplicaRoutingMiddleware
+import tracing
+import config
+from revocation import revocations
+from job_expiry import scheduler as job_expiry_scheduler
+from archival import maintain_partitions
+import recommender
+import relevance
+import logging
 
 # Frontend dev origin for CORS
 origins = [
     "http://localhost:4200"
 ]
 
-app = FastAPI()
-models.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup work that touches the database, disk or exporters runs here,
+    # once per worker, instead of at import time
+    if config.DB_CREATE_ALL:
+        models.Base.metadata.create_all(bind=engine)
+    config.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        # No-op unless applications/notifications are partitioned (archival.py)
+        maintain_partitions()
+    except Exception:
+        logging.getLogger(__name__).exception("Partition maintenance failed")
+    # Load the revoked-token filter before the first request needs it
+    revocations.start()
+    if config.JOB_EXPIRY_ENABLED:
+        job_expiry_scheduler.start()
+    if config.RECOMMENDER_ENABLED:
+        recommender.index.start()
+    if config.RELEVANCE_ENABLED:
+        relevance.worker.start()
+    if config.TRACING_ENABLED:
+        tracing.configure_tracing()
+    yield
+    if config.TRACING_ENABLED:
+        # Flush spans still queued in the batch processor
+        tracing.disable_tracing()
+
+app = FastAPI(lifespan=lifespan)
+
+# gzip/Brotli for large JSON payloads (job feeds, admin listings)
+app.add_middleware(CompressionMiddleware)
+
+# Prometheus latency/DB metrics, exposed on /metrics
+if metrics.METRICS_ENABLED:
+    metrics.instrument_pool(engine)
+    app.add_middleware(metrics.MetricsMiddleware)
+    app.include_router(metrics.router)
+
+# Per-request statement counts (X-DB-Queries / X-DB-Time) and slow-query log
+app.add_middleware(QueryDebugMiddleware)
+
+# Root OpenTelemetry span per request (no-op unless TRACING_ENABLED=true)
+app.add_middleware(TracingMiddleware)
+
+# Admin-triggered (?profile=1) and 1-in-N sampled request profiling
+app.add_middleware(ProfilingMiddleware)
+
+# GET/HEAD reads go to READ_REPLICA_URLS, pinned to the primary after a client writes
+if replicas.engines:
+    app.add_middleware(ReplicaRoutingMiddleware)
+
+# Token-bucket limits on login/register/apply; runs before any endpoint work
+if config.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,173 @@
+"""Prometheus metrics: per-route latency, in-flight requests, DB time and pool usage.
+
+Metrics are labelled by route template (``/jobs/{job_id}``) rather than by raw
+path so the label set stays bounded. Per-request DB time and statement counts
+come from the cursor events in ``database.py``.
+
+When ``PROMETHEUS_MULTIPROC_DIR`` is set (required with more than one worker
+process), prometheus_client writes samples to that directory and ``/metrics``
+aggregates every worker through ``MultiProcessCollector``.
+"""
+import time
+
+from fastapi import APIRouter, Response
+from sqlalchemy import event
+
+import config
+from database import QueryStats, request_query_stats
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+except ImportError:  # pragma: no cover - exercised only without prometheus_client
+    generate_latest = None
+
+METRICS_ENABLED = generate_latest is not None and config.METRICS_ENABLED
+MULTIPROCESS = bool(config.PROMETHEUS_MULTIPROC_DIR)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+router = APIRouter(tags=["metrics"])
+
+if generate_latest is not None:
+    REQUEST_LATENCY = Histogram(
+        "hustlehub_http_request_duration_seconds",
+        "HTTP request latency by route template",
+        ["method", "route"],
+    )
+    REQUESTS_TOTAL = Counter(
+        "hustlehub_http_requests_total",
+        "HTTP responses by route template and status code",
+        ["method", "route", "status"],
+    )
+    REQUESTS_IN_PROGRESS = Gauge(
+        "hustlehub_http_requests_in_progress",
+        "HTTP requests currently being handled",
+        ["method"],
+        multiprocess_mode="livesum",
+    )
+    DB_TIME = Histogram(
+        "hustlehub_db_request_duration_seconds",
+        "Time spent executing SQL per request",
+        ["route"],
+        buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+    )
+    DB_QUERIES = Histogram(
+        "hustlehub_db_request_queries",
+        "SQL statements executed per request",
+        ["route"],
+        buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+    )
+    DB_POOL_IN_USE = Gauge(
+        "hustlehub_db_pool_connections_in_use",
+        "Pooled connections currently checked out",
+        multiprocess_mode="livesum",
+    )
+    DB_POOL_OPEN = Gauge(
+        "hustlehub_db_pool_connections_open",
+        "Connections currently opened by the pool",
+        multiprocess_mode="livesum",
+    )
+    DB_POOL_SIZE = Gauge(
+        "hustlehub_db_pool_size",
+        "Configured pool size",
+        multiprocess_mode="livesum",
+    )
+
+
+def route_template(scope) -> str:
+    # Path template of the route that handled this request (set by the router)
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", UNMATCHED_ROUTE)
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        return getattr(endpoint, "__name__", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+def instrument_pool(engine) -> None:
+    # Track pool usage through SQLAlchemy pool events
+    if generate_latest is None:
+        return
+    size = getattr(engine.pool, "size", None)
+    if callable(size):
+        DB_POOL_SIZE.set(size())
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        DB_POOL_OPEN.inc()
+
+    @event.listens_for(engine, "close")
+    def _on_close(dbapi_connection, connection_record):
+        DB_POOL_OPEN.dec()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_IN_USE.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        DB_POOL_IN_USE.dec()
+
+
+class MetricsMiddleware:
+    # ASGI middleware recording latency, status and DB usage per route template
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        # Reuse stats started by an outer middleware so statements are counted once
+        stats = request_query_stats.get()
+        token = None
+        if stats is None:
+            stats = QueryStats(scope)
+            token = request_query_stats.set(stats)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = route_template(scope)
+            REQUEST_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+            REQUESTS_TOTAL.labels(method, route, str(status_code)).inc()
+            DB_TIME.labels(route).observe(stats.total_time)
+            DB_QUERIES.labels(route).observe(stats.count)
+            in_progress.dec()
+            if token is not None:
+                request_query_stats.reset(token)
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    # Prometheus scrape endpoint; aggregates all workers in multiprocess mode
+    if generate_latest is None:
+        return Response("prometheus_client is not installed", status_code=503)
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, CheckConstraint, TIMESTAMP, Index
+from sqlalchemy import BigInteger, Boolean, Column, Float, ForeignKey, Integer, LargeBinary, Numeric, String, Text, CheckConstraint, TIMESTAMP, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
@@ -16,6 +16,8 @@ class Users(Base):
     phone = Column(String(20))
     resume_file = Column(String(500))
     created_at = Column(TIMESTAMP, default=func.current_timestamp())
+    # Bumped to invalidate every refresh token issued to this user
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     employer = relationship("Employers", back_populates="user", uselist=False, cascade="all, delete")
     applications = relationship("Applications", back_populates="user", cascade="all, delete")
@@ -35,6 +37,10 @@ class Employers(Base):
     description = Column(Text)
     website = Column(String(200))
     location = Column(String(100))
+    # Geocoded from location (geo.py); geohash uses byte ordering so prefix ranges can use the index
+    latitude = Column(Float)
+    longitude = Column(Float)
+    geohash = Column(String(12).with_variant(String(12, collation="C"), "postgresql"))
     
     user = relationship("Users", back_populates="employer")
     jobs = relationship("Jobs", back_populates="employer", cascade="all, delete")
@@ -50,8 +56,20 @@ class Jobs(Base):
     job_type = Column(String(50))
     location = Column(String(100))
     pay_range = Column(String(50))
+    # Parsed from pay_range (pay.py): amounts are hourly equivalents, pay_period the unit quoted
+    pay_min = Column(Numeric(12, 4, asdecimal=False))
+    pay_max = Column(Numeric(12, 4, asdecimal=False))
+    pay_period = Column(String(10))
     date_posted = Column(TIMESTAMP, default=func.current_timestamp())
     is_active = Column(Boolean, default=True)
+    # Past this the expiry scheduler deactivates the posting (NULL = never)
+    expires_at = Column(TIMESTAMP)
+    # Geocoded from location (geo.py); geohash uses byte ordering so prefix ranges can use the index
+    latitude = Column(Float)
+    longitude = Column(Float)
+    geohash = Column(String(12).with_variant(String(12, collation="C"), "postgresql"))
+    # Set when the posting is a near-duplicate of one of the employer's active postings (dedupe.py)
+    duplicate_of = Column(Integer, ForeignKey('jobs.job_id', ondelete='SET NULL'))
     
     employer = relationship("Employers", back_populates="jobs")
     applications = relationship("Applications", back_populates="job", cascade="all, delete")
@@ -60,6 +78,66 @@ class Jobs(Base):
         CheckConstraint("job_type IN ('full-time', 'part-time', 'gig', 'temporary', 'internship')", name='jobs_job_type_check'),
         Index('idx_jobs_location', 'location'),
         Index('idx_jobs_type', 'job_type'),
+        # Partial indexes over live postings only, so they stay small however much history accumulates
+        Index('idx_jobs_active_date_posted', date_posted.desc(), postgresql_where=is_active, sqlite_where=is_active == True),
+        Index('idx_jobs_active_expires_at', expires_at, postgresql_where=is_active, sqlite_where=is_active == True),
+        Index('idx_jobs_active_geohash', geohash, postgresql_where=is_active, sqlite_where=is_active == True),
+        CheckConstraint("pay_period IN ('hourly', 'annual')", name='jobs_pay_period_check'),
+        # sort=pay / min_pay / max_pay; SQLite sorts NULLs last under DESC already but rejects NULLS LAST in an index
+        Index('idx_jobs_active_pay', pay_max.desc().nulls_last(), pay_min, postgresql_where=is_active).ddl_if(dialect='postgresql'),
+        Index('idx_jobs_active_pay_sqlite', pay_max.desc(), pay_min, sqlite_where=is_active == True).ddl_if(dialect='sqlite'),
+    )
+
+
+class JobSignatures(Base):
+    # MinHash signature of a posting's title and description (dedupe.py)
+    __tablename__ = 'job_signatures'
+
+    job_id = Column(Integer, ForeignKey('jobs.job_id', ondelete='CASCADE'), primary_key=True)
+    employer_id = Column(Integer, ForeignKey('employers.employer_id', ondelete='CASCADE'), nullable=False)
+    signature = Column(LargeBinary, nullable=False)
+
+    __table_args__ = (
+        Index('idx_job_signatures_employer', 'employer_id', 'job_id'),
+    )
+
+
+class JobImports(Base):
+    # A bulk job import and its progress (job_import.py)
+    __tablename__ = 'job_imports'
+
+    import_id = Column(Integer, primary_key=True, autoincrement=True)
+    employer_id = Column(Integer, ForeignKey('employers.employer_id', ondelete='CASCADE'), nullable=False)
+    filename = Column(String(255))
+    status = Column(String(20), nullable=False, default='pending')
+    total_rows = Column(Integer, nullable=False, default=0)
+    imported_rows = Column(Integer, nullable=False, default=0)
+    failed_rows = Column(Integer, nullable=False, default=0)
+    # JSON list of {"row": n, "errors": [...]}, capped at JOB_IMPORT_MAX_ERRORS
+    errors = Column(Text, nullable=False, default='[]')
+    created_at = Column(TIMESTAMP, default=func.current_timestamp())
+    finished_at = Column(TIMESTAMP)
+
+    __table_args__ = (
+        CheckConstraint("status IN ('pending', 'running', 'completed', 'failed')", name='job_imports_status_check'),
+        Index('idx_job_imports_employer', 'employer_id'),
+    )
+
+
+class ApplicationScores(Base):
+    # Applicant-to-job relevance per job version (relevance.py). No foreign key to
+    # applications: its primary key includes date_applied once it is partitioned
+    __tablename__ = 'application_scores'
+
+    application_id = Column(Integer, primary_key=True)
+    job_version = Column(String(16), primary_key=True)
+    job_id = Column(Integer, ForeignKey('jobs.job_id', ondelete='CASCADE'), nullable=False)
+    resume_version = Column(String(40))
+    score = Column(Float, nullable=False)
+    computed_at = Column(TIMESTAMP, nullable=False)
+
+    __table_args__ = (
+        Index('idx_application_scores_job', 'job_id'),
     )
 
 
@@ -99,6 +177,37 @@ class Notifications(Base):
         Index('idx_notifications_user', 'user_id'),
     )
 
+# Cold storage for old applications/notifications (see archival.py). Same
+# columns as the live tables, so rows and detached partitions copy across as-is.
+class ApplicationsArchive(Base):
+    __tablename__ = 'applications_archive'
+
+    application_id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey('jobs.job_id', ondelete='CASCADE'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
+    cover_letter = Column(Text)
+    status = Column(String(20))
+    date_applied = Column(TIMESTAMP)
+
+    __table_args__ = (
+        Index('idx_applications_archive_user', 'user_id'),
+        Index('idx_applications_archive_job', 'job_id'),
+    )
+
+
+class NotificationsArchive(Base):
+    __tablename__ = 'notifications_archive'
+
+    notification_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
+    message = Column(Text, nullable=False)
+    is_read = Column(Boolean)
+    created_at = Column(TIMESTAMP)
+
+    __table_args__ = (
+        Index('idx_notifications_archive_user', 'user_id'),
+    )
+
 class FinancialResources(Base):
     __tablename__ = 'financial_resources'
 
@@ -129,3 +238,27 @@ class ResourceLikes(Base):
         # Ensure a user can only like a resource once
         {'sqlite_autoincrement': True},
     )
+
+class CacheVersions(Base):
+    __tablename__ = 'cache_versions'
+
+    # Monotonic counters used to build ETags (e.g. the jobs catalog, a user's applications)
+    name = Column(String(100), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+class RevokedTokens(Base):
+    __tablename__ = 'revoked_tokens'
+
+    # Workers sync by id (plus a recent revoked_at window), so it only ever grows
+    revoked_id = Column(BigInteger().with_variant(Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    # A token's jti, or "user:<id>:v<version>" to revoke every token of that user version
+    jti = Column(String(64), unique=True, nullable=False)
+    # Once the token would have expired anyway the row can be pruned
+    expires_at = Column(TIMESTAMP, nullable=False)
+    revoked_at = Column(TIMESTAMP, default=func.current_timestamp())
+
+    __table_args__ = (
+        Index('idx_revoked_tokens_expires_at', 'expires_at'),
+        # Each sync re-reads a window of recent revocations
+        Index('idx_revoked_tokens_revoked_at', 'revoked_at'),
+    )
@@ -0,0 +1,127 @@
+"""Structured pay from the free-text ``pay_range`` of a posting.
+
+``parse_pay_range`` turns strings such as "$15.50/hr", "$16-$18/hr + tips",
+"$50,000 - $60,000 per year" or "$60k-80k" into:
+    pay_period  - the unit the posting quoted, normalized to "hourly" or
+                  "annual" (daily and weekly pay count as hourly, monthly as
+                  annual)
+    pay_min/max - the range as an hourly equivalent (annual / 2080 hours), so
+                  every posting sorts and filters on one scale and one index
+
+Text without a recognisable amount (or quoted per shift/project/delivery)
+leaves all three NULL; such postings are excluded by pay filters and sort
+last under ``sort=pay``.
+
+Rows written before these columns existed are parsed with:
+    python pay.py backfill
+"""
+import re
+import sys
+from dataclasses import dataclass
+
+from sqlalchemy.orm import Session
+
+HOURS_PER_DAY = 8
+HOURS_PER_WEEK = 40
+HOURS_PER_YEAR = 2080
+PAY_PERIODS = ("hourly", "annual")
+
+_NUMBER = r"(\d[\d,]*(?:\.\d+)?)\s*(k\b)?"
+_AMOUNT = re.compile(_NUMBER)
+# "16-18", "$16 - $18", "60k to 80k"; anything after the range ("+ 401k") is ignored
+_RANGE = re.compile(_NUMBER + r"\s*(?:-|–|to)\s*\$?\s*" + _NUMBER)
+# Unit words -> (period stored, hours that one unit of pay covers)
+_UNITS = [
+    (re.compile(r"/\s*h(ou)?r\b|\bper\s+h(ou)?r\b|\bhourly\b|\ban?\s+hour\b|/\s*h\b"), ("hourly", 1)),
+    (re.compile(r"/\s*day\b|\bper\s+day\b|\bdaily\b|\ba\s+day\b"), ("hourly", HOURS_PER_DAY)),
+    (re.compile(r"/\s*w(ee)?k\b|\bper\s+w(ee)?k\b|\bweekly\b|\ba\s+week\b"), ("hourly", HOURS_PER_WEEK)),
+    (re.compile(r"/\s*mo(nth)?\b|\bper\s+month\b|\bmonthly\b|\ba\s+month\b"), ("annual", HOURS_PER_YEAR / 12)),
+    (re.compile(r"/\s*y(ea)?r\b|\bper\s+y(ea)?r\b|\bannual(ly)?\b|\ba\s+year\b|\bsalary\b|/\s*yr\b"), ("annual", HOURS_PER_YEAR)),
+]
+# Pay per unit of work has no hourly equivalent
+_PIECE_RATE = re.compile(r"/\s*(shift|project|gig|delivery|task)\b|\bper\s+(shift|project|gig|delivery|task)\b")
+
+
+@dataclass(frozen=True)
+class Pay:
+    pay_min: float | None = None
+    pay_max: float | None = None
+    pay_period: str | None = None
+
+    def columns(self) -> dict:
+        return {"pay_min": self.pay_min, "pay_max": self.pay_max, "pay_period": self.pay_period}
+
+
+def to_hourly(amount: float, period: str) -> float:
+    # Filter values and stored amounts are rounded alike so boundaries compare equal
+    return round(amount / HOURS_PER_YEAR if period == "annual" else amount, 4)
+
+
+def parse_pay_range(text: str | None) -> Pay:
+    if not text:
+        return Pay()
+    lowered = text.lower()
+    match = _RANGE.search(lowered) or _AMOUNT.search(lowered)
+    if not match:
+        return Pay()
+    groups = match.groups()
+    amounts = []
+    for number, thousands in zip(groups[::2], groups[1::2]):
+        value = float(number.replace(",", ""))
+        amounts.append((value * 1000 if thousands else value, bool(thousands)))
+    if len(amounts) == 2 and amounts[1][1] and not amounts[0][1] and amounts[0][0] < 1000:
+        # "$60-80k": the k applies to both ends
+        amounts[0] = (amounts[0][0] * 1000, True)
+    low, high = min(a for a, _ in amounts), max(a for a, _ in amounts)
+
+    unit = next((found for pattern, found in _UNITS if pattern.search(lowered)), None)
+    if unit is None:
+        if _PIECE_RATE.search(lowered):
+            return Pay()
+        # No unit given: salaries are quoted in thousands, wages are not
+        unit = ("annual", HOURS_PER_YEAR) if high >= 1000 else ("hourly", 1)
+    period, hours = unit
+    return Pay(round(low / hours, 4), round(high / hours, 4), period)
+
+
+def backfill(db: Session, batch_size: int = 1000) -> int:
+    # Parse pay_range for jobs that have one but no structured pay yet
+    import models
+    import versions
+
+    updated = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.query(models.Jobs.job_id, models.Jobs.pay_range)
+            .filter(models.Jobs.job_id > last_id, models.Jobs.pay_range.isnot(None), models.Jobs.pay_period.is_(None))
+            .order_by(models.Jobs.job_id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return updated
+        last_id = rows[-1][0]
+        changed = 0
+        for job_id, pay_range in rows:
+            parsed = parse_pay_range(pay_range)
+            if parsed.pay_period:
+                db.query(models.Jobs).filter(models.Jobs.job_id == job_id).update(parsed.columns(), synchronize_session=False)
+                changed += 1
+        if changed:
+            # Pay filters and sort=pay see new values, so cached feeds (ETags) are stale
+            versions.bump(db, versions.JOBS_CATALOG)
+        updated += changed
+        db.commit()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["backfill"]:
+        sys.exit("usage: python pay.py backfill")
+    from database import PrimarySessionLocal
+
+    session = PrimarySessionLocal()
+    try:
+        print(f"Parsed pay for {backfill(session)} jobs")
+    finally:
+        session.close()
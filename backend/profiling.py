@@ -0,0 +1,276 @@
+"""On-demand request profiling for admins, plus a rolling 1-in-N sampler.
+
+An admin adds ``?profile=1`` (or the ``X-Profile: 1`` header) to any request
+to have it profiled. The report is stored and its name returned in
+``X-Profile-Report``. ``?profile=html`` returns the HTML report in place of
+the normal response. Non-admins are checked through ``require_admin`` and
+their flag is silently ignored.
+
+With ``PROFILE_SAMPLE_EVERY=N`` every Nth request handled by a worker is
+profiled as well. Reports go to a ring buffer of ``PROFILE_RING_SIZE`` files
+under ``PROFILE_DIR``, so disk use stays bounded.
+
+Sync endpoints and dependencies run in the threadpool, so per-thread
+profilers (cProfile, pyinstrument) started in the middleware would not see
+them. ``StackSampler`` instead reads thread stacks with
+``sys._current_frames()`` and keeps stacks that pass through application
+code. For a request it only keeps the threads working on that request: the
+event loop while the request's task is the one running, and threadpool
+workers running a copy of the request's context (anyio runs each call with
+``Context.run``, so the copied context is a local of the worker's run loop).
+Concurrent requests and background threads (relevance scoring, recommender
+sync) stay out of the report. Reports are folded stacks
+(``frame;frame;frame count``), which flamegraph.pl and speedscope render
+directly.
+"""
+import asyncio
+import contextvars
+import html
+import itertools
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+import config
+
+PROFILE_DIR = config.PROFILE_DIR
+PROFILE_RING_SIZE = config.PROFILE_RING_SIZE
+PROFILE_SAMPLE_EVERY = config.PROFILE_SAMPLE_EVERY
+PROFILE_INTERVAL_MS = config.PROFILE_INTERVAL_MS
+
+# Only stacks that pass through files under the backend directory are kept
+APP_ROOT = str(Path(__file__).resolve().parent)
+
+REPORT_NAME = re.compile(r"^[A-Za-z0-9_.-]+\.folded$")
+
+# Set by the middleware while a request is profiled; threadpool calls inherit it
+_profiled_request = contextvars.ContextVar("profiled_request", default=None)
+
+# A worker's run loop sits within this many frames of the bottom of its stack
+_RUN_LOOP_DEPTH = 8
+
+
+class StackSampler:
+    # Background thread sampling thread stacks into folded-stack counts; with
+    # for_current_request() only the threads serving that request are kept
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_MS / 1000, root: str = APP_ROOT):
+        self.interval = interval
+        self.root = root
+        self.marker = None
+        self.loop_thread = None
+        self.task = None
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def for_current_request(self):
+        # Call from the request's task before handing it to the app; returns a
+        # token for _profiled_request.reset()
+        self.marker = object()
+        self.loop_thread = threading.get_ident()
+        self.task = asyncio.current_task()
+        return _profiled_request.set(self.marker)
+
+    def serves_request(self, thread_id: int, frames: list) -> bool:
+        # frames runs from the innermost frame outwards
+        if self.marker is None:
+            return True
+        if thread_id == self.loop_thread:
+            return asyncio.current_task(self.task.get_loop()) is self.task
+        for frame in frames[-_RUN_LOOP_DEPTH:]:
+            for value in frame.f_locals.values():
+                if isinstance(value, contextvars.Context):
+                    return value.get(_profiled_request) is self.marker
+        return False
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.is_set():
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames = []
+                in_app = False
+                while frame is not None:
+                    if frame.f_code.co_filename.startswith(self.root):
+                        in_app = True
+                    frames.append(frame)
+                    frame = frame.f_back
+                if in_app and self.serves_request(thread_id, frames):
+                    stack = (f"{Path(f.f_code.co_filename).name}:{f.f_code.co_name}:{f.f_lineno}" for f in reversed(frames))
+                    self.stacks[";".join(stack)] += 1
+            self.samples += 1
+            self._stop.wait(self.interval)
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+def render_html(folded: str, title: str = "Profile") -> str:
+    # Inclusive sample counts per frame plus the raw folded stacks
+    inclusive = Counter()
+    total = 0
+    for line in folded.splitlines():
+        if not line.strip():
+            continue
+        stack, _, count = line.rpartition(" ")
+        count = int(count)
+        total += count
+        for frame in set(stack.split(";")):
+            inclusive[frame] += count
+    rows = "".join(
+        f"<tr><td>{count}</td><td>{count * 100 / total:.1f}%</td><td>{html.escape(frame)}</td></tr>"
+        for frame, count in inclusive.most_common(100)
+    ) if total else ""
+    return (
+        f"<!doctype html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title></head><body>"
+        f"<h1>{html.escape(title)}</h1><p>{total} samples</p>"
+        "<table><tr><th>samples</th><th>inclusive</th><th>frame</th></tr>"
+        f"{rows}</table><h2>Folded stacks</h2><pre>{html.escape(folded)}</pre></body></html>"
+    )
+
+
+class ProfileStore:
+    # Ring buffer of folded-stack reports on disk
+
+    def __init__(self, directory: Path | None = None, max_reports: int | None = None):
+        self.directory = Path(directory or PROFILE_DIR)
+        self.max_reports = max_reports or PROFILE_RING_SIZE
+
+    def save(self, name: str, folded: str) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / name
+        path.write_text(folded)
+        reports = sorted(self.directory.glob("*.folded"), key=lambda p: p.stat().st_mtime)
+        for old in reports[:-self.max_reports]:
+            old.unlink(missing_ok=True)
+        return path
+
+    def list(self) -> list[str]:
+        if not self.directory.exists():
+            return []
+        reports = sorted(self.directory.glob("*.folded"), key=lambda p: p.stat().st_mtime, reverse=True)
+        return [p.name for p in reports]
+
+    def read(self, name: str) -> str | None:
+        if not REPORT_NAME.match(name):
+            return None
+        path = self.directory / name
+        return path.read_text() if path.exists() else None
+
+
+def requested_mode(scope) -> str | None:
+    # "store", "html" or None depending on ?profile= / X-Profile
+    values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("profile", [])
+    value = values[0] if values else None
+    if value is None:
+        for name, header in scope["headers"]:
+            if name == b"x-profile":
+                value = header.decode("latin-1")
+                break
+    if not value or value in ("0", "false"):
+        return None
+    return "html" if value == "html" else "store"
+
+
+def is_admin_request(scope) -> bool:
+    # Run the request's auth cookie through the existing guards (claims only, no DB)
+    from fastapi import HTTPException
+    from routers.admin import require_admin
+    from routers.auth import get_claims
+
+    try:
+        require_admin(get_claims(Request(scope)))
+        return True
+    except HTTPException:
+        return False
+
+
+def report_name(scope) -> str:
+    path = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{time.perf_counter_ns() % 10**9:09d}-{scope['method']}-{path[:60]}.folded"
+
+
+class ProfilingMiddleware:
+    # ASGI middleware profiling admin-flagged requests and 1-in-N sampled ones
+
+    def __init__(self, app, store: ProfileStore | None = None, sample_every: int = PROFILE_SAMPLE_EVERY):
+        self.app = app
+        self.store = store
+        self.sample_every = sample_every
+        self.counter = itertools.count(1)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        mode = requested_mode(scope)
+        if mode is not None and not await run_in_threadpool(is_admin_request, scope):
+            mode = None
+        if mode is None and not (self.sample_every and next(self.counter) % self.sample_every == 0):
+            await self.app(scope, receive, send)
+            return
+
+        name = report_name(scope)
+        sampler = StackSampler()
+        token = sampler.for_current_request()
+        sampler.start()
+
+        if mode == "html":
+            # Swallow the real response and answer with the report instead
+            async def discard(message):
+                pass
+
+            try:
+                await self.app(scope, receive, discard)
+            finally:
+                sampler.stop()
+                _profiled_request.reset(token)
+            folded = sampler.folded()
+            (self.store or ProfileStore()).save(name, folded)
+            body = render_html(folded, f"{scope['method']} {scope['path']} ({sampler.elapsed * 1000:.1f} ms)").encode()
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/html; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-profile-report", name.encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_wrapper(message):
+            # Only admins who asked for the report learn its name
+            if message["type"] == "http.response.start" and mode == "store":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-report", name.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            _profiled_request.reset(token)
+            (self.store or ProfileStore()).save(name, sampler.folded())
@@ -0,0 +1,105 @@
+"""Per-request SQL statement counting, debug headers and slow-query logging.
+
+``QueryDebugMiddleware`` counts the statements a request runs and the time
+spent in the database, using the cursor events in ``database.py``. When
+``DB_DEBUG_HEADERS`` is enabled the totals are returned as ``X-DB-Queries``
+and ``X-DB-Time`` (milliseconds) so N+1 patterns show up in the browser's
+network tab long before they show up in production latency.
+
+Statements slower than ``SLOW_QUERY_MS`` are logged with the route that ran
+them. Bound parameters are never logged, only their types.
+
+``count_queries`` backs the ``query_budget`` pytest fixture, which fails a
+test when an endpoint runs more statements than it declares.
+"""
+import logging
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import config
+from database import QueryStats, request_query_stats
+from metrics import route_template
+
+logger = logging.getLogger("hustlehub.slow_query")
+
+DB_DEBUG_HEADERS = config.DB_DEBUG_HEADERS
+SLOW_QUERY_MS = config.SLOW_QUERY_MS
+
+
+def redact_parameters(parameters) -> str:
+    # Describe bound parameters by type only so values never reach the logs
+    if parameters is None:
+        return "[]"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: <{type(value).__name__}>" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany: one parameter set per row
+            return f"[{len(parameters)} parameter sets]"
+        return "[" + ", ".join(f"<{type(value).__name__}>" for value in parameters) + "]"
+    return f"<{type(parameters).__name__}>"
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _log_slow_query(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_start_time")
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if elapsed_ms < SLOW_QUERY_MS:
+        return
+    stats = request_query_stats.get()
+    route = route_template(stats.scope) if stats is not None and stats.scope is not None else "<no request>"
+    logger.warning(
+        "Slow query (%.1f ms) on %s: %s params=%s",
+        elapsed_ms,
+        route,
+        " ".join(statement.split()),
+        redact_parameters(parameters),
+    )
+
+
+class QueryDebugMiddleware:
+    # ASGI middleware tracking statements per request and exposing them as headers
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        token = request_query_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and DB_DEBUG_HEADERS:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode("latin-1")))
+                headers.append((b"x-db-time", f"{stats.total_time * 1000:.3f}".encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_query_stats.reset(token)
+
+
+@contextmanager
+def count_queries():
+    # Collect every statement executed (from any thread) while the block runs
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+
+    event.listen(Engine, "after_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "after_cursor_execute", _record)
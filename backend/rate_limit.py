@@ -0,0 +1,249 @@
+"""Token-bucket rate limiting for expensive and abuse-prone endpoints.
+
+``RateLimitMiddleware`` checks each request against the ``Rule`` list before
+the request reaches routing, so a throttled login is rejected with 429 before
+the user lookup or the pbkdf2 work in ``verify_password`` ever runs.
+
+Each rule names a route (method + path template), what the bucket is keyed
+by and the bucket shape:
+    ip     - client address
+    user   - user id from the access token cookie (falls back to ip)
+    email  - ``email`` field of the JSON body (falls back to ip)
+
+A bucket holds up to ``capacity`` tokens and refills at ``capacity`` tokens
+per ``period`` seconds; each request takes one. Rejected requests get a
+``Retry-After`` header with the seconds until a token is available.
+
+Bucket state lives in a backend chosen with ``RATE_LIMIT_BACKEND``:
+    memory - per-process dict (default; limits are per worker)
+    redis  - shared across workers through RATE_LIMIT_REDIS_URL
+"""
+import json
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import config
+from security import decode_access_token
+
+try:
+    import redis.asyncio as aioredis
+    from redis.exceptions import WatchError
+except ImportError:  # pragma: no cover - exercised only without redis
+    aioredis = None
+
+
+@dataclass(frozen=True)
+class Rule:
+    method: str
+    path: str
+    key: str
+    capacity: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        # Tokens regained per second
+        return self.capacity / self.period
+
+    @property
+    def pattern(self) -> re.Pattern:
+        return re.compile("^" + re.sub(r"\{[^/]+\}", "[^/]+", self.path) + "$")
+
+
+DEFAULT_RULES = [
+    # Credential stuffing: bound attempts per address and per targeted account
+    Rule("POST", "/auth/login", "ip", capacity=20, period=60),
+    Rule("POST", "/auth/login", "email", capacity=5, period=300),
+    Rule("POST", "/auth/register", "ip", capacity=10, period=3600),
+    Rule("PUT", "/profile/change-password", "user", capacity=5, period=300),
+    Rule("DELETE", "/profile/delete-account", "user", capacity=5, period=300),
+    Rule("POST", "/admin/verify-password", "user", capacity=5, period=300),
+    Rule("POST", "/jobs/{job_id}/apply", "user", capacity=30, period=3600),
+]
+
+
+def take_token(tokens: float | None, updated: float | None, now: float, capacity: int, rate: float):
+    # Refill then try to take one token; returns (allowed, tokens_left, retry_after)
+    if tokens is None:
+        tokens = float(capacity)
+    else:
+        tokens = min(float(capacity), tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return True, tokens - 1, 0.0
+    return False, tokens, (1 - tokens) / rate
+
+
+class InMemoryBackend:
+    # Buckets in a bounded LRU dict; only limits requests within one process
+
+    def __init__(self, max_keys: int = config.RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    async def take(self, key: str, capacity: int, rate: float):
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.pop(key, (None, None))
+            allowed, tokens, retry_after = take_token(tokens, updated, now, capacity, rate)
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+class RedisBackend:
+    # Buckets in Redis hashes, updated optimistically with WATCH/MULTI/EXEC
+
+    def __init__(self, client=None, url: str = config.RATE_LIMIT_REDIS_URL):
+        self.client = client if client is not None else aioredis.from_url(url)
+
+    async def take(self, key: str, capacity: int, rate: float):
+        key = f"ratelimit:{key}"
+        # A bucket left alone this long is full again, so it can expire
+        ttl_ms = max(1, math.ceil(capacity / rate * 1000))
+        async with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    tokens, updated = await pipe.hmget(key, "tokens", "updated")
+                    now = time.time()
+                    allowed, tokens, retry_after = take_token(
+                        float(tokens) if tokens is not None else None,
+                        float(updated) if updated is not None else None,
+                        now,
+                        capacity,
+                        rate,
+                    )
+                    pipe.multi()
+                    pipe.hset(key, mapping={"tokens": tokens, "updated": now})
+                    pipe.pexpire(key, ttl_ms)
+                    await pipe.execute()
+                    return allowed, retry_after
+                except WatchError:
+                    # Another worker changed the bucket between WATCH and EXEC
+                    continue
+
+
+def get_backend():
+    if config.RATE_LIMIT_BACKEND == "redis":
+        if aioredis is None:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the redis package")
+        return RedisBackend()
+    return InMemoryBackend()
+
+
+def client_ip(scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def user_id_from_cookie(scope) -> str | None:
+    # Verified "sub" of the access token; signature checks are cheap HMACs
+    from routers.auth import COOKIE_NAME
+
+    for name, value in scope["headers"]:
+        if name != b"cookie":
+            continue
+        for part in value.decode("latin-1").split(";"):
+            cookie, _, token = part.strip().partition("=")
+            if cookie == COOKIE_NAME and token:
+                payload = decode_access_token(token)
+                return str(payload["sub"]) if payload else None
+    return None
+
+
+def email_from_body(body: bytes) -> str | None:
+    try:
+        email = json.loads(body).get("email")
+    except (ValueError, AttributeError):
+        return None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+class RateLimitMiddleware:
+    # ASGI middleware rejecting requests that exceed a matching rule with 429
+
+    def __init__(self, app, rules: list[Rule] | None = None, backend=None):
+        self.app = app
+        self.rules = [(rule, rule.pattern) for rule in (rules if rules is not None else DEFAULT_RULES)]
+        self.backend = backend if backend is not None else get_backend()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        matching = [rule for rule, pattern in self.rules if rule.method == scope["method"] and pattern.match(scope["path"])]
+        if not matching:
+            await self.app(scope, receive, send)
+            return
+
+        if any(rule.key == "email" for rule in matching):
+            # Read the (small) body once and replay it to the endpoint
+            body = await read_body(receive)
+            receive = replay(body, receive)
+            email = email_from_body(body)
+        else:
+            email = None
+
+        retry_after = 0.0
+        for rule in matching:
+            if rule.key == "email" and email:
+                identity = f"email:{email}"
+            elif rule.key == "user" and (user_id := user_id_from_cookie(scope)):
+                identity = f"user:{user_id}"
+            else:
+                identity = f"ip:{client_ip(scope)}"
+            allowed, wait = await self.backend.take(f"{rule.method}:{rule.path}:{identity}", rule.capacity, rule.rate)
+            if not allowed:
+                retry_after = max(retry_after, wait)
+
+        if retry_after:
+            await reject(send, retry_after)
+            return
+        await self.app(scope, receive, send)
+
+
+async def read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+def replay(body: bytes, receive):
+    # Hand the buffered body back once, then defer to the connection (disconnects)
+    sent = False
+
+    async def replayed():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replayed
+
+
+async def reject(send, retry_after: float):
+    body = json.dumps({"detail": "Too many requests, please try again later"}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(math.ceil(retry_after)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,409 @@
+"""Job recommendations from TF-IDF similarity to the jobs an applicant applied to.
+
+Job text (title twice, description, job type, location) is tokenized and
+hashed into ``RECOMMENDER_FEATURES`` columns, so there is no vocabulary to
+keep in sync and a new job can be vectorized on its own. Rows are sublinear
+TF times IDF, L2-normalized.
+
+The index has two segments:
+    base  - every active job at the last build, stored as a CSC matrix in
+            .npy files under ``RECOMMENDER_DIR/<generation>/`` and opened with
+            mmap_mode="r", so all workers share one copy in the page cache
+    delta - jobs created since, held per worker: create_job adds its own
+            posting immediately and a background thread picks up the other
+            workers' postings from the database every RECOMMENDER_SYNC_SECONDS
+
+Job ids are assigned at insert, not at commit, so a posting can become
+visible after one with a higher id. Each sync therefore reads postings above
+the highest id seen plus those posted within
+``RECOMMENDER_SYNC_OVERLAP_SECONDS`` of the previous read (a generation
+records when its catalog was read); ones already indexed are skipped.
+
+When the delta passes ``RECOMMENDER_REBUILD_ROWS`` rows or the base is older
+than ``RECOMMENDER_REBUILD_SECONDS``, one worker (under a file lock) builds a
+new generation and flips ``RECOMMENDER_DIR/CURRENT``; the others switch to it
+on their next sync. IDF weights are fixed per generation.
+
+A user's profile is the sum of their applied jobs' vectors, cut to its
+``PROFILE_FEATURES`` heaviest columns. Scoring is one sparse product of the
+base columns for those features with the profile weights (cost proportional
+to the postings sharing a term, not to the catalog size), plus the same for
+the delta. Build from the command line with:
+    python recommender.py build
+
+numpy and scipy are imported on first use, not with the module, so they stay
+off the app's import path (routers.jobs imports this module) until the index
+is loaded or a job is vectorized.
+"""
+import logging
+import math
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+from sqlalchemy import or_
+
+import config
+from database import PrimarySessionLocal
+import models
+from revocation import utcnow
+
+if TYPE_CHECKING:
+    import numpy as np
+    import scipy.sparse as sp
+
+logger = logging.getLogger(__name__)
+
+# Heaviest profile terms used for scoring
+PROFILE_FEATURES = 64
+# Candidates handed to the database (inactive and applied jobs are dropped there)
+CANDIDATES = 200
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our the this to we will with you your "
+    "job jobs work working must able".split()
+)
+
+
+def tokens(title: str | None, description: str | None, job_type: str | None, location: str | None) -> list[str]:
+    words = []
+    for text, repeat in ((title, 2), (description, 1)):
+        found = [word for word in _TOKEN.findall((text or "").lower()) if len(word) > 1 and word not in _STOP_WORDS]
+        words += found * repeat
+    if job_type:
+        words.append(f"type:{job_type.lower()}")
+    words += [f"loc:{word}" for word in _TOKEN.findall((location or "").lower())]
+    return words
+
+
+def feature(token: str, n_features: int) -> int:
+    return zlib.crc32(token.encode()) % n_features
+
+
+def term_frequencies(rows, n_features: int) -> "sp.csr_matrix":
+    # Sublinear term frequencies, one row per (title, description, job_type, location)
+    import numpy as np
+    import scipy.sparse as sp
+
+    indptr, indices, data = [0], [], []
+    for row in rows:
+        counts = Counter(feature(token, n_features) for token in tokens(*row))
+        indices.extend(counts)
+        data.extend(1.0 + math.log(count) for count in counts.values())
+        indptr.append(len(indices))
+    return sp.csr_matrix(
+        (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(indptr) - 1, n_features),
+    )
+
+
+def weight(tf: "sp.csr_matrix", idf: "np.ndarray | None") -> "sp.csr_matrix":
+    # TF * IDF with unit-length rows; plain TF until a generation supplies an IDF
+    import numpy as np
+    import scipy.sparse as sp
+
+    weighted = sp.csr_matrix(tf if idf is None else tf.multiply(idf.reshape(1, -1)), dtype=np.float32)
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sp.csr_matrix(sp.diags(1.0 / norms).dot(weighted), dtype=np.float32)
+
+
+def _try_lock(handle) -> bool:
+    # Non-blocking exclusive lock on an open file, released when it is closed
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+class Snapshot:
+    # Immutable view used by readers: base (memory-mapped) plus this worker's delta
+
+    def __init__(self, generation, base, base_ids, idf, delta=None, delta_ids=()):
+        self.generation = generation
+        self.base = base
+        self.base_ids = base_ids
+        self.idf = idf
+        self.delta = delta
+        self.delta_ids = delta_ids
+
+    @property
+    def size(self) -> int:
+        return len(self.base_ids) + len(self.delta_ids)
+
+
+class RecommenderIndex:
+
+    def __init__(
+        self,
+        directory=config.RECOMMENDER_DIR,
+        session_factory=PrimarySessionLocal,
+        n_features: int = config.RECOMMENDER_FEATURES,
+        sync_seconds: float = config.RECOMMENDER_SYNC_SECONDS,
+        rebuild_rows: int = config.RECOMMENDER_REBUILD_ROWS,
+        rebuild_seconds: float = config.RECOMMENDER_REBUILD_SECONDS,
+        overlap_seconds: float = config.RECOMMENDER_SYNC_OVERLAP_SECONDS,
+    ):
+        self.directory = Path(directory)
+        self.session_factory = session_factory
+        self.n_features = n_features
+        self.sync_seconds = sync_seconds
+        self.rebuild_rows = rebuild_rows
+        self.rebuild_seconds = rebuild_seconds
+        self.overlap = timedelta(seconds=overlap_seconds)
+        # Nothing loaded yet: no base and no IDF
+        self.snapshot = Snapshot(None, None, (), None)
+        # job_id -> weighted row for jobs not in the base
+        self.pending = {}
+        self.last_job_id = 0
+        # When the catalog was last read (build or sync); the next sync re-reads from shortly before
+        self.synced_at = None
+        self.built_at = time.time()
+        self.lock = threading.Lock()
+        self._pid = None
+
+    # -- building and loading generations -------------------------------------------------
+
+    def build(self) -> str:
+        # Vectorize every active job into a new generation and make it current
+        read_at = utcnow()
+        db = self.session_factory()
+        try:
+            rows = (
+                db.query(models.Jobs.job_id, models.Jobs.title, models.Jobs.description, models.Jobs.job_type, models.Jobs.location)
+                .filter(models.Jobs.is_active == True)
+                .order_by(models.Jobs.job_id)
+                .yield_per(5000)
+            )
+            job_ids, texts = [], []
+            for row in rows:
+                job_ids.append(row[0])
+                texts.append(row[1:])
+        finally:
+            db.close()
+        return self.write_generation(job_ids, texts, read_at)
+
+    def write_generation(self, job_ids: list[int], texts: list[tuple], read_at=None) -> str:
+        # Save (title, description, job_type, location) rows, read from the catalog at
+        # read_at, as a new generation and make it current
+        import numpy as np
+
+        tf = term_frequencies(texts, self.n_features)
+        document_frequency = np.bincount(tf.indices, minlength=self.n_features)
+        idf = (np.log((1 + len(job_ids)) / (1 + document_frequency)) + 1).astype(np.float32)
+        matrix = weight(tf, idf).tocsc()
+        matrix.sort_indices()
+
+        generation = f"gen-{time.time_ns()}"
+        target = self.directory / generation
+        target.mkdir(parents=True)
+        np.save(target / "data.npy", matrix.data.astype(np.float32))
+        # Saved in the index dtype scipy picks, so loading maps them without a copy
+        np.save(target / "indices.npy", matrix.indices)
+        np.save(target / "indptr.npy", matrix.indptr)
+        np.save(target / "job_ids.npy", np.asarray(job_ids, dtype=np.int64))
+        np.save(target / "idf.npy", idf)
+        (target / "read_at").write_text((read_at or utcnow()).isoformat())
+        pointer = self.directory / "CURRENT.tmp"
+        pointer.write_text(generation)
+        os.replace(pointer, self.directory / "CURRENT")
+        # Workers still mapping an older generation keep their pages until they switch
+        for old in self.directory.glob("gen-*"):
+            if old.name != generation:
+                shutil.rmtree(old, ignore_errors=True)
+        return generation
+
+    def current_generation(self) -> str | None:
+        try:
+            return (self.directory / "CURRENT").read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load(self, generation: str) -> None:
+        import numpy as np
+        import scipy.sparse as sp
+
+        source = self.directory / generation
+        data = np.load(source / "data.npy", mmap_mode="r")
+        indices = np.load(source / "indices.npy", mmap_mode="r")
+        indptr = np.load(source / "indptr.npy", mmap_mode="r")
+        job_ids = np.load(source / "job_ids.npy", mmap_mode="r")
+        idf = np.load(source / "idf.npy")
+        try:
+            read_at = datetime.fromisoformat((source / "read_at").read_text().strip())
+        except FileNotFoundError:
+            # Built before read times were recorded: the first sync goes by id only
+            read_at = None
+        base = sp.csc_matrix((data, indices, indptr), shape=(len(job_ids), self.n_features), copy=False)
+        with self.lock:
+            # Delta rows were weighted with the old IDF; the next sync re-reads
+            # everything newer than the base with the new one
+            self.pending = {}
+            self.last_job_id = int(job_ids[-1]) if len(job_ids) else 0
+            self.synced_at = read_at
+            self.snapshot = Snapshot(generation, base, job_ids, idf)
+            self.built_at = time.time()
+
+    def rebuild(self) -> bool:
+        # One worker builds; the rest carry on with their delta and switch on a later sync
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / "build.lock", "w") as lock:
+            if not _try_lock(lock):
+                return False
+            self.load(self.build())
+            return True
+
+    # -- keeping the delta current --------------------------------------------------------
+
+    def _publish(self) -> None:
+        # Rebuild the delta matrix from pending rows; readers see the old or the new snapshot
+        import numpy as np
+        import scipy.sparse as sp
+
+        current = self.snapshot
+        ids = np.fromiter(self.pending, dtype=np.int64, count=len(self.pending))
+        delta = sp.vstack(list(self.pending.values()), format="csc") if self.pending else None
+        self.snapshot = Snapshot(current.generation, current.base, current.base_ids, current.idf, delta, ids)
+
+    def add_job(self, job_id: int, title, description, job_type, location) -> None:
+        # Called by create_job so the poster's own worker recommends the job immediately
+        self.add_jobs([(job_id, title, description, job_type, location)])
+
+    def add_jobs(self, rows) -> None:
+        # (job_id, title, description, job_type, location) rows, vectorized and published together
+        if not rows:
+            return
+        with self.lock:
+            matrix = weight(term_frequencies([row[1:] for row in rows], self.n_features), self.snapshot.idf)
+            for position, row in enumerate(rows):
+                self.pending[row[0]] = matrix[position]
+            self._publish()
+
+    def sync(self) -> None:
+        generation = self.current_generation()
+        if generation is None:
+            self.rebuild()
+            return
+        if generation != self.snapshot.generation:
+            self.load(generation)
+        read_at = utcnow()
+        recent = models.Jobs.job_id > self.last_job_id
+        if self.synced_at is not None:
+            recent = or_(recent, models.Jobs.date_posted >= self.synced_at - self.overlap)
+        db = self.session_factory()
+        try:
+            rows = (
+                db.query(models.Jobs.job_id, models.Jobs.title, models.Jobs.description, models.Jobs.job_type, models.Jobs.location)
+                .filter(recent, models.Jobs.is_active == True)
+                .order_by(models.Jobs.job_id)
+                .all()
+            )
+        finally:
+            db.close()
+        last_job_id = rows[-1][0] if rows else 0
+        # Rows in the overlap (and this worker's own postings) are mostly indexed already
+        rows = [row for row in rows if row[0] not in self.pending and not self.in_base(row[0])]
+        with self.lock:
+            if rows:
+                matrix = weight(term_frequencies([row[1:] for row in rows], self.n_features), self.snapshot.idf)
+                for position, row in enumerate(rows):
+                    self.pending[row[0]] = matrix[position]
+                self._publish()
+            self.last_job_id = max(self.last_job_id, last_job_id)
+            self.synced_at = read_at
+        stale = time.time() - self.built_at > self.rebuild_seconds
+        if len(self.pending) > self.rebuild_rows or stale:
+            self.rebuild()
+
+    def in_base(self, job_id: int) -> bool:
+        # base_ids is sorted (generations are built in job_id order)
+        import numpy as np
+
+        base_ids = self.snapshot.base_ids
+        position = int(np.searchsorted(base_ids, job_id))
+        return position < len(base_ids) and int(base_ids[position]) == job_id
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.sync_seconds)
+            try:
+                self.sync()
+            except Exception:
+                logger.exception("Recommender sync failed")
+
+    def start(self) -> None:
+        # Load (or build) once per process, then sync in the background
+        with self.lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        try:
+            self.sync()
+        except Exception:
+            logger.exception("Recommender index load failed")
+        threading.Thread(target=self._run, name="recommender-sync", daemon=True).start()
+
+    # -- scoring ------------------------------------------------------------------------
+
+    def profile(self, rows) -> tuple:
+        # Heaviest terms of the summed applied-job vectors: (feature columns, weights)
+        import numpy as np
+
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        summed = weight(term_frequencies(rows, self.n_features), self.snapshot.idf).sum(axis=0).A1
+        columns = np.flatnonzero(summed)
+        if len(columns) > PROFILE_FEATURES:
+            columns = columns[np.argpartition(summed[columns], -PROFILE_FEATURES)[-PROFILE_FEATURES:]]
+        return columns, summed[columns].astype(np.float32)
+
+    def score(self, columns: "np.ndarray", weights: "np.ndarray", limit: int = CANDIDATES) -> list[tuple]:
+        # [(job_id, score)] best first, over base and delta
+        import numpy as np
+
+        snapshot = self.snapshot
+        if not len(columns) or not snapshot.size:
+            return []
+        parts, ids = [], []
+        for matrix, job_ids in ((snapshot.base, snapshot.base_ids), (snapshot.delta, snapshot.delta_ids)):
+            if matrix is not None and matrix.shape[0]:
+                parts.append(matrix[:, columns] @ weights)
+                ids.append(np.asarray(job_ids))
+        scores = np.concatenate(parts)
+        job_ids = np.concatenate(ids)
+        positive = np.flatnonzero(scores > 0)
+        if len(positive) > limit:
+            positive = positive[np.argpartition(scores[positive], -limit)[-limit:]]
+        best = positive[np.argsort(-scores[positive], kind="stable")]
+        return list(zip(job_ids[best].tolist(), scores[best].tolist()))
+
+
+index = RecommenderIndex()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["build"]:
+        sys.exit("usage: python recommender.py build")
+    started = time.perf_counter()
+    built = RecommenderIndex()
+    generation = built.build()
+    print(f"Built {generation} in {time.perf_counter() - started:.1f}s")
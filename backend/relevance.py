@@ -0,0 +1,276 @@
+"""Relevance of each applicant to the job they applied to.
+
+``/jobs/employer/applications/{job_id}?sort=relevance`` orders applicants by
+the cosine similarity of their cover letter plus resume text to the job's
+title and description. Each job is scored in one batch: every live
+application's text becomes a row of a hashed TF-IDF matrix (the vectorizer
+from recommender.py, with IDF taken over the job and its applicants) and one
+sparse product with the job's row scores them all.
+
+Scores are stored in ``application_scores`` keyed by (application, job
+version), the job version being a digest of the job's text, along with the
+resume version (file mtime and size) they were computed with. The request
+path only reads them; a per-process worker thread computes them:
+    - for a job when someone applies to it
+    - for every job an applicant applied to when their resume changes
+    - for a job whose review queue was read with applicants missing a score
+      at the current job version (new applicants, or an edited job)
+    - for up to RELEVANCE_SWEEP_JOBS jobs with unscored applications every
+      RELEVANCE_SWEEP_SECONDS, to catch work queued by a process that died
+
+Resume text is read from .docx files (their XML) and, best effort, from .pdf
+files (uncompressed or Flate text streams). Other formats score on the cover
+letter alone. Uploads are untrusted, so at most config.MAX_RESUME_BYTES is
+inflated per resume (a small zip or Flate bomb cannot exhaust memory) and
+reading stops once MAX_RESUME_CHARS of text is collected.
+"""
+import hashlib
+import html
+import logging
+import os
+import queue
+import re
+import threading
+import zipfile
+import zlib
+from typing import TYPE_CHECKING
+
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.orm import Session
+
+import config
+from database import PrimarySessionLocal
+import models
+from recommender import term_frequencies, weight
+from revocation import utcnow
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Resume text beyond this is ignored
+MAX_RESUME_CHARS = 100_000
+# Features for the per-job vectorizer; a job's applicants share few terms
+FEATURES = 2 ** 16
+# Rows per INSERT (keeps SQLite under its bound-parameter limit)
+UPSERT_BATCH = 1000
+
+
+def job_version(title: str | None, description: str | None) -> str:
+    return hashlib.sha1(f"{title or ''}\0{description or ''}".encode()).hexdigest()[:16]
+
+
+def resume_version(path: str | None) -> str | None:
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def _docx_text(path: str) -> str:
+    # The member is inflated through a bounded read; its declared size can lie
+    with zipfile.ZipFile(path) as archive, archive.open("word/document.xml") as member:
+        document = member.read(config.MAX_RESUME_BYTES).decode("utf-8", "ignore")
+    document = re.sub(r"</w:p>|<w:tab/>|<w:br/>", "\n", document)
+    return html.unescape(re.sub(r"<[^>]+>", "", document))
+
+
+_PDF_STREAM = re.compile(rb"stream\r?\n(.*?)\r?\nendstream", re.S)
+_PDF_STRING = re.compile(rb"\(((?:\\.|[^\\)])*)\)")
+
+
+def _pdf_text(path: str) -> str:
+    with open(path, "rb") as handle:
+        content = handle.read(config.MAX_RESUME_BYTES)
+    parts = []
+    chars = 0
+    # Inflated bytes left for all streams together
+    budget = config.MAX_RESUME_BYTES
+    for stream in _PDF_STREAM.findall(content):
+        if chars >= MAX_RESUME_CHARS or budget <= 0:
+            break
+        try:
+            stream = zlib.decompressobj().decompress(stream, budget)
+            budget -= len(stream)
+        except zlib.error:
+            pass
+        if b"Tj" in stream or b"TJ" in stream:
+            for text in _PDF_STRING.findall(stream):
+                parts.append(re.sub(rb"\\(.)", rb"\1", text))
+                chars += len(parts[-1]) + 1
+    return b" ".join(parts).decode("latin-1")
+
+
+def resume_text(path: str | None) -> str:
+    # Plain text of a stored resume, or "" when there is none or it cannot be read
+    if not path or not os.path.exists(path):
+        return ""
+    try:
+        if path.lower().endswith(".docx"):
+            return _docx_text(path)[:MAX_RESUME_CHARS]
+        if path.lower().endswith(".pdf"):
+            return _pdf_text(path)[:MAX_RESUME_CHARS]
+    except (OSError, KeyError, zipfile.BadZipFile, zlib.error):
+        logger.warning("Could not read resume %s", path)
+    return ""
+
+
+def similarities(title: str | None, description: str | None, documents: list[str]) -> "np.ndarray":
+    # Cosine similarity of each document to the job, as one sparse product
+    import numpy as np
+
+    rows = [(title, description, None, None)] + [(None, document, None, None) for document in documents]
+    tf = term_frequencies(rows, FEATURES)
+    document_frequency = np.bincount(tf.indices, minlength=FEATURES)
+    idf = (np.log((1 + len(rows)) / (1 + document_frequency)) + 1).astype(np.float32)
+    matrix = weight(tf, idf)
+    return (matrix[1:] @ matrix[0].T).toarray().ravel()
+
+
+def _upsert(db: Session):
+    # Dialect-specific INSERT supporting ON CONFLICT (Postgres and SQLite)
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(models.ApplicationScores)
+
+
+def score_job(db: Session, job_id: int) -> int:
+    # Score every live application to job_id at the job's current version; returns rows written
+    job = db.query(models.Jobs.title, models.Jobs.description).filter(models.Jobs.job_id == job_id).first()
+    if job is None:
+        return 0
+    version = job_version(job.title, job.description)
+    applications = (
+        db.query(models.Applications.application_id, models.Applications.cover_letter, models.Users.resume_file)
+        .join(models.Users, models.Users.user_id == models.Applications.user_id)
+        .filter(models.Applications.job_id == job_id)
+        .order_by(models.Applications.application_id)
+        .all()
+    )
+    if not applications:
+        return 0
+    resumes = [resume_version(resume_file) for _, _, resume_file in applications]
+    documents = [f"{cover_letter or ''}\n{resume_text(resume_file)}" for _, cover_letter, resume_file in applications]
+    scores = similarities(job.title, job.description, documents)
+
+    now = utcnow()
+    values = [
+        {
+            "application_id": application_id,
+            "job_version": version,
+            "job_id": job_id,
+            "resume_version": resume,
+            "score": round(float(score), 4),
+            "computed_at": now,
+        }
+        for (application_id, _, _), resume, score in zip(applications, resumes, scores)
+    ]
+    for start in range(0, len(values), UPSERT_BATCH):
+        stmt = _upsert(db).values(values[start:start + UPSERT_BATCH])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[models.ApplicationScores.application_id, models.ApplicationScores.job_version],
+            set_={name: stmt.excluded[name] for name in ("resume_version", "score", "computed_at")},
+        ))
+    # Scores for earlier versions of the job, or for withdrawn applications, are dead
+    live = select(models.Applications.application_id).where(models.Applications.job_id == job_id)
+    db.execute(delete(models.ApplicationScores).where(
+        models.ApplicationScores.job_id == job_id,
+        or_(models.ApplicationScores.job_version != version, models.ApplicationScores.application_id.notin_(live)),
+    ))
+    db.commit()
+    return len(applications)
+
+
+def unscored_jobs(db: Session, limit: int = config.RELEVANCE_SWEEP_JOBS) -> list[int]:
+    # Jobs with live applications that have no score at all
+    return [
+        row[0]
+        for row in db.query(models.Applications.job_id)
+        .outerjoin(models.ApplicationScores, and_(
+            models.ApplicationScores.application_id == models.Applications.application_id,
+            models.ApplicationScores.job_id == models.Applications.job_id,
+        ))
+        .filter(models.ApplicationScores.application_id.is_(None))
+        .distinct()
+        .limit(limit)
+        .all()
+    ]
+
+
+class ScoringWorker:
+    # One scoring thread per worker process, fed through an in-memory queue
+
+    def __init__(self, session_factory=PrimarySessionLocal, sweep_seconds: float = config.RELEVANCE_SWEEP_SECONDS):
+        self.session_factory = session_factory
+        self.sweep_seconds = sweep_seconds
+        self.queue = queue.Queue()
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def enqueue(self, *job_ids: int) -> None:
+        # Cheap and non-blocking; a job already waiting is not queued twice
+        with self._lock:
+            for job_id in job_ids:
+                if job_id not in self._queued:
+                    self._queued.add(job_id)
+                    self.queue.put(job_id)
+
+    def enqueue_for_user(self, db: Session, user_id: int) -> None:
+        # An applicant's resume changed: rescore every job they applied to
+        job_ids = db.query(models.Applications.job_id).filter(models.Applications.user_id == user_id).all()
+        self.enqueue(*(job_id for (job_id,) in job_ids))
+
+    def process(self, job_id: int) -> None:
+        with self._lock:
+            self._queued.discard(job_id)
+        db = self.session_factory()
+        try:
+            score_job(db, job_id)
+        except Exception:
+            db.rollback()
+            logger.exception("Scoring applications for job %s failed", job_id)
+        finally:
+            db.close()
+
+    def drain(self) -> None:
+        # Score everything queued so far, in this thread
+        while True:
+            try:
+                job_id = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            self.process(job_id)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                job_id = self.queue.get(timeout=self.sweep_seconds)
+            except queue.Empty:
+                try:
+                    db = self.session_factory()
+                    try:
+                        self.enqueue(*unscored_jobs(db))
+                    finally:
+                        db.close()
+                except Exception:
+                    logger.exception("Relevance sweep failed")
+                continue
+            self.process(job_id)
+
+    def start(self) -> None:
+        # Threads do not survive fork, so start once per process
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            threading.Thread(target=self._run, name="relevance-scoring", daemon=True).start()
+            self._pid = os.getpid()
+
+
+worker = ScoringWorker()
@@ -0,0 +1,72 @@
+"""Send read-only requests to read replicas, with read-your-writes stickiness.
+
+``ReplicaRoutingMiddleware`` marks GET and HEAD requests as replica-eligible
+through ``database.read_from_replica``; ``RoutingSession`` then binds their
+reads to a healthy replica (see ``database.ReplicaSet``) and everything else
+to the primary.
+
+A replica may not yet have a client's own write, e.g. right after applying
+for a job the applicant's ``/jobs/applications/me`` could miss it. So every
+non-read request sets the ``hustlehub_primary_until`` cookie, and while it is
+valid (``READ_YOUR_WRITES_SECONDS``) that client's reads stay on the primary.
+The cookie works across workers because the client carries it.
+
+Only installed when ``READ_REPLICA_URLS`` is set.
+"""
+import time
+
+from config import READ_YOUR_WRITES_SECONDS
+from database import read_from_replica
+
+STICKY_COOKIE = "hustlehub_primary_until"
+READ_METHODS = {"GET", "HEAD"}
+
+
+def request_cookie(scope, name: str) -> str | None:
+    for header, value in scope["headers"]:
+        if header != b"cookie":
+            continue
+        for part in value.decode("latin-1").split(";"):
+            key, _, cookie_value = part.strip().partition("=")
+            if key == name:
+                return cookie_value
+    return None
+
+
+def pinned_to_primary(scope) -> bool:
+    # True while the client's read-your-writes window is open
+    value = request_cookie(scope, STICKY_COOKIE)
+    try:
+        return value is not None and time.time() < int(value)
+    except ValueError:
+        return False
+
+
+class ReplicaRoutingMiddleware:
+    # ASGI middleware choosing replica or primary reads per request
+
+    def __init__(self, app, sticky_seconds: int = READ_YOUR_WRITES_SECONDS):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] in READ_METHODS:
+            token = read_from_replica.set(not pinned_to_primary(scope))
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                read_from_replica.reset(token)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                until = int(time.time()) + self.sticky_seconds
+                cookie = f"{STICKY_COOKIE}={until}; Max-Age={self.sticky_seconds}; Path=/; HttpOnly; SameSite=Lax"
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,225 @@
+"""Server-side revocation of access and refresh tokens.
+
+Revoked token ids (``jti``) are written to the ``revoked_tokens`` table. A
+whole user version can be revoked at once with the key
+``user:<id>:v<version>``; password changes and account deletion use it to
+kill every token issued to that user, on every device.
+
+Checking the table on every request would add a query to each guarded
+endpoint, so each worker keeps a Bloom filter of revoked keys instead. The
+filter is loaded on first use in a process and then kept current by a
+background thread that, every ``REVOCATION_SYNC_SECONDS``, pulls rows with
+``revoked_id`` above the last one seen or ``revoked_at`` within
+``REVOCATION_SYNC_OVERLAP_SECONDS`` of the previous pull. Ids are handed out
+when a revocation is written, not when it commits, so a lower id can become
+visible after a higher one; the overlap re-reads those (adding a key twice is
+harmless). A token that is not in the filter is
+definitely not revoked, which is the common case and costs no I/O. A filter
+hit may be a false positive and is confirmed against the table.
+
+Rows are pruned once the token they revoke would have expired anyway; when
+the filter has taken more than its capacity it is rebuilt from the rows that
+are left.
+"""
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+import config
+from database import PrimarySessionLocal
+from models import RevokedTokens
+
+logger = logging.getLogger(__name__)
+
+# How often the sync thread deletes rows for tokens that have expired
+PRUNE_INTERVAL_SECONDS = 3600
+
+
+def utcnow() -> datetime:
+    # Naive UTC, matching the TIMESTAMP columns
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def expiry_from_claims(payload: dict) -> datetime:
+    return datetime.fromtimestamp(payload["exp"], timezone.utc).replace(tzinfo=None)
+
+
+def user_version_key(user_id: int, version: int) -> str:
+    # Revokes every token issued to this user at this token_version
+    return f"user:{user_id}:v{version}"
+
+
+class BloomFilter:
+    # Bit array with k positions per item from double hashing over one blake2b digest
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def _insert(db: Session):
+    # Dialect-specific INSERT supporting ON CONFLICT (Postgres and SQLite)
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(RevokedTokens)
+
+
+class RevocationList:
+    # Per-process view of revoked_tokens: Bloom filter plus the last synced id
+
+    def __init__(
+        self,
+        session_factory=PrimarySessionLocal,
+        sync_seconds: float = config.REVOCATION_SYNC_SECONDS,
+        capacity: int = config.REVOCATION_BLOOM_CAPACITY,
+        error_rate: float = config.REVOCATION_BLOOM_ERROR_RATE,
+        overlap_seconds: float = config.REVOCATION_SYNC_OVERLAP_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.sync_seconds = sync_seconds
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.filter = BloomFilter(capacity, error_rate)
+        self.last_id = 0
+        # Start of the last load or sync; the next sync re-reads from shortly before it
+        self.synced_at = None
+        self.lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._pid = None
+
+    def load(self) -> None:
+        # Build a fresh filter from every unexpired revocation and swap it in
+        fresh = BloomFilter(self.capacity, self.error_rate)
+        started = utcnow()
+        db = self.session_factory()
+        try:
+            rows = (
+                db.query(RevokedTokens.revoked_id, RevokedTokens.jti)
+                .filter(RevokedTokens.expires_at > started)
+                .all()
+            )
+        finally:
+            db.close()
+        for _, jti in rows:
+            fresh.add(jti)
+        with self.lock:
+            self.filter = fresh
+            # From the rows read, so one committed after the query is still above it
+            self.last_id = max([self.last_id] + [revoked_id for revoked_id, _ in rows])
+            self.synced_at = started
+
+    def sync(self) -> None:
+        # Add revocations recorded (by any worker) since the last sync
+        started = utcnow()
+        recent = RevokedTokens.revoked_id > self.last_id
+        if self.synced_at is not None:
+            recent = or_(recent, RevokedTokens.revoked_at >= self.synced_at - self.overlap)
+        db = self.session_factory()
+        try:
+            rows = (
+                db.query(RevokedTokens.revoked_id, RevokedTokens.jti)
+                .filter(recent)
+                .order_by(RevokedTokens.revoked_id)
+                .all()
+            )
+        finally:
+            db.close()
+        with self.lock:
+            for revoked_id, jti in rows:
+                # Rows in the overlap are mostly known already; keep them out of the count
+                if jti not in self.filter:
+                    self.filter.add(jti)
+                self.last_id = max(self.last_id, revoked_id)
+            self.synced_at = started
+            full = self.filter.count > self.capacity
+        if full:
+            # Past capacity the false-positive rate climbs; expired rows are gone by now
+            self.load()
+
+    def prune(self) -> int:
+        db = self.session_factory()
+        try:
+            deleted = db.query(RevokedTokens).filter(RevokedTokens.expires_at <= utcnow()).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        last_prune = time.monotonic()
+        while True:
+            time.sleep(self.sync_seconds)
+            try:
+                self.sync()
+                if time.monotonic() - last_prune > PRUNE_INTERVAL_SECONDS:
+                    self.prune()
+                    last_prune = time.monotonic()
+            except Exception:
+                logger.exception("Revocation list sync failed")
+
+    def start(self) -> None:
+        # Load once per process (threads do not survive fork), then sync in the background
+        if self._pid == os.getpid():
+            return
+        # Concurrent first requests wait here until the filter is loaded
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self.load()
+            threading.Thread(target=self._run, name="revocation-sync", daemon=True).start()
+            self._pid = os.getpid()
+
+    def is_revoked(self, *keys: str | None) -> bool:
+        self.start()
+        candidates = [key for key in keys if key and key in self.filter]
+        if not candidates:
+            return False
+        # Possible hit: Bloom filters have false positives, so confirm against the table
+        db = self.session_factory()
+        try:
+            return db.query(RevokedTokens.revoked_id).filter(RevokedTokens.jti.in_(candidates)).first() is not None
+        finally:
+            db.close()
+
+    def revoke(self, db: Session, key: str, expires_at: datetime) -> None:
+        # Record in the caller's transaction; this worker's filter knows immediately,
+        # the others within REVOCATION_SYNC_SECONDS
+        stmt = _insert(db).values(jti=key, expires_at=expires_at, revoked_at=utcnow())
+        db.execute(stmt.on_conflict_do_nothing(index_elements=[RevokedTokens.jti]))
+        with self.lock:
+            self.filter.add(key)
+
+
+def revoke_user_tokens(db: Session, user_id: int, version: int) -> None:
+    # Kill every access and refresh token issued at this version; none outlives a refresh token
+    revocations.revoke(db, user_version_key(user_id, version), utcnow() + timedelta(days=config.REFRESH_TOKEN_EXPIRE_DAYS))
+
+
+revocations = RevocationList()
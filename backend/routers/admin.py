@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
 from database import SessionLocal
 from models import Users, Jobs, Employers
-from routers.auth import get_user_from_token
+from routers.auth import Claims, get_claims, get_user_from_token
 from pydantic import BaseModel
 from security import hash_password, verify_password
+from fast_json import FastJSONResponse, rows_to_dicts
+import versions
+import edge_cache
+import dedupe
+from profiling import ProfileStore, render_html
+from revocation import revoke_user_tokens
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -17,7 +24,7 @@ def get_db():
     finally:
         db.close()
 
-def require_admin(current_user: Users = Depends(get_user_from_token)):
+def require_admin(current_user: Claims = Depends(get_claims)):
     if current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
@@ -62,16 +69,17 @@ class JobResponse(BaseModel):
 @router.post("/verify-password")
 def verify_admin_password(
     password_data: PasswordVerify,
-    admin: Users = Depends(require_admin),
+    admin: Users = Depends(get_user_from_token),
     db: Session = Depends(get_db)
 ):
-    # Verify the current admin's password
+    # Verify the current admin's password (needs the stored hash, so load the row)
+    require_admin(admin)
     is_valid = verify_password(password_data.password, admin.password_hash)
     return {"valid": is_valid}
 
 @router.get("/users", response_model=List[UserResponse])
 def get_all_users(
-    admin: Users = Depends(require_admin),
+    admin: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     users = db.query(Users).order_by(Users.created_at.desc()).all()
@@ -80,7 +88,7 @@ def get_all_users(
 @router.post("/users", response_model=UserResponse)
 def create_user(
     user_data: UserCreate,
-    admin: Users = Depends(require_admin),
+    admin: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     # Check if username or email already exists
@@ -110,7 +118,8 @@ def create_user(
 @router.delete("/users/{user_id}")
 def delete_user(
     user_id: int,
-    admin: Users = Depends(require_admin),
+    background_tasks: BackgroundTasks,
+    admin: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     if user_id == admin.user_id:
@@ -123,6 +132,12 @@ def delete_user(
     if user.role == 'admin':
         raise HTTPException(status_code=403, detail="Cannot delete admin accounts")
     
+    if user.role == 'employer':
+        # Their postings disappear with the cascade
+        versions.bump(db, versions.JOBS_CATALOG)
+        if user.employer:
+            edge_cache.purge_later(background_tasks, edge_cache.employer_key(user.employer.employer_id))
+    revoke_user_tokens(db, user.user_id, user.token_version)
     db.delete(user)
     db.commit()
     
@@ -130,44 +145,70 @@ def delete_user(
 
 @router.get("/jobs", response_model=List[JobResponse])
 def get_all_jobs(
-    admin: Users = Depends(require_admin),
+    admin: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    jobs = (
-        db.query(Jobs)
-        .join(Employers)
+    # Project only the JobResponse columns; the employer name comes from the join.
+    # Keys pair with the columns by position, so keep the two lists in step
+    fields = (
+        "job_id", "employer_id", "company_name", "title", "description",
+        "job_type", "location", "pay_range", "is_active", "date_posted",
+    )
+    rows = (
+        db.query(
+            Jobs.job_id,
+            Jobs.employer_id,
+            Employers.company_name,
+            Jobs.title,
+            Jobs.description,
+            Jobs.job_type,
+            Jobs.location,
+            Jobs.pay_range,
+            Jobs.is_active,
+            Jobs.date_posted
+        )
+        .join(Employers, Jobs.employer_id == Employers.employer_id)
         .order_by(Jobs.date_posted.desc())
         .all()
     )
     
-    results = []
-    for job in jobs:
-        results.append(JobResponse(
-            job_id=job.job_id,
-            employer_id=job.employer_id,
-            company_name=job.employer.company_name,
-            title=job.title,
-            description=job.description,
-            job_type=job.job_type,
-            location=job.location,
-            pay_range=job.pay_range,
-            is_active=job.is_active,
-            date_posted=job.date_posted
-        ))
-    
-    return results
+    return FastJSONResponse(rows_to_dicts(rows, fields))
 
 @router.delete("/jobs/{job_id}")
 def delete_job(
     job_id: int,
-    admin: Users = Depends(require_admin),
+    background_tasks: BackgroundTasks,
+    admin: Claims = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     job = db.query(Jobs).filter(Jobs.job_id == job_id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
+    # Before the delete, while its reposts still point at it
+    dedupe.promote_duplicates(db, [job_id])
     db.delete(job)
+    versions.bump(db, versions.JOBS_CATALOG)
     db.commit()
+    edge_cache.purge_later(background_tasks, edge_cache.job_key(job_id))
     
     return {"message": "Job deleted successfully"}
+
+@router.get("/profiles")
+def list_profiles(admin: Claims = Depends(require_admin)):
+    # Stored request profiles, newest first
+    return {"reports": ProfileStore().list()}
+
+@router.get("/profiles/{name}")
+def get_profile(
+    name: str,
+    format: str = "folded",
+    admin: Claims = Depends(require_admin)
+):
+    # Download a stored profile as folded stacks or as an HTML report
+    folded = ProfileStore().read(name)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "html":
+        return HTMLResponse(render_html(folded, name))
+    return PlainTextResponse(folded)
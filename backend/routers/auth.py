@@ -1,18 +1,31 @@
+from dataclasses import dataclass
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from sqlalchemy.orm import Session
 
 from database import SessionLocal
-from models import Users
+from models import Users, Employers
 from schemas_user import UserCreate, UserLogin, UserOut
-from security import hash_password, verify_password, create_access_token
-from jose import jwt, JWTError
-from security import SECRET_KEY, ALGORITHM
+from security import (
+    hash_password,
+    verify_password,
+    create_access_token,
+    create_refresh_token,
+    decode_access_token,
+    access_token_claims,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+)
+from tracing import span
+from revocation import revocations, expiry_from_claims, user_version_key
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-# JWT stored in an HTTP-only cookie for browser clients
+# JWTs stored in HTTP-only cookies for browser clients
 COOKIE_NAME = "hustlehub_access_token"
+REFRESH_COOKIE_NAME = "hustlehub_refresh_token"
+# The refresh token is only ever sent to /auth/* (refresh and logout)
+REFRESH_COOKIE_PATH = "/auth"
 
 def get_db():
     # Provide a DB session per request
@@ -22,29 +35,85 @@ def get_db():
     finally:
         db.close()
 
-def get_user_from_token(request: Request, db: Session = Depends(get_db)) -> Users:
-    # Resolve the authenticated user from the access token cookie
-    token = request.cookies.get(COOKIE_NAME)
-    if not token:
-        raise HTTPException(status_code=401, detail="Not authenticated")
+@dataclass(frozen=True)
+class Claims:
+    # Signed authorization facts from the access token
+    user_id: int
+    role: str
+    employer_id: int | None
+    version: int
+
+def get_claims(request: Request) -> Claims:
+    # Resolve the caller from the access token alone, without touching the database
+    with span("auth.get_claims"):
+        token = request.cookies.get(COOKIE_NAME)
+        if not token:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+
+        payload = decode_access_token(token)
+        if not payload or payload.get("type") != "access":
+            raise HTTPException(status_code=401, detail="Invalid token")
+        # In-memory Bloom filter check; only a possible hit goes to the database
+        if revocations.is_revoked(payload.get("jti"), user_version_key(payload["sub"], payload.get("ver", 0))):
+            raise HTTPException(status_code=401, detail="Token revoked")
+
+        return Claims(
+            user_id=int(payload["sub"]),
+            role=payload["role"],
+            employer_id=payload.get("employer_id"),
+            version=payload.get("ver", 0),
+        )
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = int(payload.get("sub"))
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+def get_user_from_token(request: Request, db: Session = Depends(get_db)) -> Users:
+    # Load the authenticated user's row, for endpoints that need more than the claims
+    with span("auth.get_user_from_token"):
+        claims = get_claims(request)
 
-    user = db.query(Users).filter(Users.user_id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
+        user = db.query(Users).filter(Users.user_id == claims.user_id).first()
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+        if user.token_version != claims.version:
+            raise HTTPException(status_code=401, detail="Token revoked")
 
-    return user
+        return user
 
-def require_admin(user: Users = Depends(get_user_from_token)):
+def require_admin(claims: Claims = Depends(get_claims)) -> Claims:
     # Guard routes that require an admin role
-    if user.role != "admin":
+    if claims.role != "admin":
         raise HTTPException(status_code=403, detail="Admin privileges required")
-    return user
+    return claims
+
+def employer_id_for(claims: Claims, db: Session) -> int | None:
+    # Employer scoping from the token; only a token issued before the company
+    # profile existed (e.g. on another device) needs the lookup
+    if claims.employer_id is not None or claims.role != "employer":
+        return claims.employer_id
+    return db.query(Employers.employer_id).filter(Employers.user_id == claims.user_id).scalar()
+
+def issue_tokens(response: Response, user_id: int, role: str, employer_id: int | None, version: int):
+    # Set fresh access and refresh cookies
+    access_token = create_access_token(access_token_claims(user_id, role, employer_id, version))
+    response.set_cookie(
+        key=COOKIE_NAME,
+        value=access_token,
+        httponly=True,
+        samesite="lax",
+        secure=False,
+        max_age=60 * ACCESS_TOKEN_EXPIRE_MINUTES,
+    )
+    response.set_cookie(
+        key=REFRESH_COOKIE_NAME,
+        value=create_refresh_token(user_id, version),
+        httponly=True,
+        samesite="lax",
+        secure=False,
+        max_age=60 * 60 * 24 * REFRESH_TOKEN_EXPIRE_DAYS,
+        path=REFRESH_COOKIE_PATH,
+    )
+
+def issue_tokens_for_user(response: Response, user: Users):
+    employer_id = user.employer.employer_id if user.employer else None
+    issue_tokens(response, user.user_id, user.role, employer_id, user.token_version)
 
 @router.post("/register", response_model=UserOut)
 def register(user_in: UserCreate, db: Session = Depends(get_db)):
@@ -81,23 +150,41 @@ def login(user_in: UserLogin, response: Response, db: Session = Depends(get_db))
     if not user or not verify_password(user_in.password, user.password_hash):
         raise HTTPException(400, "Invalid email or password")
 
-    token = create_access_token({"sub": str(user.user_id)})
+    issue_tokens_for_user(response, user)
+    return user
 
-    response.set_cookie(
-        key=COOKIE_NAME,
-        value=token,
-        httponly=True,
-        samesite="lax",
-        secure=False,
-        max_age=60 * 60 * 24,
-    )
+@router.post("/refresh", response_model=UserOut)
+def refresh(request: Request, response: Response, db: Session = Depends(get_db)):
+    # Exchange a valid refresh token for new access/refresh cookies, picking up
+    # any role or company profile change since the last one
+    payload = decode_access_token(request.cookies.get(REFRESH_COOKIE_NAME) or "")
+    if not payload or payload.get("type") != "refresh":
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    user = db.query(Users).filter(Users.user_id == int(payload["sub"])).first()
+    if not user or user.token_version != payload.get("ver") or revocations.is_revoked(payload.get("jti")):
+        raise HTTPException(status_code=401, detail="Refresh token revoked")
 
+    # Rotate: the refresh token just used cannot be replayed
+    revocations.revoke(db, payload["jti"], expiry_from_claims(payload))
+    db.commit()
+    issue_tokens_for_user(response, user)
     return user
 
+def revoke_request_tokens(request: Request, db: Session):
+    # Revoke whichever of this client's access/refresh tokens are still valid
+    for name in (COOKIE_NAME, REFRESH_COOKIE_NAME):
+        payload = decode_access_token(request.cookies.get(name) or "")
+        if payload and payload.get("jti"):
+            revocations.revoke(db, payload["jti"], expiry_from_claims(payload))
+
 @router.post("/logout")
-def logout(response: Response):
-    # Clear the access token cookie
+def logout(request: Request, response: Response, db: Session = Depends(get_db)):
+    # Revoke the session's tokens server-side and clear the auth cookies
+    revoke_request_tokens(request, db)
+    db.commit()
     response.delete_cookie(COOKIE_NAME)
+    response.delete_cookie(REFRESH_COOKIE_NAME, path=REFRESH_COOKIE_PATH)
     return {"detail": "Logged out"}
 
 @router.get("/me", response_model=UserOut)
@@ -108,6 +195,5 @@ def me(request: Request, db: Session = Depends(get_db)):
 @router.get("/users", response_model=List[UserOut])
 def list_users(request: Request, db: Session = Depends(get_db)):
     # Admin-only listing of all users
-    user = get_user_from_token(request, db)
-    require_admin(user)
+    require_admin(get_claims(request))
     return db.query(Users).order_by(Users.user_id).all()
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from database import SessionLocal
-from models import Users, Employers
-from routers.auth import get_user_from_token
+from models import Employers
+from routers.auth import Claims, get_claims, employer_id_for, issue_tokens
 from pydantic import BaseModel
+import versions
+import edge_cache
+import geo
 
 def get_db():
     db = SessionLocal()
@@ -33,13 +36,13 @@ class EmployerResponse(BaseModel):
 
 @router.get("/me", response_model=EmployerResponse)
 def get_my_employer_info(
-    current_user: Users = Depends(get_user_from_token),
+    current_user: Claims = Depends(get_claims),
     db: Session = Depends(get_db)
 ):
     if current_user.role != 'employer':
         raise HTTPException(status_code=403, detail="Only employers can access this")
     
-    employer = db.query(Employers).filter(Employers.user_id == current_user.user_id).first()
+    employer = db.query(Employers).filter(Employers.employer_id == employer_id_for(current_user, db)).first()
     if not employer:
         raise HTTPException(status_code=404, detail="Employer profile not found")
     
@@ -48,7 +51,8 @@ def get_my_employer_info(
 @router.post("", response_model=EmployerResponse)
 def create_employer_info(
     data: EmployerCreate,
-    current_user: Users = Depends(get_user_from_token),
+    response: Response,
+    current_user: Claims = Depends(get_claims),
     db: Session = Depends(get_db)
 ):
     if current_user.role != 'employer':
@@ -64,31 +68,42 @@ def create_employer_info(
         company_name=data.company_name,
         description=data.description,
         website=data.website,
-        location=data.location
+        location=data.location,
+        **geo.coordinates_for(data.location)
     )
     db.add(employer)
     db.commit()
     db.refresh(employer)
+    # Reissue the tokens so the new employer_id claim takes effect right away
+    issue_tokens(response, current_user.user_id, current_user.role, employer.employer_id, current_user.version)
     return employer
 
 @router.put("/me", response_model=EmployerResponse)
 def update_employer_info(
     data: EmployerCreate,
-    current_user: Users = Depends(get_user_from_token),
+    background_tasks: BackgroundTasks,
+    current_user: Claims = Depends(get_claims),
     db: Session = Depends(get_db)
 ):
     if current_user.role != 'employer':
         raise HTTPException(status_code=403, detail="Only employers can update company profiles")
     
-    employer = db.query(Employers).filter(Employers.user_id == current_user.user_id).first()
+    employer = db.query(Employers).filter(Employers.employer_id == employer_id_for(current_user, db)).first()
     if not employer:
         raise HTTPException(status_code=404, detail="Employer profile not found")
     
     employer.company_name = data.company_name
     employer.description = data.description
     employer.website = data.website
+    if data.location != employer.location:
+        for column, value in geo.coordinates_for(data.location).items():
+            setattr(employer, column, value)
     employer.location = data.location
     
+    # Company name is shown on every job card
+    versions.bump(db, versions.JOBS_CATALOG)
     db.commit()
     db.refresh(employer)
+    # Job detail pages embed the company name
+    edge_cache.purge_later(background_tasks, edge_cache.employer_key(employer.employer_id))
     return employer
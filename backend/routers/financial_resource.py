@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
+from fast_json import dumps
+from versions import etag_matches
 from models import FinancialResources, Users
 from schemas_user import FinancialResourceRead, FinancialResourceCreate
-from routers.auth import require_admin, get_user_from_token, get_db
+from routers.auth import Claims, require_admin, get_claims, get_db
 
 router = APIRouter(prefix="/financial-literacy", tags=["Financial Resources"])
 
+# Likes change the list without changing its URL, so clients revalidate every
+# time; the ETag (a digest of the body) turns an unchanged list into a 304
+RESOURCE_LIST_CACHE_CONTROL = "private, no-cache"
+
 @router.get("/{resource_type}", response_model=list[FinancialResourceRead])
 def get_resources(
     resource_type: str, 
+    request: Request,
     db: Session = Depends(get_db)
 ):
     # Fetch resources for a given category (credit/budget/invest)
@@ -36,13 +44,18 @@ def get_resources(
         }
         result.append(resource_dict)
     
-    return result
+    body = dumps(result)
+    etag = f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": RESOURCE_LIST_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
 
 @router.post("", response_model=None)
 def create_financial_resource(
     resource_in: FinancialResourceCreate, 
     db: Session = Depends(get_db),
-    token: Users = Depends(get_user_from_token),
+    token: Claims = Depends(get_claims),
 ):
     # Admin-only creation of financial resources
     require_admin(token) 
@@ -66,7 +79,7 @@ def update_financial_resource(
     resource_id: int,
     resource_in: FinancialResourceCreate,
     db: Session = Depends(get_db),
-    token: Users = Depends(get_user_from_token),
+    token: Claims = Depends(get_claims),
 ):
     # Admin-only update of financial resources
     require_admin(token)
@@ -92,7 +105,7 @@ def update_financial_resource(
 def delete_financial_resource(
     resource_id: int,
     db: Session = Depends(get_db),
-    token: Users = Depends(get_user_from_token),
+    token: Claims = Depends(get_claims),
 ):
     # Admin-only deletion of financial resources
     require_admin(token)
@@ -113,7 +126,7 @@ def delete_financial_resource(
 def like_resource(
     resource_id: int,
     db: Session = Depends(get_db),
-    current_user: Users = Depends(get_user_from_token)
+    current_user: Claims = Depends(get_claims)
 ):
     # Check if resource exists
     resource = db.query(FinancialResources).filter(
@@ -150,7 +163,7 @@ def like_resource(
 def unlike_resource(
     resource_id: int,
     db: Session = Depends(get_db),
-    current_user: Users = Depends(get_user_from_token)
+    current_user: Claims = Depends(get_claims)
 ):
     # Check if resource exists
     resource = db.query(FinancialResources).filter(
@@ -1,10 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import heapq
+import os
+import re
+import shutil
+from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, case, func, or_, text, update
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from database import SessionLocal
 import models
 import schemas_job
-from routers.auth import get_user_from_token
+import versions
+import edge_cache
+import geo
+import pay
+import recommender
+import dedupe
+import relevance
+import config
+from job_expiry import default_expiry
+from revocation import utcnow
+from fast_json import FastJSONResponse
+import exports
+import job_import
+from routers.auth import Claims, get_claims, employer_id_for
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
@@ -16,19 +36,161 @@ def get_db():
     finally:
         db.close()
 
+def job_card_query(db: Session, *extra_columns):
+    # Column-projected job card rows; avoids loading ORM objects and lazy employer lookups
+    return (
+        db.query(
+            models.Jobs.job_id,
+            models.Jobs.employer_id,
+            models.Employers.company_name,
+            models.Jobs.title,
+            models.Jobs.description,
+            models.Jobs.job_type,
+            models.Jobs.location,
+            models.Jobs.pay_range,
+            models.Jobs.date_posted,
+            models.Jobs.is_active,
+            *extra_columns
+        )
+        .join(models.Employers, models.Jobs.employer_id == models.Employers.employer_id)
+    )
+
+def job_card_dict(row, has_applied: bool = False, application_count: int = 0) -> dict:
+    # Build a JobCard-shaped dict from a job_card_query row
+    return {
+        "job_id": row[0],
+        "employer_id": row[1],
+        "company_name": row[2],
+        "title": row[3],
+        "description": row[4],
+        "job_type": row[5],
+        "location": row[6],
+        "pay_range": row[7],
+        "date_posted": row[8],
+        "is_active": row[9],
+        "has_applied": has_applied,
+        "application_count": application_count,
+    }
+
+def applicant_display_name(first_name, last_name, username) -> str:
+    # Use full name if available, otherwise username
+    if first_name and last_name:
+        return f"{first_name} {last_name}"
+    if first_name:
+        return first_name
+    return username
+
+def employer_application_query(db: Session, applications=models.Applications):
+    # Column-projected rows for the employer-facing application views
+    # (applications may be models.ApplicationsArchive, which has the same columns)
+    return (
+        db.query(
+            applications.application_id,
+            models.Users.first_name,
+            models.Users.last_name,
+            models.Users.username,
+            models.Users.email,
+            models.Users.user_id,
+            models.Jobs.title,
+            applications.cover_letter,
+            models.Users.resume_file,
+            applications.status,
+            applications.date_applied,
+        )
+        .join(models.Users, applications.user_id == models.Users.user_id)
+        .join(models.Jobs, applications.job_id == models.Jobs.job_id)
+    )
+
+def with_archived(live_rows, archived_rows, date_index):
+    # Merge two lists already sorted newest first into one
+    return list(heapq.merge(live_rows, archived_rows, key=lambda row: row[date_index] or datetime.min, reverse=True))
+
+VALID_APPLICATION_STATUSES = ("pending", "reviewed", "accepted", "rejected")
+
+def set_application_statuses(db: Session, employer_id: int | None, changes: dict) -> dict:
+    # Apply {application_id: status} in one UPDATE ... FROM jobs ... RETURNING.
+    # Rows on jobs the employer does not own are simply not matched.
+    if not changes:
+        return {}
+    stmt = (
+        update(models.Applications)
+        .where(models.Applications.job_id == models.Jobs.job_id)
+        .where(models.Jobs.employer_id == employer_id)
+        .where(models.Applications.application_id.in_(list(changes)))
+        .values(status=case(changes, value=models.Applications.application_id))
+        .returning(models.Applications.application_id, models.Applications.status)
+        .execution_options(synchronize_session=False)
+    )
+    return dict(db.execute(stmt).all())
+
+def existing_application_ids(db: Session, application_ids) -> set:
+    # Failure path only: tell "does not exist" apart from "not yours"
+    rows = db.query(models.Applications.application_id).filter(models.Applications.application_id.in_(list(application_ids))).all()
+    return {row[0] for row in rows}
+
+def employer_application_dict(row) -> dict:
+    # Build an EmployerApplicationRead-shaped dict from an employer_application_query row
+    return {
+        "application_id": row[0],
+        "applicant_name": applicant_display_name(row[1], row[2], row[3]),
+        "applicant_email": row[4],
+        "applicant_user_id": row[5],
+        "job_title": row[6],
+        "cover_letter": row[7],
+        "resume_file": row[8],
+        "status": row[9],
+        "date_applied": row[10],
+    }
+
 @router.get("/", response_model=List[schemas_job.JobCard])
 def read_jobs(
+    request: Request,
+    near: Optional[str] = None,
+    radius: float = Query(config.GEO_DEFAULT_RADIUS_MILES, gt=0, le=geo.MAX_RADIUS_MILES),
+    min_pay: Optional[float] = Query(None, ge=0),
+    max_pay: Optional[float] = Query(None, ge=0),
+    pay_period: str = Query("hourly", pattern="^(hourly|annual)$"),
+    sort: str = Query("date", pattern="^(date|pay)$"),
     db: Session = Depends(get_db),
-    current_user: models.Users = Depends(get_user_from_token)
+    current_user: Claims = Depends(get_claims)
 ):
     # Return active jobs enriched with employer info and application status
-    jobs_query = (
-        db.query(models.Jobs)
-        .join(models.Employers)
-        .filter(models.Jobs.is_active == True)
-        .order_by(models.Jobs.date_posted.desc())
-        .all()
-    )
+    # near= (place or "lat,lon") limits the feed to postings within radius miles
+    # min_pay/max_pay (in pay_period units) keep postings whose range reaches them
+    center = geo.geocode(near) if near else None
+    if near and center is None:
+        raise HTTPException(status_code=400, detail="Unknown location")
+
+    # The feed only changes when the catalog or this user's applications do,
+    # so its ETag comes from those counters and a match skips the jobs query
+    applications_key = versions.applications_key(current_user.user_id)
+    current = versions.get_versions(db, versions.JOBS_CATALOG, applications_key)
+    etag = f'W/"jobs-{current[versions.JOBS_CATALOG]}-{current[applications_key]}-u{current_user.user_id}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if versions.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    query = job_card_query(db).filter(models.Jobs.is_active == True, models.Jobs.duplicate_of.is_(None))
+    distances = {}
+    if center is not None:
+        query = query.add_columns(models.Jobs.latitude, models.Jobs.longitude).filter(
+            geo.within_radius(db, models.Jobs, center, radius, models.Jobs.is_active == True)
+        )
+    # Pay is stored as hourly equivalents, so filters and sort=pay are plain range scans on idx_jobs_active_pay
+    if min_pay is not None:
+        query = query.filter(models.Jobs.pay_max >= pay.to_hourly(min_pay, pay_period))
+    if max_pay is not None:
+        query = query.filter(models.Jobs.pay_min <= pay.to_hourly(max_pay, pay_period))
+    if sort == "pay":
+        query = query.order_by(models.Jobs.pay_max.desc().nulls_last(), models.Jobs.date_posted.desc())
+    else:
+        query = query.order_by(models.Jobs.date_posted.desc())
+    rows = query.all()
+    if center is not None:
+        # The index only narrows to cells around the circle; keep what is really inside
+        for row in rows:
+            distances[row[0]] = geo.haversine_miles(center.latitude, center.longitude, row[10], row[11])
+        rows = [row for row in rows if distances[row[0]] <= radius]
     
     # Get user's applications
     user_applications = db.query(models.Applications.job_id).filter(
@@ -36,89 +198,199 @@ def read_jobs(
     ).all()
     applied_job_ids = {app.job_id for app in user_applications}
     
-    results = []
-    for job in jobs_query:
-        results.append(schemas_job.JobCard(
-            job_id=job.job_id,
-            employer_id=job.employer_id,
-            company_name=job.employer.company_name,
-            title=job.title,
-            description=job.description,
-            job_type=job.job_type,
-            location=job.location,
-            pay_range=job.pay_range,
-            date_posted=job.date_posted,
-            is_active=job.is_active,
-            has_applied=job.job_id in applied_job_ids
-        ))
-        
-    return results
+    results = [job_card_dict(row, has_applied=row[0] in applied_job_ids) for row in rows]
+    if center is not None:
+        for result in results:
+            result["distance_miles"] = round(distances[result["job_id"]], 1)
+    return FastJSONResponse(results, headers=headers)
+
+@router.get("/recommended", response_model=List[schemas_job.JobCard])
+def read_recommended_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Claims = Depends(get_claims)
+):
+    # Active jobs most similar to the ones this applicant applied to (recommender.py)
+    if current_user.role == 'employer':
+        raise HTTPException(status_code=403, detail="Recommendations are only available to applicants")
+
+    applied = (
+        db.query(models.Jobs.job_id, models.Jobs.title, models.Jobs.description, models.Jobs.job_type, models.Jobs.location)
+        .join(models.Applications, models.Applications.job_id == models.Jobs.job_id)
+        .filter(models.Applications.user_id == current_user.user_id)
+        .all()
+    )
+    applied_job_ids = {row[0] for row in applied}
+    columns, weights = recommender.index.profile([row[1:] for row in applied])
+    scores = {
+        job_id: score
+        for job_id, score in recommender.index.score(columns, weights, recommender.CANDIDATES + len(applied_job_ids))
+        if job_id not in applied_job_ids
+    }
+
+    query = job_card_query(db).filter(models.Jobs.is_active == True, models.Jobs.duplicate_of.is_(None))
+    if scores:
+        # The index may still hold closed postings; the database has the final say
+        rows = query.filter(models.Jobs.job_id.in_(scores)).all()
+        rows.sort(key=lambda row: -scores[row[0]])
+    else:
+        # Nothing to go on yet: newest postings the user has not applied to
+        if applied_job_ids:
+            query = query.filter(models.Jobs.job_id.notin_(applied_job_ids))
+        rows = query.order_by(models.Jobs.date_posted.desc()).limit(limit).all()
+    return FastJSONResponse([job_card_dict(row) for row in rows[:limit]])
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 def create_job(job_data: schemas_job.JobCreate, 
                db: Session = Depends(get_db), 
-               current_user: models.Users = Depends(get_user_from_token)):
+               current_user: Claims = Depends(get_claims)):
     
     # Allow employers and admins to create a new job posting
     if current_user.role not in ['employer', 'admin']:
         raise HTTPException(status_code=403, detail="Only employers and admins can post jobs")
 
-    employer_profile = db.query(models.Employers).filter(models.Employers.user_id == current_user.user_id).first()
-    
-    if not employer_profile:
+    employer_id = employer_id_for(current_user, db)
+    if employer_id is None:
         raise HTTPException(status_code=400, detail="Employer profile not found. Please complete your profile first.")
 
+    coordinates = geo.coordinates_for(job_data.location)
+    if job_data.location is None:
+        # No location of its own: the posting is wherever the employer is
+        coordinates = dict(zip(
+            ("latitude", "longitude", "geohash"),
+            db.query(models.Employers.latitude, models.Employers.longitude, models.Employers.geohash)
+            .filter(models.Employers.employer_id == employer_id)
+            .one(),
+        ))
+
+    # Reposts of one of the employer's active postings are flagged or refused (dedupe.py)
+    signature = duplicate_of = None
+    if config.DEDUPE_MODE in ("flag", "reject"):
+        signature = dedupe.signature(job_data.title, job_data.description)
+        duplicate_of = dedupe.detector.find_duplicate(db, employer_id, signature)
+        if duplicate_of is not None and config.DEDUPE_MODE == "reject":
+            raise HTTPException(status_code=409, detail=f"This posting duplicates job {duplicate_of}")
+
     new_job = models.Jobs(
-        employer_id=employer_profile.employer_id,
+        employer_id=employer_id,
         title=job_data.title,
         description=job_data.description,
         job_type=job_data.job_type,
         location=job_data.location,
         pay_range=job_data.pay_range,
-        is_active=True
+        is_active=True,
+        expires_at=default_expiry(),
+        duplicate_of=duplicate_of,
+        **coordinates,
+        **pay.parse_pay_range(job_data.pay_range).columns()
     )
     
     db.add(new_job)
+    if signature is not None:
+        db.flush()
+        db.add(models.JobSignatures(job_id=new_job.job_id, employer_id=employer_id, signature=signature.tobytes()))
+    versions.bump(db, versions.JOBS_CATALOG)
     db.commit()
     db.refresh(new_job)
-    return {"message": "Job created successfully", "job_id": new_job.job_id}
+    if signature is not None:
+        dedupe.detector.add(employer_id, new_job.job_id, signature)
+    if config.RECOMMENDER_ENABLED:
+        # Other workers pick the posting up on their next recommender sync
+        recommender.index.add_job(new_job.job_id, new_job.title, new_job.description, new_job.job_type, new_job.location)
+    return {"message": "Job created successfully", "job_id": new_job.job_id, "duplicate_of": duplicate_of}
+
+@router.post("/import", response_model=schemas_job.JobImportRead)
+def import_jobs(
+    file: UploadFile,
+    background_tasks: BackgroundTasks,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+    current_user: Claims = Depends(get_claims)
+):
+    # Post many jobs from one CSV/NDJSON file (job_import.py); large files are
+    # imported in the background and answered with 202 and the import's id
+    if current_user.role not in ['employer', 'admin']:
+        raise HTTPException(status_code=403, detail="Only employers and admins can post jobs")
+    employer_id = employer_id_for(current_user, db)
+    if employer_id is None:
+        raise HTTPException(status_code=400, detail="Employer profile not found. Please complete your profile first.")
+    file_format = format or job_import.format_for(file.filename)
+    if file_format is None:
+        raise HTTPException(status_code=400, detail="Upload a .csv or .ndjson file, or pass format=csv|ndjson")
+
+    record = models.JobImports(employer_id=employer_id, filename=file.filename, status="pending")
+    db.add(record)
+    db.commit()
+    db.refresh(record)
+
+    if file.size is not None and file.size > config.JOB_IMPORT_SYNC_BYTES:
+        # The upload's temp file goes away with the request, so keep a copy for the task
+        config.JOB_IMPORT_DIR.mkdir(parents=True, exist_ok=True)
+        path = config.JOB_IMPORT_DIR / f"import-{record.import_id}.{file_format}"
+        with path.open("wb") as saved:
+            shutil.copyfileobj(file.file, saved)
+        background_tasks.add_task(job_import.import_saved_file, record.import_id, str(path), file_format)
+        return FastJSONResponse(job_import.import_dict(record), status_code=status.HTTP_202_ACCEPTED)
+
+    job_import.import_file(db, record, file.file, file_format)
+    return FastJSONResponse(job_import.import_dict(record))
+
+@router.get("/import/{import_id}", response_model=schemas_job.JobImportRead)
+def read_job_import(
+    import_id: int,
+    db: Session = Depends(get_db),
+    current_user: Claims = Depends(get_claims)
+):
+    # Progress and row errors of one of the employer's imports
+    record = (
+        db.query(models.JobImports)
+        .filter(models.JobImports.import_id == import_id)
+        .filter(models.JobImports.employer_id == employer_id_for(current_user, db))
+        .first()
+    )
+    if not record:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return FastJSONResponse(job_import.import_dict(record))
 
 @router.get("/{job_id}", response_model=schemas_job.JobCard)
 def read_job_detail(job_id: int, db: Session = Depends(get_db)):
     # Fetch a single job with employer info
-    job = db.query(models.Jobs).join(models.Employers).filter(models.Jobs.job_id == job_id).first()
-    if not job:
+    row = job_card_query(db).filter(models.Jobs.job_id == job_id).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return schemas_job.JobCard(
-        job_id=job.job_id,
-        employer_id=job.employer_id,
-        company_name=job.employer.company_name,
-        title=job.title,
-        description=job.description,
-        job_type=job.job_type,
-        location=job.location,
-        pay_range=job.pay_range,
-        date_posted=job.date_posted,
-        is_active=job.is_active
-    )
+    # Public and user-independent: let the edge cache it, tagged for purging
+    headers = edge_cache.surrogate_headers(edge_cache.job_key(row[0]), edge_cache.employer_key(row[1]))
+    return FastJSONResponse(job_card_dict(row), headers=headers)
 
 @router.post("/{job_id}/apply", status_code=status.HTTP_201_CREATED)
 def apply_for_job(job_id: int, 
                   application_data: schemas_job.ApplicationCreate, 
                   db: Session = Depends(get_db), 
-                  current_user: models.Users = Depends(get_user_from_token)):
+                  current_user: Claims = Depends(get_claims)):
 
     # Submit an application for a specific job
     # Block employers from applying to jobs
     if current_user.role == 'employer':
         raise HTTPException(status_code=403, detail="Employers cannot apply to jobs")
     
-    # Block duplicate applications from the same user
-    existing_app = db.query(models.Applications).filter(
-        models.Applications.job_id == job_id,
-        models.Applications.user_id == current_user.user_id
-    ).first()
+    # Block duplicate applications from the same user. A partitioned
+    # applications table has no UNIQUE(job_id, user_id) (archival.py), so
+    # concurrent applies are serialised per (job, user) until commit
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:job_id, :user_id)"),
+                   {"job_id": job_id, "user_id": current_user.user_id})
+    existing_app = db.query(or_(
+        db.query(models.Applications.application_id).filter(
+            models.Applications.job_id == job_id,
+            models.Applications.user_id == current_user.user_id
+        ).exists(),
+        # Archived applications count too: the job may have been reopened
+        db.query(models.ApplicationsArchive.application_id).filter(
+            models.ApplicationsArchive.job_id == job_id,
+            models.ApplicationsArchive.user_id == current_user.user_id
+        ).exists(),
+    )).scalar()
 
     if existing_app:
         raise HTTPException(status_code=400, detail="You have already applied for this job")
@@ -131,126 +403,166 @@ def apply_for_job(job_id: int,
     )
 
     db.add(new_application)
+    versions.bump(db, versions.applications_key(current_user.user_id))
     db.commit()
+    if config.RELEVANCE_ENABLED:
+        relevance.worker.enqueue(job_id)
     return {"message": "Application submitted successfully"}
 
-@router.get("/applications/me", response_model=List[schemas_job.ApplicationRead])
-def get_my_applications(
-    db: Session = Depends(get_db), 
-    current_user: models.Users = Depends(get_user_from_token)
-):
-    # Applicant view: list their submissions with job metadata
-    applications = (
+def my_applications(db: Session, user_id: int, applications=models.Applications):
+    # Applicant's submissions with job metadata, newest first
+    return (
         db.query(
-            models.Applications.application_id,
-            models.Applications.status,
-            models.Applications.date_applied,
-            models.Applications.job_id,
+            applications.application_id,
+            applications.status,
+            applications.date_applied,
+            applications.job_id,
             models.Jobs.title.label("job_title"),
             models.Employers.company_name.label("company_name")
         )
-        .join(models.Jobs, models.Applications.job_id == models.Jobs.job_id)
+        .join(models.Jobs, applications.job_id == models.Jobs.job_id)
         .join(models.Employers, models.Jobs.employer_id == models.Employers.employer_id)
-        .filter(models.Applications.user_id == current_user.user_id)
-        .order_by(models.Applications.date_applied.desc())
+        .filter(applications.user_id == user_id)
+        .order_by(applications.date_applied.desc())
         .all()
     )
 
+@router.get("/applications/me", response_model=List[schemas_job.ApplicationRead])
+def get_my_applications(
+    include_archived: bool = False,
+    db: Session = Depends(get_db), 
+    current_user: Claims = Depends(get_claims)
+):
+    # Applicant view: list their submissions with job metadata
+    applications = my_applications(db, current_user.user_id)
+    if include_archived:
+        archived = my_applications(db, current_user.user_id, models.ApplicationsArchive)
+        applications = with_archived(applications, archived, 2)
+
     return applications
 
 @router.get("/employer/jobs", response_model=List[schemas_job.JobCard])
 def get_employer_jobs(
     db: Session = Depends(get_db),
-    current_user: models.Users = Depends(get_user_from_token)
+    current_user: Claims = Depends(get_claims)
 ):
     # Get all jobs posted by the employer (both active and inactive)
     if current_user.role not in ['employer', 'admin']:
         raise HTTPException(status_code=403, detail="Only employers and admins can access this")
     
-    employer_profile = db.query(models.Employers).filter(models.Employers.user_id == current_user.user_id).first()
-    if not employer_profile:
+    employer_id = employer_id_for(current_user, db)
+    if employer_id is None:
         raise HTTPException(status_code=404, detail="Employer profile not found")
     
-    jobs = (
-        db.query(models.Jobs)
-        .join(models.Employers)
-        .filter(models.Employers.employer_id == employer_profile.employer_id)
+    # Count applications per job in one grouped subquery instead of one query per job
+    application_counts = (
+        db.query(
+            models.Applications.job_id.label("job_id"),
+            func.count(models.Applications.application_id).label("application_count")
+        )
+        .group_by(models.Applications.job_id)
+        .subquery()
+    )
+
+    rows = (
+        job_card_query(db, func.coalesce(application_counts.c.application_count, 0))
+        .outerjoin(application_counts, application_counts.c.job_id == models.Jobs.job_id)
+        .filter(models.Jobs.employer_id == employer_id)
         .order_by(models.Jobs.date_posted.desc())
         .all()
     )
     
-    results = []
-    for job in jobs:
-        # Count applications for this job
-        application_count = db.query(models.Applications).filter(
-            models.Applications.job_id == job.job_id
-        ).count()
-        
-        results.append(schemas_job.JobCard(
-            job_id=job.job_id,
-            employer_id=job.employer_id,
-            company_name=job.employer.company_name,
-            title=job.title,
-            description=job.description,
-            job_type=job.job_type,
-            location=job.location,
-            pay_range=job.pay_range,
-            date_posted=job.date_posted,
-            is_active=job.is_active,
-            application_count=application_count
-        ))
-    
-    return results
+    results = [job_card_dict(row, application_count=row[10]) for row in rows]
+    return FastJSONResponse(results)
 
 @router.get("/employer/applications", response_model=List[schemas_job.EmployerApplicationRead])
 def get_employer_applications(
+    include_archived: bool = False,
     db: Session = Depends(get_db),
-    current_user: models.Users = Depends(get_user_from_token)
+    current_user: Claims = Depends(get_claims)
 ):
     # Employer view: applications across jobs they own
     if current_user.role not in ['employer', 'admin']:
         raise HTTPException(status_code=403, detail="Only employers and admins can access this")
         
     # Employer view: applications across jobs they own
-    applications = (
-        db.query(models.Applications, models.Users, models.Jobs)
-        .join(models.Users, models.Applications.user_id == models.Users.user_id)
-        .join(models.Jobs, models.Applications.job_id == models.Jobs.job_id)
-        .join(models.Employers, models.Jobs.employer_id == models.Employers.employer_id)
-        .filter(models.Employers.user_id == current_user.user_id)
+    employer_id = employer_id_for(current_user, db)
+    rows = (
+        employer_application_query(db)
+        .filter(models.Jobs.employer_id == employer_id)
         .order_by(models.Applications.date_applied.desc())
         .all()
     )
+    if include_archived:
+        archived = (
+            employer_application_query(db, models.ApplicationsArchive)
+            .filter(models.Jobs.employer_id == employer_id)
+            .order_by(models.ApplicationsArchive.date_applied.desc())
+            .all()
+        )
+        rows = with_archived(rows, archived, 10)
 
-    results = []
-    for app, user, job in applications:
-        # Use full name if available, otherwise username
-        if user.first_name and user.last_name:
-            applicant_name = f"{user.first_name} {user.last_name}"
-        elif user.first_name:
-            applicant_name = user.first_name
-        else:
-            applicant_name = user.username
-        
-        results.append(schemas_job.EmployerApplicationRead(
-            application_id=app.application_id,
-            applicant_name=applicant_name,
-            applicant_email=user.email,
-            applicant_user_id=user.user_id,
-            job_title=job.title,
-            cover_letter=app.cover_letter,
-            resume_file=user.resume_file,
-            status=app.status,
-            date_applied=app.date_applied
-        ))
+    return FastJSONResponse([employer_application_dict(row) for row in rows])
+
+EXPORT_FIELDS = (
+    "application_id", "job_id", "job_title", "applicant_name", "applicant_email", "applicant_user_id",
+    "status", "date_applied", "cover_letter", "resume_file",
+)
+EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
 
-    return results
+# Declared before /employer/applications/{job_id} so "export" is not read as a job id
+@router.get("/employer/applications/export")
+def export_employer_applications(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    job_id: Optional[int] = None,
+    status_filter: Optional[str] = Query(None, alias="status", pattern="^(pending|reviewed|accepted|rejected)$"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: Claims = Depends(get_claims)
+):
+    # Stream every application to the employer's jobs as CSV or NDJSON, newest first;
+    # date_from is inclusive and date_to exclusive
+    if current_user.role not in ['employer', 'admin']:
+        raise HTTPException(status_code=403, detail="Only employers and admins can access this")
+    employer_id = employer_id_for(current_user, db)
+
+    def build_query(export_db: Session):
+        query = (
+            employer_application_query(export_db)
+            .add_columns(models.Applications.job_id)
+            .filter(models.Jobs.employer_id == employer_id)
+        )
+        if job_id is not None:
+            query = query.filter(models.Applications.job_id == job_id)
+        if status_filter is not None:
+            query = query.filter(models.Applications.status == status_filter)
+        if date_from is not None:
+            query = query.filter(models.Applications.date_applied >= date_from)
+        if date_to is not None:
+            query = query.filter(models.Applications.date_applied < date_to)
+        return query.order_by(models.Applications.date_applied.desc(), models.Applications.application_id.desc())
+
+    def records():
+        for row in exports.open_rows(SessionLocal, build_query):
+            record = employer_application_dict(row)
+            record["job_id"] = row[11]
+            yield record
+
+    if format == "csv":
+        body = exports.stream_csv(EXPORT_FIELDS, records())
+    else:
+        body = exports.stream_ndjson({field: record[field] for field in EXPORT_FIELDS} for record in records())
+    headers = {"Content-Disposition": f'attachment; filename="applications.{format}"'}
+    return StreamingResponse(body, media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
 
 @router.get("/employer/applications/{job_id}", response_model=List[schemas_job.EmployerApplicationRead])
 def get_employer_applications_for_job(
     job_id: int,
+    include_archived: bool = False,
+    sort: str = Query("date", pattern="^(date|relevance)$"),
     db: Session = Depends(get_db),
-    current_user: models.Users = Depends(get_user_from_token)
+    current_user: Claims = Depends(get_claims)
 ):
     # Employer view: applications for a specific job
     if current_user.role not in ['employer', 'admin']:
@@ -259,9 +571,8 @@ def get_employer_applications_for_job(
     # Verify job ownership
     job = (
         db.query(models.Jobs)
-        .join(models.Employers)
         .filter(models.Jobs.job_id == job_id)
-        .filter(models.Employers.user_id == current_user.user_id)
+        .filter(models.Jobs.employer_id == employer_id_for(current_user, db))
         .first()
     )
     
@@ -269,44 +580,76 @@ def get_employer_applications_for_job(
         raise HTTPException(status_code=404, detail="Job not found or you don't have permission")
     
     # Get applications for this specific job
-    applications = (
-        db.query(models.Applications, models.Users, models.Jobs)
-        .join(models.Users, models.Applications.user_id == models.Users.user_id)
-        .join(models.Jobs, models.Applications.job_id == models.Jobs.job_id)
-        .filter(models.Applications.job_id == job_id)
-        .order_by(models.Applications.date_applied.desc())
-        .all()
-    )
+    query = employer_application_query(db).filter(models.Applications.job_id == job_id)
+    if sort == "relevance":
+        # Precomputed by relevance.py at the job's current version; unscored applicants go last
+        scores = models.ApplicationScores
+        query = query.add_columns(scores.score).outerjoin(scores, and_(
+            scores.application_id == models.Applications.application_id,
+            scores.job_version == relevance.job_version(job.title, job.description),
+        )).order_by(scores.score.desc().nulls_last(), models.Applications.date_applied.desc())
+    else:
+        query = query.order_by(models.Applications.date_applied.desc())
+    rows = query.all()
+    if sort == "relevance" and config.RELEVANCE_ENABLED and any(row[11] is None for row in rows):
+        relevance.worker.enqueue(job_id)
+    if include_archived:
+        archived = (
+            employer_application_query(db, models.ApplicationsArchive)
+            .filter(models.ApplicationsArchive.job_id == job_id)
+            .order_by(models.ApplicationsArchive.date_applied.desc())
+            .all()
+        )
+        # Archived applications are not scored; they follow the live ones
+        rows = rows + archived if sort == "relevance" else with_archived(rows, archived, 10)
 
-    results = []
-    for app, user, job in applications:
-        # Use full name if available, otherwise username
-        if user.first_name and user.last_name:
-            applicant_name = f"{user.first_name} {user.last_name}"
-        elif user.first_name:
-            applicant_name = user.first_name
-        else:
-            applicant_name = user.username
-        
-        results.append(schemas_job.EmployerApplicationRead(
-            application_id=app.application_id,
-            applicant_name=applicant_name,
-            applicant_email=user.email,
-            applicant_user_id=user.user_id,
-            job_title=job.title,
-            cover_letter=app.cover_letter,
-            resume_file=user.resume_file,
-            status=app.status,
-            date_applied=app.date_applied
-        ))
+    results = [employer_application_dict(row) for row in rows]
+    if sort == "relevance":
+        for result, row in zip(results, rows):
+            result["relevance"] = row[11] if len(row) > 11 else None
+    return FastJSONResponse(results)
 
-    return results
+def resume_archive_name(first_name, last_name, username, user_id: int, resume_file: str) -> str:
+    # "Jane_Doe_42.pdf": applicant name, user id to keep names unique, original extension
+    name = re.sub(r"[^A-Za-z0-9]+", "_", applicant_display_name(first_name, last_name, username)).strip("_")
+    return f"{name or 'applicant'}_{user_id}{os.path.splitext(resume_file)[1].lower()}"
+
+@router.get("/employer/applications/{job_id}/resumes.zip")
+def download_job_resumes(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: Claims = Depends(get_claims)
+):
+    # Every applicant's resume for one job as a single streamed ZIP
+    if current_user.role not in ['employer', 'admin']:
+        raise HTTPException(status_code=403, detail="Only employers and admins can access this")
+    job = (
+        db.query(models.Jobs.job_id)
+        .filter(models.Jobs.job_id == job_id)
+        .filter(models.Jobs.employer_id == employer_id_for(current_user, db))
+        .first()
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or you don't have permission")
+
+    # One small row per applicant; the files themselves are read as the archive streams
+    applicants = (
+        db.query(models.Users.first_name, models.Users.last_name, models.Users.username, models.Users.user_id, models.Users.resume_file)
+        .join(models.Applications, models.Applications.user_id == models.Users.user_id)
+        .filter(models.Applications.job_id == job_id, models.Users.resume_file.isnot(None))
+        .order_by(models.Applications.date_applied)
+        .all()
+    )
+    files = [(resume_archive_name(*row), row.resume_file) for row in applicants]
+    headers = {"Content-Disposition": f'attachment; filename="job-{job_id}-resumes.zip"'}
+    return StreamingResponse(exports.stream_zip(files), media_type="application/zip", headers=headers)
 
 @router.put("/{job_id}/toggle-active")
 def toggle_job_active(
     job_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: models.Users = Depends(get_user_from_token)
+    current_user: Claims = Depends(get_claims)
 ):
     # Toggle job active status (only for job owner)
     if current_user.role not in ['employer', 'admin']:
@@ -315,9 +658,8 @@ def toggle_job_active(
     # Verify job ownership
     job = (
         db.query(models.Jobs)
-        .join(models.Employers)
         .filter(models.Jobs.job_id == job_id)
-        .filter(models.Employers.user_id == current_user.user_id)
+        .filter(models.Jobs.employer_id == employer_id_for(current_user, db))
         .first()
     )
     
@@ -325,7 +667,15 @@ def toggle_job_active(
         raise HTTPException(status_code=404, detail="Job not found or you don't have permission")
     
     job.is_active = not job.is_active
+    if job.is_active and job.expires_at is not None and job.expires_at <= utcnow():
+        # Re-activating an expired posting starts a fresh TTL, else the next sweep undoes it
+        job.expires_at = default_expiry()
+    if not job.is_active:
+        # Its reposts were hidden behind it; one of them takes its place in the feeds
+        dedupe.promote_duplicates(db, [job_id])
+    versions.bump(db, versions.JOBS_CATALOG)
     db.commit()
+    edge_cache.purge_later(background_tasks, edge_cache.job_key(job_id))
     
     return {"message": "Job status updated", "is_active": job.is_active}
 
@@ -333,7 +683,7 @@ def toggle_job_active(
 def withdraw_application(
     job_id: int,
     db: Session = Depends(get_db),
-    current_user: models.Users = Depends(get_user_from_token)
+    current_user: Claims = Depends(get_claims)
 ):
     # Allow applicants to withdraw their application
     application = db.query(models.Applications).filter(
@@ -345,42 +695,67 @@ def withdraw_application(
         raise HTTPException(status_code=404, detail="Application not found")
     
     db.delete(application)
+    versions.bump(db, versions.applications_key(current_user.user_id))
     db.commit()
     
     return {"message": "Application withdrawn successfully"}
 
+@router.put("/applications/status", response_model=schemas_job.ApplicationStatusBulkResult)
+def update_application_statuses(
+    bulk: schemas_job.ApplicationStatusBulkUpdate,
+    db: Session = Depends(get_db),
+    current_user: Claims = Depends(get_claims)
+):
+    # Change many application statuses at once; ownership is checked inside the UPDATE
+    if current_user.role not in ['employer', 'admin']:
+        raise HTTPException(status_code=403, detail="Only employers and admins can update status")
+
+    # Later entries for the same application win
+    requested = {item.application_id: item.status for item in bulk.updates}
+    changes = {app_id: new_status for app_id, new_status in requested.items() if new_status in VALID_APPLICATION_STATUSES}
+
+    updated = set_application_statuses(db, employer_id_for(current_user, db), changes)
+    db.commit()
+
+    missing = changes.keys() - updated.keys()
+    existing = existing_application_ids(db, missing) if missing else set()
+
+    results = []
+    for app_id, new_status in requested.items():
+        if app_id in updated:
+            results.append({"application_id": app_id, "status": updated[app_id], "updated": True, "error": None})
+            continue
+        if app_id not in changes:
+            error = "Invalid status"
+        elif app_id in existing:
+            error = "You are not authorized to manage this application"
+        else:
+            error = "Application not found"
+        results.append({"application_id": app_id, "status": new_status, "updated": False, "error": error})
+
+    return {"updated": len(updated), "results": results}
+
 @router.put("/applications/{application_id}/status")
 def update_application_status(
     application_id: int,
     status_update: schemas_job.ApplicationStatusUpdate,
     db: Session = Depends(get_db),
-    current_user: models.Users = Depends(get_user_from_token)
+    current_user: Claims = Depends(get_claims)
 ):
     # Allow employers and admins to change an application's status
     if current_user.role not in ['employer', 'admin']:
         raise HTTPException(status_code=403, detail="Only employers and admins can update status")
 
-    valid_statuses = ["pending", "reviewed", "accepted", "rejected"]
-    if status_update.status not in valid_statuses:
+    if status_update.status not in VALID_APPLICATION_STATUSES:
         raise HTTPException(status_code=400, detail="Invalid status")
 
-    application = db.query(models.Applications).filter(models.Applications.application_id == application_id).first()
-    if not application:
-        raise HTTPException(status_code=404, detail="Application not found")
-
-    # Ensure the job belongs to the current employer before updating status
-    job_ownership = (
-        db.query(models.Jobs)
-        .join(models.Employers)
-        .filter(models.Jobs.job_id == application.job_id)
-        .filter(models.Employers.user_id == current_user.user_id)
-        .first()
-    )
+    # Ownership check and update in one statement
+    updated = set_application_statuses(db, employer_id_for(current_user, db), {application_id: status_update.status})
+    db.commit()
 
-    if not job_ownership:
+    if application_id not in updated:
+        if not existing_application_ids(db, [application_id]):
+            raise HTTPException(status_code=404, detail="Application not found")
         raise HTTPException(status_code=403, detail="You are not authorized to manage this application")
 
-    application.status = status_update.status
-    db.commit()
-    
-    return {"message": "Status updated successfully", "status": application.status}
+    return {"message": "Status updated successfully", "status": updated[application_id]}
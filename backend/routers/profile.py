@@ -1,22 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, UploadFile
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 import os
-import shutil
 from pathlib import Path
 
 from database import SessionLocal
 from models import Users
 from schemas_profile import ProfileUpdate, ProfileResponse, PasswordChange
-from routers.auth import get_user_from_token
+from routers.auth import get_claims, get_user_from_token, issue_tokens_for_user
 from security import verify_password, hash_password
+import versions
+from tracing import span
+import edge_cache
+from revocation import revoke_user_tokens
+import config
+from config import UPLOAD_DIR
+import relevance
 
 router = APIRouter(prefix="/profile", tags=["profile"])
 
-# Store uploaded resumes under a local uploads folder
-UPLOAD_DIR = Path("uploads/resumes")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
 def get_db():
     # Provide a DB session per request
     db = SessionLocal()
@@ -82,16 +84,35 @@ async def upload_resume(
     filename = f"resume_{user.user_id}{file_ext}"
     file_path = UPLOAD_DIR / filename
     
-    # Clear any previous resume for this user
-    if user.resume_file and os.path.exists(user.resume_file):
-        os.remove(user.resume_file)
-    
-    with file_path.open("wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    with span("profile.resume.write", file_ext=file_ext):
+        # Copy to a scratch file first so an oversized upload leaves the old resume alone
+        UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+        partial = file_path.with_name(filename + ".part")
+        size = 0
+        with partial.open("wb") as buffer:
+            while chunk := file.file.read(64 * 1024):
+                size += len(chunk)
+                if size > config.MAX_RESUME_BYTES:
+                    break
+                buffer.write(chunk)
+        if size > config.MAX_RESUME_BYTES:
+            partial.unlink()
+            raise HTTPException(
+                status_code=413,
+                detail=f"Resume must be at most {config.MAX_RESUME_BYTES // (1024 * 1024)} MB",
+            )
+        
+        # Clear any previous resume for this user
+        if user.resume_file and os.path.exists(user.resume_file):
+            os.remove(user.resume_file)
+        os.replace(partial, file_path)
     
     user.resume_file = str(file_path)
     db.commit()
     db.refresh(user)
+    if config.RELEVANCE_ENABLED:
+        # Applicant relevance scores include resume text
+        relevance.worker.enqueue_for_user(db, user.user_id)
     
     return {"filename": filename, "resume_file": str(file_path)}
 
@@ -111,6 +132,8 @@ def delete_resume(request: Request, db: Session = Depends(get_db)):
     
     user.resume_file = None
     db.commit()
+    if config.RELEVANCE_ENABLED:
+        relevance.worker.enqueue_for_user(db, user.user_id)
     
     return {"detail": "Resume deleted"}
 
@@ -121,7 +144,7 @@ def download_resume(
     db: Session = Depends(get_db)
 ):
     # Download a user's resume (for employers viewing applicants)
-    current_user = get_user_from_token(request, db)
+    current_user = get_claims(request)
     
     # Only employers can download other users' resumes
     if current_user.role != 'employer' and current_user.user_id != user_id:
@@ -131,7 +154,10 @@ def download_resume(
     if not target_user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    if not target_user.resume_file or not os.path.exists(target_user.resume_file):
+    # The file body itself is streamed by FileResponse under the request span
+    with span("profile.resume.stat"):
+        resume_exists = bool(target_user.resume_file) and os.path.exists(target_user.resume_file)
+    if not resume_exists:
         raise HTTPException(status_code=404, detail="Resume not found")
     
     filename = Path(target_user.resume_file).name
@@ -145,6 +171,7 @@ def download_resume(
 def change_password(
     password_data: PasswordChange,
     request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     # Change password after verifying the current one
@@ -154,7 +181,12 @@ def change_password(
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     
     user.password_hash = hash_password(password_data.new_password)
+    # Sign out every session, including access tokens still in flight; this
+    # one gets fresh tokens below
+    revoke_user_tokens(db, user.user_id, user.token_version)
+    user.token_version += 1
     db.commit()
+    issue_tokens_for_user(response, user)
     
     return {"detail": "Password changed successfully"}
 
@@ -162,6 +194,7 @@ def change_password(
 def delete_account(
     password: str,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     # Delete user account after password verification
@@ -176,6 +209,11 @@ def delete_account(
         raise HTTPException(status_code=400, detail="Incorrect password")
     
     # Delete user (cascade will handle related records)
+    if user.role == 'employer':
+        versions.bump(db, versions.JOBS_CATALOG)
+        if user.employer:
+            edge_cache.purge_later(background_tasks, edge_cache.employer_key(user.employer.employer_id))
+    revoke_user_tokens(db, user.user_id, user.token_version)
     db.delete(user)
     db.commit()
     
@@ -183,7 +221,7 @@ def delete_account(
 
 
 @router.delete("/me")
-def delete_my_account(request: Request, db: Session = Depends(get_db)):
+def delete_my_account(request: Request, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Delete own account"""
     user = get_user_from_token(request, db)
     
@@ -192,6 +230,11 @@ def delete_my_account(request: Request, db: Session = Depends(get_db)):
         os.remove(user.resume_file)
     
     # Delete user (cascades to related records)
+    if user.role == 'employer':
+        versions.bump(db, versions.JOBS_CATALOG)
+        if user.employer:
+            edge_cache.purge_later(background_tasks, edge_cache.employer_key(user.employer.employer_id))
+    revoke_user_tokens(db, user.user_id, user.token_version)
     db.delete(user)
     db.commit()
     
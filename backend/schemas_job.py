@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 
 # Public job card returned to lists/detail pages
 class JobCard(BaseModel):
@@ -16,6 +16,8 @@ class JobCard(BaseModel):
     is_active: bool
     has_applied: bool = False
     application_count: int = 0
+    # Only set on /jobs?near= results
+    distance_miles: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -28,6 +30,32 @@ class JobCreate(BaseModel):
     location: Optional[str] = None
     pay_range: Optional[str] = None
 
+# One row of a bulk import (routers/jobs.py import_jobs), held to the jobs
+# table's constraints so a bad row is reported instead of failing its batch
+class JobImportRow(JobCreate):
+    title: str = Field(min_length=1, max_length=150)
+    description: str = Field(min_length=1)
+    job_type: Optional[Literal['full-time', 'part-time', 'gig', 'temporary', 'internship']] = None
+    location: Optional[str] = Field(None, max_length=100)
+    pay_range: Optional[str] = Field(None, max_length=50)
+
+# A row rejected by a bulk import, numbered from the first data row
+class ImportRowError(BaseModel):
+    row: Optional[int]
+    errors: List[str]
+
+# Bulk import status and outcome
+class JobImportRead(BaseModel):
+    import_id: int
+    status: str
+    filename: Optional[str]
+    total_rows: int
+    imported_rows: int
+    failed_rows: int
+    errors: List[ImportRowError]
+    created_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
 # Applicant submits cover letter when applying
 class ApplicationCreate(BaseModel):
     cover_letter: str
@@ -48,6 +76,24 @@ class ApplicationRead(BaseModel):
 class ApplicationStatusUpdate(BaseModel):
     status: str
 
+# Bulk status change: one entry per application
+class ApplicationStatusItem(BaseModel):
+    application_id: int
+    status: str
+
+class ApplicationStatusBulkUpdate(BaseModel):
+    updates: List[ApplicationStatusItem] = Field(min_length=1, max_length=500)
+
+class ApplicationStatusResult(BaseModel):
+    application_id: int
+    status: str
+    updated: bool
+    error: Optional[str] = None
+
+class ApplicationStatusBulkResult(BaseModel):
+    updated: int
+    results: List[ApplicationStatusResult]
+
 # Employer-facing view of applications to their job
 class EmployerApplicationRead(BaseModel):
     application_id: int
@@ -59,6 +105,8 @@ class EmployerApplicationRead(BaseModel):
     resume_file: Optional[str]
     status: str
     date_applied: datetime
+    # Only with sort=relevance; None until the application has been scored
+    relevance: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -1,27 +1,26 @@
-import os
-from dotenv import load_dotenv
+import uuid
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 from datetime import datetime, timedelta, timezone
-
-load_dotenv()
+from tracing import span
+from config import ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS, SECRET_KEY
 
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
-SECRET_KEY = os.getenv("SECRET_KEY")
 if not SECRET_KEY:
     raise ValueError("SECRET_KEY is not set, please set it in the .env file.")
 
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # token lifetime (minutes)
 
 def hash_password(password: str) -> str:
     # Hash a plaintext password for storage
-    return pwd_context.hash(password)
+    with span("security.hash_password"):
+        return pwd_context.hash(password)
 
 def verify_password(plain: str, hashed: str) -> bool:
     # Check a plaintext password against a stored hash
-    return pwd_context.verify(plain, hashed)
+    with span("security.verify_password"):
+        return pwd_context.verify(plain, hashed)
 
 def create_access_token(data: dict, expires_delta=None):
     # Issue a signed JWT with an expiration claim
@@ -29,3 +28,29 @@ def create_access_token(data: dict, expires_delta=None):
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def decode_access_token(token: str) -> dict | None:
+    # Verify signature and expiry; None for any invalid token
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+
+def access_token_claims(user_id: int, role: str, employer_id: int | None, version: int) -> dict:
+    # Everything role checks and employer scoping need, signed into the token
+    return {
+        "sub": str(user_id),
+        "role": role,
+        "employer_id": employer_id,
+        "ver": version,
+        "type": "access",
+        # Token id, so this one token can be revoked (logout)
+        "jti": uuid.uuid4().hex,
+    }
+
+def create_refresh_token(user_id: int, version: int) -> str:
+    # Long-lived token only accepted by /auth/refresh, which re-checks the version
+    return create_access_token(
+        {"sub": str(user_id), "ver": version, "type": "refresh", "jti": uuid.uuid4().hex},
+        timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    )
@@ -0,0 +1,169 @@
+"""Production entry point for the API.
+
+Run from the backend directory:
+    python serve.py [--workers N] [--port 8000] [--max-requests 10000]
+
+Uvicorn workers run under gunicorn, which does the process management:
+    - WEB_CONCURRENCY workers (default: usable cores + 1)
+    - the app is imported once in the master before forking (preload), so
+      code and read-only data are shared copy-on-write between workers
+    - each worker is recycled after MAX_REQUESTS (+ random jitter up to
+      MAX_REQUESTS_JITTER) requests, which caps slow memory growth
+    - on SIGTERM workers stop accepting connections and get GRACEFUL_TIMEOUT
+      seconds to finish in-flight requests before being killed
+    - each worker's SQLAlchemy pool is sized so that all workers together
+      stay within DB_MAX_CONNECTIONS (see database.pool_settings)
+
+Without gunicorn (e.g. on Windows) it falls back to uvicorn's own
+multi-process supervisor with the same worker count, request limit and
+graceful timeout, but without preloading.
+"""
+import argparse
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # pragma: no cover - gunicorn is unavailable on Windows
+    BaseApplication = None
+
+logger = logging.getLogger("hustlehub.serve")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the HustleHub API with multiple workers")
+    parser.add_argument("--host", help="bind address (HOST)")
+    parser.add_argument("--port", type=int, help="bind port (PORT)")
+    parser.add_argument("--workers", type=int, help="worker processes (WEB_CONCURRENCY)")
+    parser.add_argument("--max-requests", type=int, help="recycle a worker after this many requests (MAX_REQUESTS)")
+    parser.add_argument("--graceful-timeout", type=int, help="seconds to drain on SIGTERM (GRACEFUL_TIMEOUT)")
+    return parser.parse_args(argv)
+
+
+def apply_overrides(args) -> None:
+    # Command-line flags go through the environment so config.py sees them in
+    # the master and in every worker, including the pool sizing in database.py
+    for name, value in (
+        ("HOST", args.host),
+        ("PORT", args.port),
+        ("WEB_CONCURRENCY", args.workers),
+        ("MAX_REQUESTS", args.max_requests),
+        ("GRACEFUL_TIMEOUT", args.graceful_timeout),
+    ):
+        if value is not None:
+            os.environ[name] = str(value)
+
+
+def prepare_metrics_dir(config) -> None:
+    # With several workers each one writes its samples to a shared directory;
+    # it has to exist before prometheus_client is first imported
+    if config.WEB_CONCURRENCY < 2:
+        return
+    if config.PROMETHEUS_MULTIPROC_DIR:
+        directory = Path(config.PROMETHEUS_MULTIPROC_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        # Samples left by a previous run would be aggregated as live workers
+        for stale in directory.glob("*.db"):
+            stale.unlink()
+    else:
+        directory = Path(tempfile.mkdtemp(prefix="hustlehub-metrics-"))
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(directory)
+    config.PROMETHEUS_MULTIPROC_DIR = str(directory)
+
+
+def post_fork(server, worker):
+    # Connections must never be shared across processes; drop any pooled in
+    # the master without closing them (the master still owns those sockets)
+    from database import engine
+    engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    # Remove the exited worker's live gauges from the multiprocess metrics
+    import config
+    if config.PROMETHEUS_MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_class() -> str:
+    # uvicorn.workers is deprecated in favour of the uvicorn-worker package
+    try:
+        import uvicorn_worker  # noqa: F401
+        return "uvicorn_worker.UvicornWorker"
+    except ImportError:
+        return "uvicorn.workers.UvicornWorker"
+
+
+def gunicorn_options(config) -> dict:
+    return {
+        "bind": f"{config.HOST}:{config.PORT}",
+        "workers": config.WEB_CONCURRENCY,
+        "worker_class": worker_class(),
+        "preload_app": True,
+        "max_requests": config.MAX_REQUESTS,
+        "max_requests_jitter": config.MAX_REQUESTS_JITTER,
+        "graceful_timeout": config.GRACEFUL_TIMEOUT,
+        "post_fork": post_fork,
+        "child_exit": child_exit,
+        "accesslog": "-",
+    }
+
+
+if BaseApplication is not None:
+
+    class HustleHubApplication(BaseApplication):
+        # Embedded gunicorn master configured from a dict instead of a config file
+
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from main import app
+            return app
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    apply_overrides(parse_args(argv))
+
+    import config
+    from database import pool_settings
+
+    prepare_metrics_dir(config)
+    pool = pool_settings()
+    logger.info(
+        "Starting %d workers on %s:%d (pool_size=%d, max_overflow=%d per worker, budget %d connections)",
+        config.WEB_CONCURRENCY,
+        config.HOST,
+        config.PORT,
+        pool["pool_size"],
+        pool["max_overflow"],
+        config.DB_MAX_CONNECTIONS,
+    )
+
+    if BaseApplication is not None:
+        HustleHubApplication(gunicorn_options(config)).run()
+        return
+
+    import uvicorn
+    uvicorn.run(
+        "main:app",
+        host=config.HOST,
+        port=config.PORT,
+        workers=config.WEB_CONCURRENCY,
+        limit_max_requests=config.MAX_REQUESTS,
+        limit_max_requests_jitter=config.MAX_REQUESTS_JITTER,
+        timeout_graceful_shutdown=config.GRACEFUL_TIMEOUT,
+    )
+
+
+if __name__ == "__main__":
+    main()
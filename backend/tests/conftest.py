@@ -4,6 +4,23 @@ Handles different authentication scenarios for local and CI environments.
 """
 import pytest
 import os
+import tempfile
+import time
+
+# The suite logs in many times from one client address; rate limits are
+# exercised separately in test_rate_limit.py
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+# Relevance, recommender and revocation tests score and sync themselves; keep the
+# background threads from adding statements to query-count and span assertions
+os.environ.setdefault("RELEVANCE_ENABLED", "false")
+os.environ.setdefault("RELEVANCE_SWEEP_SECONDS", "3600")
+os.environ.setdefault("RECOMMENDER_SYNC_SECONDS", "3600")
+os.environ.setdefault("REVOCATION_SYNC_SECONDS", "3600")
+# Keep the recommender index, saved import uploads and resumes out of the working tree
+os.environ.setdefault("RECOMMENDER_DIR", tempfile.mkdtemp(prefix="hustlehub-recommender-"))
+os.environ.setdefault("JOB_IMPORT_DIR", tempfile.mkdtemp(prefix="hustlehub-imports-"))
+os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp(prefix="hustlehub-resumes-"))
+
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -49,10 +66,48 @@ def client(test_db):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
-    test_client = TestClient(app)
-    yield test_client
+    # Entering the client runs the app's lifespan (create_all, upload dir)
+    with TestClient(app) as test_client:
+        yield test_client
     app.dependency_overrides.clear()
 
+def login(client, role, prefix="user"):
+    """Register a fresh user with role and log the client in as them
+
+    The username and email start with prefix plus the role; returns the
+    session cookies so a test can switch back to this user later.
+    Usage:
+        from tests.conftest import login
+        employer = login(client, "employer", "dup")
+    """
+    ts = int(time.time() * 1000000)
+    user = {"username": f"{prefix}{role}{ts}", "email": f"{prefix}{role}{ts}@test.com", "password": "Pass123!", "role": role}
+    client.post("/auth/register", json=user)
+    client.cookies.clear()
+    client.post("/auth/login", json={"email": user["email"], "password": user["password"]})
+    return dict(client.cookies)
+
+@pytest.fixture
+def query_budget():
+    """Fail the test when the wrapped block runs more SQL statements than declared
+
+    Usage:
+        with query_budget(3):
+            client.get("/jobs/")
+    """
+    from contextlib import contextmanager
+    from query_debug import count_queries
+
+    @contextmanager
+    def budget(max_queries):
+        with count_queries() as statements:
+            yield statements
+        if len(statements) > max_queries:
+            listing = "\n".join(f"  {i + 1}. {sql}" for i, sql in enumerate(statements))
+            pytest.fail(f"Query budget exceeded: {len(statements)} > {max_queries}\n{listing}")
+
+    return budget
+
 # Test data fixtures
 @pytest.fixture
 def sample_applicant():
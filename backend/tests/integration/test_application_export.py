@@ -0,0 +1,88 @@
+"""Streaming CSV/NDJSON export of employer applications"""
+import csv
+import io
+import json
+from datetime import timedelta
+import pytest
+
+pytestmark = pytest.mark.integration
+
+import exports
+from database import PrimarySessionLocal
+from models import Applications
+from revocation import utcnow
+from tests.conftest import login
+
+
+@pytest.fixture
+def employer_with_applications(client):
+    """Two jobs, three applications (one accepted, one backdated a month)"""
+    employer = login(client, "employer", "exp")
+    client.post("/employers", json={"company_name": "Export Co"})
+    first = client.post("/jobs/", json={"title": "Export cashier", "description": "Register", "job_type": "part-time"}).json()["job_id"]
+    second = client.post("/jobs/", json={"title": "Export stocker", "description": "Shelves", "job_type": "gig"}).json()["job_id"]
+    for job_id, letter in [(first, "=HYPERLINK(\"http://x\")"), (second, "Hello, \"quoted\"\nline two"), (first, "Hi")]:
+        login(client, "applicant", "exp")
+        client.post(f"/jobs/{job_id}/apply", json={"cover_letter": letter})
+
+    db = PrimarySessionLocal()
+    try:
+        applications = db.query(Applications).filter(Applications.job_id.in_([first, second])).order_by(Applications.application_id).all()
+        applications[0].status = "accepted"
+        applications[2].date_applied = utcnow() - timedelta(days=30)
+        db.commit()
+    finally:
+        db.close()
+    client.cookies.clear()
+    client.cookies.update(employer)
+    return first, second
+
+
+def test_csv_export(client, employer_with_applications):
+    """Test CSV has a header row, every application and safe cells"""
+    response = client.get("/jobs/employer/applications/export?format=csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="applications.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 3
+    assert list(rows[0]) == ["application_id", "job_id", "job_title", "applicant_name", "applicant_email",
+                             "applicant_user_id", "status", "date_applied", "cover_letter", "resume_file"]
+    letters = {row["cover_letter"] for row in rows}
+    assert "'=HYPERLINK(\"http://x\")" in letters
+    assert "Hello, \"quoted\"\nline two" in letters
+
+
+def test_ndjson_export_with_filters(client, employer_with_applications):
+    """Test NDJSON lines and the job, status and date filters"""
+    first, second = employer_with_applications
+
+    def export(query):
+        response = client.get(f"/jobs/employer/applications/export?format=ndjson{query}")
+        assert response.headers["content-type"] == "application/x-ndjson"
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    assert len(export("")) == 3
+    assert {row["job_id"] for row in export(f"&job_id={second}")} == {second}
+    assert [row["status"] for row in export("&status=accepted")] == ["accepted"]
+    since = (utcnow() - timedelta(days=7)).isoformat()
+    assert len(export(f"&date_from={since}")) == 2
+    assert len(export(f"&date_to={since}")) == 1
+    assert client.get("/jobs/employer/applications/export?status=bogus").status_code == 422
+
+
+def test_export_is_scoped_to_the_employer(client, employer_with_applications):
+    """Test other employers see nothing and applicants are refused"""
+    login(client, "employer", "exp")
+    client.post("/employers", json={"company_name": "Other Co"})
+    assert client.get("/jobs/employer/applications/export?format=ndjson").text == ""
+    login(client, "applicant", "exp")
+    assert client.get("/jobs/employer/applications/export").status_code == 403
+
+
+def test_csv_is_written_in_chunks(monkeypatch):
+    """Test the CSV generator yields bounded chunks instead of one body"""
+    monkeypatch.setattr(exports, "EXPORT_CHUNK_ROWS", 2)
+    chunks = list(exports.stream_csv(["a"], ({"a": n} for n in range(5))))
+    assert len(chunks) == 3
+    assert b"".join(chunks).decode().split() == ["a", "0", "1", "2", "3", "4"]
@@ -0,0 +1,201 @@
+"""Monthly partitioning and archival of applications and notifications"""
+from datetime import datetime, timedelta
+import pytest
+
+pytestmark = pytest.mark.integration
+
+from sqlalchemy import Column, Index, Integer, MetaData, Table, Text, TIMESTAMP, text
+import archival
+from archival import add_months, archive_all, detach_old_partitions, ensure_partitions, partition_table
+from database import PrimarySessionLocal, engine
+from models import Applications, ApplicationsArchive, Notifications, NotificationsArchive
+from revocation import utcnow
+from tests.conftest import login
+
+
+def closed_job_with_old_application(client):
+    """Employer posts a job, an applicant applies, the job is closed and the application backdated"""
+    login(client, "employer", "arch")
+    client.post("/employers", json={"company_name": "Archive Co"})
+    job_id = client.post("/jobs/", json={"title": "Stocker", "description": "Night shift", "job_type": "part-time"}).json()["job_id"]
+    employer_cookies = dict(client.cookies)
+
+    login(client, "applicant", "arch")
+    client.post(f"/jobs/{job_id}/apply", json={"cover_letter": "Hello"})
+    applicant_cookies = dict(client.cookies)
+
+    client.cookies.clear()
+    client.cookies.update(employer_cookies)
+    client.put(f"/jobs/{job_id}/toggle-active")
+
+    db = PrimarySessionLocal()
+    try:
+        db.query(Applications).filter(Applications.job_id == job_id).update(
+            {"date_applied": utcnow() - timedelta(days=400)}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+    return job_id, employer_cookies, applicant_cookies
+
+
+def count(model, *conditions):
+    db = PrimarySessionLocal()
+    try:
+        return db.query(model).filter(*conditions).count()
+    finally:
+        db.close()
+
+
+def test_closed_job_applications_move_to_archive(client):
+    """Test old applications of closed jobs leave the live table but stay readable on request"""
+    job_id, employer_cookies, applicant_cookies = closed_job_with_old_application(client)
+
+    moved = archive_all(older_than_days=365)
+    assert moved["applications"] >= 1
+    assert count(Applications, Applications.job_id == job_id) == 0
+    assert count(ApplicationsArchive, ApplicationsArchive.job_id == job_id) == 1
+
+    client.cookies.clear()
+    client.cookies.update(applicant_cookies)
+    assert all(app["job_id"] != job_id for app in client.get("/jobs/applications/me").json())
+    archived = [app for app in client.get("/jobs/applications/me?include_archived=true").json() if app["job_id"] == job_id]
+    assert len(archived) == 1
+
+    client.cookies.clear()
+    client.cookies.update(employer_cookies)
+    assert client.get(f"/jobs/employer/applications/{job_id}").json() == []
+    assert len(client.get(f"/jobs/employer/applications/{job_id}?include_archived=true").json()) == 1
+    assert len(client.get("/jobs/employer/applications?include_archived=true").json()) == 1
+
+
+def test_archived_applicant_cannot_apply_again(client):
+    """Test an applicant whose application was archived cannot reapply once the job reopens"""
+    job_id, employer_cookies, applicant_cookies = closed_job_with_old_application(client)
+    archive_all(older_than_days=365)
+    assert count(ApplicationsArchive, ApplicationsArchive.job_id == job_id) == 1
+
+    client.cookies.clear()
+    client.cookies.update(employer_cookies)
+    client.put(f"/jobs/{job_id}/toggle-active")
+    client.cookies.clear()
+    client.cookies.update(applicant_cookies)
+    response = client.post(f"/jobs/{job_id}/apply", json={"cover_letter": "Again"})
+    assert response.status_code == 400
+    assert count(Applications, Applications.job_id == job_id) == 0
+
+
+def test_recent_and_open_job_applications_stay_live(client):
+    """Test applications newer than the cutoff are not archived"""
+    job_id, _, _ = closed_job_with_old_application(client)
+    archive_all(older_than_days=1000)
+    assert count(Applications, Applications.job_id == job_id) == 1
+
+
+def test_old_read_notifications_are_archived(client):
+    """Test read notifications past the cutoff move; unread ones stay"""
+    login(client, "applicant", "arch")
+    user_id = client.get("/profile/me").json()["user_id"]
+    old = utcnow() - timedelta(days=400)
+    db = PrimarySessionLocal()
+    try:
+        db.add_all([
+            Notifications(user_id=user_id, message="read", is_read=True, created_at=old),
+            Notifications(user_id=user_id, message="unread", is_read=False, created_at=old),
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    archive_all(older_than_days=365, batch_size=1)
+    assert count(Notifications, Notifications.user_id == user_id) == 1
+    assert count(NotificationsArchive, NotificationsArchive.user_id == user_id, NotificationsArchive.message == "read") == 1
+
+
+def test_month_arithmetic():
+    """Test month offsets roll over year boundaries"""
+    assert add_months(datetime(2025, 11, 1), 3) == datetime(2026, 2, 1)
+    assert add_months(datetime(2025, 1, 1), -1) == datetime(2024, 12, 1)
+    assert archival.partition_name("applications", datetime(2026, 3, 1)) == "applications_p2026_03"
+
+
+@pytest.fixture
+def scratch_tables():
+    """A throwaway live/archive table pair shaped like notifications"""
+    if engine.dialect.name != "postgresql":
+        pytest.skip("Declarative partitioning needs Postgres")
+    metadata = MetaData()
+    live = Table(
+        "archival_scratch", metadata,
+        Column("event_id", Integer, primary_key=True, autoincrement=True),
+        Column("job_id", Integer),
+        Column("message", Text),
+        Column("created_at", TIMESTAMP),
+        Index("idx_archival_scratch_message", "message"),
+    )
+    archive = Table(
+        "archival_scratch_archive", metadata,
+        Column("event_id", Integer, primary_key=True),
+        Column("job_id", Integer),
+        Column("message", Text),
+        Column("created_at", TIMESTAMP),
+    )
+    metadata.drop_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS archival_scratch CASCADE"))
+    metadata.create_all(engine)
+    yield live, archive
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS archival_scratch CASCADE"))
+        conn.execute(text("DROP TABLE IF EXISTS archival_scratch_archive"))
+        conn.execute(text("DROP TABLE IF EXISTS archival_scratch_p2020_01"))
+        conn.execute(text("DROP TABLE IF EXISTS archival_scratch_p2020_02"))
+
+
+def test_partition_detach_and_archive(scratch_tables):
+    """Test conversion to monthly partitions, future partitions and detaching old months"""
+    live, archive = scratch_tables
+    with engine.begin() as conn:
+        conn.execute(live.insert(), [
+            {"message": "old", "created_at": datetime(2020, 1, 15)},
+            {"message": "new", "created_at": utcnow()},
+        ])
+        assert partition_table(conn, live, "created_at", months_ahead=1)
+        assert not partition_table(conn, live, "created_at")
+        assert archival.is_partitioned(conn, "archival_scratch")
+        # Ids keep coming from the original sequence
+        conn.execute(live.insert(), {"message": "after", "created_at": utcnow()})
+
+        months = [month for _, month, _ in archival.monthly_partitions(conn, "archival_scratch")]
+        assert months[0] == datetime(2020, 1, 1)
+        assert months[-1] == add_months(archival.month_start(utcnow()), 1)
+
+        created = ensure_partitions(conn, "archival_scratch", months_ahead=3)
+        assert len(created) == 2
+        assert ensure_partitions(conn, "archival_scratch", months_ahead=3) == []
+
+    moved = detach_old_partitions(engine, live, archive, datetime(2021, 1, 1))
+    assert moved == 1
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM archival_scratch")).scalar() == 2
+        assert conn.execute(text("SELECT message FROM archival_scratch_archive")).scalar() == "old"
+        assert conn.execute(text("SELECT to_regclass('archival_scratch_p2020_01')")).scalar() is None
+
+
+def test_months_with_open_job_applications_stay_attached(client, scratch_tables):
+    """Test a month is not detached while it holds applications to an active job"""
+    login(client, "employer", "arch")
+    client.post("/employers", json={"company_name": "Archive Co"})
+    open_job = client.post("/jobs/", json={"title": "Cashier", "description": "Days", "job_type": "part-time"}).json()["job_id"]
+    live, archive = scratch_tables
+    with engine.begin() as conn:
+        conn.execute(live.insert(), [
+            {"message": "closed", "job_id": None, "created_at": datetime(2020, 1, 15)},
+            {"message": "open", "job_id": open_job, "created_at": datetime(2020, 2, 15)},
+        ])
+        assert partition_table(conn, live, "created_at", months_ahead=0)
+
+    assert detach_old_partitions(engine, live, archive, datetime(2021, 1, 1)) == 1
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT message FROM archival_scratch")).scalars().all() == ["open"]
+        assert conn.execute(text("SELECT message FROM archival_scratch_archive")).scalars().all() == ["closed"]
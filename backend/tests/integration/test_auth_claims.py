@@ -0,0 +1,89 @@
+"""Signed role/employer claims and the access/refresh token pair"""
+import time
+import pytest
+
+pytestmark = pytest.mark.integration
+
+from query_debug import count_queries
+from routers.auth import COOKIE_NAME, REFRESH_COOKIE_NAME
+from security import decode_access_token
+
+
+def cookie(client, name):
+    """Value of a cookie regardless of its path"""
+    return next((c.value for c in client.cookies.jar if c.name == name), None)
+
+
+def register_and_login(client, role="applicant"):
+    ts = int(time.time() * 1000000)
+    user = {"username": f"claims{ts}", "email": f"claims{ts}@test.com", "password": "Pass123!", "role": role}
+    client.post("/auth/register", json=user)
+    assert client.post("/auth/login", json={"email": user["email"], "password": user["password"]}).status_code == 200
+    return user
+
+
+def test_login_issues_access_and_refresh_tokens(client):
+    """Test the access token carries role claims and the refresh token is separate"""
+    register_and_login(client)
+    access = decode_access_token(cookie(client, COOKIE_NAME))
+    refresh = decode_access_token(cookie(client, REFRESH_COOKIE_NAME))
+    assert access["type"] == "access" and access["role"] == "applicant" and access["employer_id"] is None
+    assert refresh["type"] == "refresh" and "role" not in refresh
+
+
+def test_refresh_token_is_not_an_access_token(client):
+    """Test a refresh token cannot be used to call the API"""
+    register_and_login(client)
+    refresh = cookie(client, REFRESH_COOKIE_NAME)
+    client.cookies.clear()
+    client.cookies.set(COOKIE_NAME, refresh)
+    assert client.get("/jobs/").status_code == 401
+
+
+def test_employer_profile_reissues_token_with_employer_id(client):
+    """Test creating a company profile puts employer_id into the access token"""
+    register_and_login(client, role="employer")
+    response = client.post("/employers", json={"company_name": "Claims Co"})
+    assert response.status_code == 200
+    claims = decode_access_token(cookie(client, COOKIE_NAME))
+    assert claims["employer_id"] == response.json()["employer_id"]
+
+
+def test_employer_endpoints_skip_user_and_employer_lookups(client):
+    """Test role checks and employer scoping come from the token"""
+    register_and_login(client, role="employer")
+    client.post("/employers", json={"company_name": "Claims Co"})
+    client.post("/jobs/", json={"title": "T", "description": "D", "job_type": "gig", "location": "Remote"})
+
+    with count_queries() as statements:
+        assert client.get("/jobs/employer/jobs").status_code == 200
+        assert client.get("/employers/me").status_code == 200
+    assert not any("FROM users" in statement for statement in statements)
+
+
+def test_refresh_rotates_tokens(client):
+    """Test /auth/refresh issues a new access token"""
+    register_and_login(client)
+    client.cookies.jar.clear(domain="testserver.local", path="/", name=COOKIE_NAME)
+    response = client.post("/auth/refresh")
+    assert response.status_code == 200
+    assert decode_access_token(cookie(client, COOKIE_NAME))["type"] == "access"
+
+
+def test_password_change_revokes_other_sessions(client):
+    """Test changing the password invalidates previously issued refresh tokens"""
+    user = register_and_login(client)
+    old_refresh = cookie(client, REFRESH_COOKIE_NAME)
+    old_access = cookie(client, COOKIE_NAME)
+
+    response = client.put("/profile/change-password", json={"current_password": user["password"], "new_password": "NewPass123!"})
+    assert response.status_code == 200
+    # This session keeps working with the reissued cookies
+    assert client.get("/profile/me").status_code == 200
+
+    client.cookies.clear()
+    client.cookies.set(REFRESH_COOKIE_NAME, old_refresh)
+    assert client.post("/auth/refresh").status_code == 401
+    client.cookies.clear()
+    client.cookies.set(COOKIE_NAME, old_access)
+    assert client.get("/profile/me").status_code == 401
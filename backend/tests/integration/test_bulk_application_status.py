@@ -0,0 +1,96 @@
+"""Bulk and single application status updates in one UPDATE statement"""
+import time
+import pytest
+from fastapi.testclient import TestClient
+
+pytestmark = pytest.mark.integration
+
+from main import app
+from query_debug import count_queries
+
+
+def new_user(client, role):
+    ts = int(time.time() * 1000000)
+    user = {"username": f"bulk{role}{ts}", "email": f"bulk{role}{ts}@test.com", "password": "Pass123!", "role": role}
+    client.post("/auth/register", json=user)
+    client.post("/auth/login", json={"email": user["email"], "password": user["password"]})
+    return user
+
+
+def employer_with_job(client):
+    new_user(client, "employer")
+    client.post("/employers", json={"company_name": "Bulk Co"})
+    response = client.post("/jobs/", json={"title": "T", "description": "D", "job_type": "gig", "location": "Remote"})
+    return response.json()["job_id"]
+
+
+def application_ids(client, job_id, count):
+    # Each applicant uses its own client so the employer session is untouched
+    for _ in range(count):
+        with TestClient(app) as applicant:
+            new_user(applicant, "applicant")
+            applicant.post(f"/jobs/{job_id}/apply", json={"cover_letter": "Hi"})
+    return [a["application_id"] for a in client.get(f"/jobs/employer/applications/{job_id}").json()]
+
+
+def test_bulk_update_reports_per_item_results(client):
+    """Test owned rows change while foreign, missing and invalid ones are reported"""
+    with TestClient(app) as other_employer:
+        foreign_job = employer_with_job(other_employer)
+        foreign_app = application_ids(other_employer, foreign_job, 1)[0]
+
+    job_id = employer_with_job(client)
+    mine = application_ids(client, job_id, 3)
+
+    payload = {"updates": [
+        {"application_id": mine[0], "status": "accepted"},
+        {"application_id": mine[1], "status": "rejected"},
+        {"application_id": mine[2], "status": "bogus"},
+        {"application_id": foreign_app, "status": "accepted"},
+        {"application_id": 987654321, "status": "reviewed"},
+    ]}
+    response = client.put("/jobs/applications/status", json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["updated"] == 2
+    errors = {r["application_id"]: r["error"] for r in body["results"]}
+    assert errors[mine[0]] is None and errors[mine[1]] is None
+    assert errors[mine[2]] == "Invalid status"
+    assert errors[foreign_app] == "You are not authorized to manage this application"
+    assert errors[987654321] == "Application not found"
+
+    statuses = {a["application_id"]: a["status"] for a in client.get(f"/jobs/employer/applications/{job_id}").json()}
+    assert statuses == {mine[0]: "accepted", mine[1]: "rejected", mine[2]: "pending"}
+
+
+def test_bulk_update_is_one_statement(client):
+    """Test ownership check and every change share a single UPDATE"""
+    job_id = employer_with_job(client)
+    ids = application_ids(client, job_id, 4)
+    with count_queries() as statements:
+        response = client.put("/jobs/applications/status", json={"updates": [{"application_id": i, "status": "reviewed"} for i in ids]})
+    assert response.json()["updated"] == 4
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE applications")
+
+
+def test_single_update_is_one_round_trip(client):
+    """Test the single-item endpoint no longer loads the application first"""
+    job_id = employer_with_job(client)
+    app_id = application_ids(client, job_id, 1)[0]
+    with count_queries() as statements:
+        response = client.put(f"/jobs/applications/{app_id}/status", json={"status": "accepted"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "accepted"
+    assert len(statements) == 1
+
+
+def test_single_update_distinguishes_missing_from_foreign(client):
+    """Test 404 for unknown applications and 403 for another employer's"""
+    with TestClient(app) as other_employer:
+        foreign_job = employer_with_job(other_employer)
+        foreign_app = application_ids(other_employer, foreign_job, 1)[0]
+
+    employer_with_job(client)
+    assert client.put("/jobs/applications/987654321/status", json={"status": "accepted"}).status_code == 404
+    assert client.put(f"/jobs/applications/{foreign_app}/status", json={"status": "accepted"}).status_code == 403
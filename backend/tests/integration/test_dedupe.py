@@ -0,0 +1,164 @@
+"""Near-duplicate job postings"""
+import time
+from datetime import timedelta
+import pytest
+
+pytestmark = pytest.mark.integration
+
+import config
+from database import PrimarySessionLocal
+from dedupe import DuplicateDetector, dedupe_catalog, signature
+from job_expiry import expire_jobs
+from models import JobSignatures, Jobs
+from revocation import utcnow
+from tests.conftest import login
+
+
+def employer(client):
+    login(client, "employer", "dup")
+    client.post("/employers", json={"company_name": "Repost Co"})
+
+
+def posting(tag):
+    return {
+        "title": f"Warehouse associate {tag}",
+        "description": f"Load trucks, scan packages and keep aisles clear at our {tag} distribution centre. Overnight shifts.",
+        "job_type": "part-time",
+    }
+
+
+def test_repost_is_flagged_and_hidden_from_feed(client):
+    """Test a repost points at the original and is left out of /jobs"""
+    employer(client)
+    tag = f"d{time.time_ns()}"
+    original = client.post("/jobs/", json=posting(tag)).json()
+    assert original["duplicate_of"] is None
+    repost = client.post("/jobs/", json=posting(tag)).json()
+    assert repost["duplicate_of"] == original["job_id"]
+
+    ids = [job["job_id"] for job in client.get("/jobs/").json()]
+    assert original["job_id"] in ids
+    assert repost["job_id"] not in ids
+
+
+def duplicate_of(job_ids):
+    db = PrimarySessionLocal()
+    try:
+        return dict(db.query(Jobs.job_id, Jobs.duplicate_of).filter(Jobs.job_id.in_(job_ids)).all())
+    finally:
+        db.close()
+
+
+def test_closing_the_original_promotes_a_repost(client):
+    """Test the oldest repost of a closed original shows in /jobs and the others point at it"""
+    employer(client)
+    tag = f"d{time.time_ns()}"
+    original, first, second = [client.post("/jobs/", json=posting(tag)).json()["job_id"] for _ in range(3)]
+    assert client.put(f"/jobs/{original}/toggle-active").status_code == 200
+
+    assert duplicate_of([first, second]) == {first: None, second: first}
+    ids = [job["job_id"] for job in client.get("/jobs/").json()]
+    assert first in ids
+    assert original not in ids and second not in ids
+
+
+def test_expired_original_promotes_a_repost(client):
+    """Test a repost becomes visible once the sweep expires its original"""
+    employer(client)
+    tag = f"d{time.time_ns()}"
+    original, repost = [client.post("/jobs/", json=posting(tag)).json()["job_id"] for _ in range(2)]
+    db = PrimarySessionLocal()
+    try:
+        db.query(Jobs).filter(Jobs.job_id == original).update({"expires_at": utcnow() - timedelta(minutes=1)})
+        db.commit()
+    finally:
+        db.close()
+
+    assert expire_jobs() >= 1
+    assert duplicate_of([repost]) == {repost: None}
+    assert repost in [job["job_id"] for job in client.get("/jobs/").json()]
+
+
+def test_other_employers_and_closed_originals_are_not_duplicates(client):
+    """Test only the same employer's active postings count"""
+    tag = f"d{time.time_ns()}"
+    employer(client)
+    first = client.post("/jobs/", json=posting(tag)).json()["job_id"]
+    employer(client)
+    assert client.post("/jobs/", json=posting(tag)).json()["duplicate_of"] is None
+
+    employer(client)
+    closed = client.post("/jobs/", json=posting(tag)).json()["job_id"]
+    client.put(f"/jobs/{closed}/toggle-active")
+    assert client.post("/jobs/", json=posting(tag)).json()["duplicate_of"] is None
+    assert first != closed
+
+
+def test_reject_mode(client, monkeypatch):
+    """Test DEDUPE_MODE=reject refuses the repost"""
+    monkeypatch.setattr(config, "DEDUPE_MODE", "reject")
+    employer(client)
+    tag = f"d{time.time_ns()}"
+    original = client.post("/jobs/", json=posting(tag)).json()["job_id"]
+    response = client.post("/jobs/", json=posting(tag))
+    assert response.status_code == 409
+    assert str(original) in response.json()["detail"]
+
+
+def test_catalog_scan_flags_existing_duplicates(client, monkeypatch):
+    """Test the batch pass signs unsigned postings and flags reposts"""
+    monkeypatch.setattr(config, "DEDUPE_MODE", "off")
+    employer(client)
+    tag = f"d{time.time_ns()}"
+    ids = [client.post("/jobs/", json=posting(tag)).json()["job_id"] for _ in range(3)]
+    ids.append(client.post("/jobs/", json=posting(f"x{tag}") | {"title": "Barista", "description": "Espresso and pastries."}).json()["job_id"])
+
+    read_db, write_db = PrimarySessionLocal(), PrimarySessionLocal()
+    try:
+        assert dedupe_catalog(read_db, write_db, dry_run=True)["duplicates"] >= 2
+        counts = dedupe_catalog(read_db, write_db)
+        assert counts["signatures"] >= 4
+        flagged = dict(write_db.query(Jobs.job_id, Jobs.duplicate_of).filter(Jobs.job_id.in_(ids)).all())
+        assert write_db.query(JobSignatures).filter(JobSignatures.job_id.in_(ids)).count() == 4
+    finally:
+        read_db.close()
+        write_db.close()
+    assert flagged == {ids[0]: None, ids[1]: ids[0], ids[2]: ids[0], ids[3]: None}
+
+
+def test_refresh_finds_reposts_committed_out_of_id_order(client):
+    """Test a posting whose lower id commits after a higher one still reaches the index"""
+    employer(client)
+    tag = f"d{time.time_ns()}"
+    first = client.post("/jobs/", json=posting(tag)).json()["job_id"]
+    db = PrimarySessionLocal()
+    slow, fast = PrimarySessionLocal(), PrimarySessionLocal()
+    try:
+        employer_id = db.get(Jobs, first).employer_id
+        detector = DuplicateDetector()
+        detector.refresh(db, employer_id)
+
+        def insert(session, fields):
+            job = Jobs(employer_id=employer_id, **fields)
+            session.add(job)
+            session.flush()
+            session.add(JobSignatures(
+                job_id=job.job_id, employer_id=employer_id,
+                signature=signature(job.title, job.description).tobytes(),
+            ))
+            session.flush()
+            return job.job_id
+
+        # The slow transaction takes its id first but commits last
+        slow_id = insert(slow, posting(f"slow{tag}"))
+        fast_id = insert(fast, posting(f"fast{tag}"))
+        fast.commit()
+        detector.refresh(db, employer_id)
+        assert fast_id in detector.index.signatures
+        slow.commit()
+        detector.refresh(db, employer_id)
+        assert slow_id in detector.index.signatures
+    finally:
+        slow.close()
+        fast.close()
+        db.close()
@@ -259,6 +259,33 @@ def test_create_financial_resource_employer_forbidden(client):
     assert response.status_code == 403
 
 
+def test_resource_list_revalidates_after_like(client):
+    """Test the resource list is never served stale: a like changes its ETag"""
+    from database import PrimarySessionLocal
+    from models import FinancialResources
+
+    db = PrimarySessionLocal()
+    try:
+        resource = FinancialResources(name="Budget basics", website="https://example.com/budget", resource_type="budget", likes=0)
+        db.add(resource)
+        db.commit()
+        resource_id = resource.resource_id
+    finally:
+        db.close()
+
+    first = client.get("/financial-literacy/budget")
+    assert first.headers["cache-control"] == "private, no-cache"
+    etag = first.headers["etag"]
+    assert client.get("/financial-literacy/budget", headers={"If-None-Match": etag}).status_code == 304
+
+    setup_applicant(client)
+    assert client.post(f"/financial-literacy/{resource_id}/like").status_code == 200
+    after = client.get("/financial-literacy/budget", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["etag"] != etag
+    assert next(r for r in after.json() if r["resource_id"] == resource_id)["likes"] == 1
+
+
 # ============ ADMIN ROUTER TESTS ============
 
 def test_admin_endpoints_require_auth(client):
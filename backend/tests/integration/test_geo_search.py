@@ -0,0 +1,82 @@
+"""Radius search over geocoded job locations"""
+import time
+import pytest
+
+pytestmark = pytest.mark.integration
+
+import versions
+from database import PrimarySessionLocal
+from geo import backfill
+from models import Jobs
+
+
+def post_jobs(client, employer_location, locations):
+    """Log in as a new employer and post one job per location"""
+    ts = int(time.time() * 1000000)
+    user = {"username": f"geo{ts}", "email": f"geo{ts}@test.com", "password": "Pass123!", "role": "employer"}
+    client.post("/auth/register", json=user)
+    client.post("/auth/login", json={"email": user["email"], "password": user["password"]})
+    client.post("/employers", json={"company_name": f"Geo Co {ts}", "location": employer_location})
+    job_ids = {}
+    for location in locations:
+        payload = {"title": f"Job in {location}", "description": "Geo test", "job_type": "gig"}
+        if location is not None:
+            payload["location"] = location
+        job_ids[location] = client.post("/jobs/", json=payload).json()["job_id"]
+    return job_ids
+
+
+def test_near_filters_by_radius(client):
+    """Test only postings within the radius come back, with their distance"""
+    job_ids = post_jobs(client, "Boston, MA", ["Brooklyn, NY", "Queens, NY", "Philadelphia, PA", "Remote", None])
+
+    response = client.get("/jobs/?near=Manhattan, NY&radius=25")
+    assert response.status_code == 200
+    found = {job["job_id"]: job for job in response.json()}
+    assert job_ids["Brooklyn, NY"] in found
+    assert job_ids["Queens, NY"] in found
+    assert job_ids["Philadelphia, PA"] not in found
+    assert job_ids["Remote"] not in found
+    # The posting without a location sits at the employer's (Boston)
+    assert job_ids[None] not in found
+    assert found[job_ids["Brooklyn, NY"]]["distance_miles"] < 10
+
+    wider = {job["job_id"] for job in client.get("/jobs/?near=40.7831,-73.9712&radius=100").json()}
+    assert job_ids["Philadelphia, PA"] in wider
+    assert job_ids[None] not in wider
+    assert job_ids[None] in {job["job_id"] for job in client.get("/jobs/?near=Cambridge, MA&radius=10").json()}
+
+
+def test_unknown_place_and_bad_radius_are_rejected(client):
+    """Test an ungeocodable near= is a 400 and the radius is bounded"""
+    post_jobs(client, None, [])
+    assert client.get("/jobs/?near=Atlantis").status_code == 400
+    assert client.get("/jobs/?near=Boston&radius=0").status_code == 422
+    assert client.get("/jobs/?near=Boston&radius=5000").status_code == 422
+
+
+def test_feed_without_near_is_unchanged(client):
+    """Test the plain feed still lists postings that have no coordinates"""
+    job_ids = post_jobs(client, None, ["Remote"])
+    feed = client.get("/jobs/").json()
+    job = next(job for job in feed if job["job_id"] == job_ids["Remote"])
+    assert "distance_miles" not in job
+
+
+def test_backfill_geocodes_existing_rows(client):
+    """Test rows written before geocoding get coordinates from the backfill"""
+    job_ids = post_jobs(client, None, ["Austin, TX"])
+    db = PrimarySessionLocal()
+    try:
+        db.query(Jobs).filter(Jobs.job_id == job_ids["Austin, TX"]).update(
+            {"latitude": None, "longitude": None, "geohash": None}, synchronize_session=False
+        )
+        db.commit()
+        before = versions.get_versions(db, versions.JOBS_CATALOG)[versions.JOBS_CATALOG]
+        assert backfill(db) >= 1
+        # Feed ETags must change once the filtered columns do
+        assert versions.get_versions(db, versions.JOBS_CATALOG)[versions.JOBS_CATALOG] > before
+        job = db.query(Jobs).filter(Jobs.job_id == job_ids["Austin, TX"]).one()
+        assert round(job.latitude, 2) == 30.27 and job.geohash.startswith("9v6")
+    finally:
+        db.close()
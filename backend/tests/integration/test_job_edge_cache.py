@@ -0,0 +1,69 @@
+"""Edge caching headers and purge hooks for job detail"""
+import pytest
+import edge_cache
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def purger(monkeypatch):
+    """Swap in the local stand-in purger"""
+    local = edge_cache.LocalPurger()
+    monkeypatch.setattr(edge_cache, "get_purger", lambda: local)
+    return local
+
+
+def setup_employer_with_job(client):
+    """Create an employer with a profile and one job"""
+    import time
+    ts = int(time.time() * 1000000)
+
+    user_data = {
+        "username": f"edge{ts}",
+        "email": f"edge{ts}@test.com",
+        "password": "Pass123!",
+        "role": "employer"
+    }
+    client.post("/auth/register", json=user_data)
+    client.post("/auth/login", json={"email": user_data["email"], "password": user_data["password"]})
+    employer = client.post("/employers", json={"company_name": "Edge Co"}).json()
+    job = client.post("/jobs/", json={
+        "title": "Courier",
+        "description": "Deliver packages",
+        "job_type": "gig",
+        "location": "Remote"
+    }).json()
+    return employer["employer_id"], job["job_id"]
+
+
+def test_job_detail_has_surrogate_keys(client):
+    """Test job detail is publicly cacheable and tagged"""
+    employer_id, job_id = setup_employer_with_job(client)
+
+    response = client.get(f"/jobs/{job_id}")
+    assert response.status_code == 200
+    assert "public" in response.headers["cache-control"]
+    assert "s-maxage" in response.headers["cache-control"]
+    assert response.headers["surrogate-key"] == f"job-{job_id} employer-{employer_id}"
+
+
+def test_toggle_purges_job(client, purger):
+    """Test toggling a job purges its key"""
+    _, job_id = setup_employer_with_job(client)
+
+    client.put(f"/jobs/{job_id}/toggle-active")
+    assert f"job-{job_id}" in purger.purged
+
+
+def test_employer_update_purges_employer(client, purger):
+    """Test updating the company profile purges the employer key"""
+    employer_id, _ = setup_employer_with_job(client)
+
+    response = client.put("/employers/me", json={"company_name": "Edge Co 2"})
+    assert response.status_code == 200
+    assert f"employer-{employer_id}" in purger.purged
+
+
+def test_http_purger_tolerates_unreachable_cache():
+    """Test a failed HTTP purge does not raise"""
+    edge_cache.HttpPurger(["http://127.0.0.1:9/"], timeout=0.2).purge(["job-1"])
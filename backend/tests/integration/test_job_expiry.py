@@ -0,0 +1,136 @@
+"""Scheduled expiry of job postings in SKIP LOCKED batches"""
+import time
+from datetime import timedelta
+import pytest
+
+pytestmark = pytest.mark.integration
+
+import edge_cache
+import versions
+from sqlalchemy import inspect
+from database import PrimarySessionLocal, engine
+from job_expiry import expire_batch, expire_jobs
+from models import Jobs
+from revocation import utcnow
+
+
+@pytest.fixture
+def purger(monkeypatch):
+    """Swap in the local stand-in purger"""
+    local = edge_cache.LocalPurger()
+    monkeypatch.setattr(edge_cache, "get_purger", lambda: local)
+    return local
+
+
+def post_jobs(client, count):
+    """Log in as a new employer and post count jobs"""
+    ts = int(time.time() * 1000000)
+    user = {"username": f"expiry{ts}", "email": f"expiry{ts}@test.com", "password": "Pass123!", "role": "employer"}
+    client.post("/auth/register", json=user)
+    client.post("/auth/login", json={"email": user["email"], "password": user["password"]})
+    client.post("/employers", json={"company_name": "Expiry Co"})
+    return [
+        client.post("/jobs/", json={"title": f"Shift {i}", "description": "Short shift", "job_type": "gig"}).json()["job_id"]
+        for i in range(count)
+    ]
+
+
+def set_expiry(job_ids, expires_at):
+    db = PrimarySessionLocal()
+    try:
+        db.query(Jobs).filter(Jobs.job_id.in_(job_ids)).update({"expires_at": expires_at}, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def job_state(job_id):
+    db = PrimarySessionLocal()
+    try:
+        return db.query(Jobs.is_active, Jobs.expires_at).filter(Jobs.job_id == job_id).one()
+    finally:
+        db.close()
+
+
+def catalog_version():
+    db = PrimarySessionLocal()
+    try:
+        return versions.get_versions(db, versions.JOBS_CATALOG)[versions.JOBS_CATALOG]
+    finally:
+        db.close()
+
+
+def test_new_job_gets_default_expiry(client):
+    """Test a new posting expires JOB_TTL_DAYS after creation"""
+    [job_id] = post_jobs(client, 1)
+    is_active, expires_at = job_state(job_id)
+    assert is_active
+    assert timedelta(days=29) < expires_at - utcnow() <= timedelta(days=30)
+
+
+def test_sweep_deactivates_expired_jobs_in_batches(client, purger):
+    """Test expired postings are deactivated, the catalog bumped and edges purged"""
+    job_ids = post_jobs(client, 3)
+    set_expiry(job_ids, utcnow() - timedelta(minutes=1))
+    before = catalog_version()
+
+    assert expire_jobs(batch_size=2) >= 3
+    assert not any(job_state(job_id)[0] for job_id in job_ids)
+    assert catalog_version() > before
+    assert {f"job-{job_id}" for job_id in job_ids} <= set(purger.purged)
+    assert all(card["job_id"] not in job_ids for card in client.get("/jobs/").json())
+
+
+def test_sweep_leaves_unexpired_jobs(client, purger):
+    """Test postings not yet past expires_at stay active"""
+    [job_id] = post_jobs(client, 1)
+    expire_jobs()
+    assert job_state(job_id)[0]
+
+
+def test_sweep_skips_locked_rows(client, purger):
+    """Test a row locked by another transaction is left for the next sweep"""
+    if engine.dialect.name != "postgresql":
+        pytest.skip("SKIP LOCKED needs Postgres")
+    locked_id, free_id = post_jobs(client, 2)
+    set_expiry([locked_id, free_id], utcnow() - timedelta(minutes=1))
+
+    holder = PrimarySessionLocal()
+    try:
+        holder.query(Jobs).filter(Jobs.job_id == locked_id).with_for_update().one()
+        db = PrimarySessionLocal()
+        try:
+            expired = expire_batch(db, 100)
+            db.commit()
+        finally:
+            db.close()
+        assert free_id in expired
+        assert locked_id not in expired
+    finally:
+        holder.rollback()
+        holder.close()
+    assert expire_jobs() >= 1
+    assert not job_state(locked_id)[0]
+
+
+def test_reactivating_expired_job_extends_expiry(client, purger):
+    """Test toggling an expired posting back on gives it a fresh TTL"""
+    [job_id] = post_jobs(client, 1)
+    set_expiry([job_id], utcnow() - timedelta(minutes=1))
+    expire_jobs()
+
+    response = client.put(f"/jobs/{job_id}/toggle-active")
+    assert response.json()["is_active"] is True
+    is_active, expires_at = job_state(job_id)
+    assert is_active and expires_at > utcnow() + timedelta(days=29)
+    expire_jobs()
+    assert job_state(job_id)[0]
+
+
+def test_live_feed_indexes_are_partial():
+    """Test the date_posted and expires_at indexes cover active postings only"""
+    indexes = {index["name"]: index for index in inspect(engine).get_indexes("jobs")}
+    assert "idx_jobs_active_date_posted" in indexes
+    assert "idx_jobs_active_expires_at" in indexes
+    if engine.dialect.name == "postgresql":
+        assert "is_active" in str(indexes["idx_jobs_active_date_posted"]["dialect_options"]["postgresql_where"])
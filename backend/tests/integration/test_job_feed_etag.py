@@ -0,0 +1,80 @@
+"""Conditional GET tests for the job feed"""
+import pytest
+
+pytestmark = pytest.mark.integration
+
+
+def setup_user(client, role="applicant"):
+    """Register and login a user"""
+    import time
+    ts = int(time.time() * 1000000)
+
+    user_data = {
+        "username": f"{role}{ts}",
+        "email": f"{role}{ts}@test.com",
+        "password": "Pass123!",
+        "role": role
+    }
+    client.post("/auth/register", json=user_data)
+    login(client, user_data)
+    return user_data
+
+
+def login(client, user_data):
+    """Login an existing user"""
+    client.post("/auth/login", json={"email": user_data["email"], "password": user_data["password"]})
+
+
+def post_job(client):
+    """Create an employer with a job and return the job id"""
+    setup_user(client, "employer")
+    client.post("/employers", json={"company_name": "Etag Co"})
+    response = client.post("/jobs/", json={
+        "title": "Cashier",
+        "description": "Run the register",
+        "job_type": "part-time",
+        "location": "Remote"
+    })
+    return response.json()["job_id"]
+
+
+def test_feed_returns_etag_and_304(client):
+    """Test an unchanged feed answers 304"""
+    setup_user(client)
+
+    first = client.get("/jobs/")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    second = client.get("/jobs/", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+
+def test_new_job_changes_etag(client):
+    """Test creating a job invalidates the feed ETag"""
+    applicant = setup_user(client)
+    etag = client.get("/jobs/").headers["etag"]
+
+    job_id = post_job(client)
+
+    login(client, applicant)
+    response = client.get("/jobs/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert job_id in [job["job_id"] for job in response.json()]
+
+
+def test_applying_changes_etag(client):
+    """Test applying invalidates only the applicant's feed ETag"""
+    job_id = post_job(client)
+    setup_user(client)
+    etag = client.get("/jobs/").headers["etag"]
+
+    client.post(f"/jobs/{job_id}/apply", json={"cover_letter": "Hello"})
+
+    response = client.get("/jobs/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    applied = [job for job in response.json() if job["job_id"] == job_id]
+    assert applied[0]["has_applied"] is True
@@ -0,0 +1,204 @@
+"""Bulk job import from CSV and NDJSON"""
+import json
+import time
+import pytest
+
+pytestmark = pytest.mark.integration
+
+import config
+import edge_cache
+import geo
+from database import PrimarySessionLocal
+from models import JobImports, JobSignatures, Jobs
+from tests.conftest import login
+
+
+def employer(client):
+    login(client, "employer", "imp")
+    client.post("/employers", json={"company_name": "Bulk Hiring Co", "location": "Austin, TX"})
+
+
+def upload(client, name, content, **params):
+    return client.post("/jobs/import", files={"file": (name, content.encode())}, params=params)
+
+
+def posting(tag, number):
+    return {
+        "title": f"Courier {tag} route {number}",
+        "description": f"Deliver parcels on route {number} for {tag}. Van provided, clean licence required.",
+        "job_type": "full-time",
+        "pay_range": "$18-22/hr",
+    }
+
+
+def test_csv_import_reports_bad_rows_and_loads_the_rest(client):
+    """Test valid CSV rows are posted and invalid ones are reported by number"""
+    employer(client)
+    tag = f"i{time.time_ns()}"
+    content = (
+        "title,description,job_type,location,pay_range\n"
+        f"Line cook {tag},Prep and grill on the evening shift.,part-time,,$15/hr\n"
+        f",Missing a title.,part-time,,\n"
+        f"Dishwasher {tag},Keep the kitchen running.,seasonal,,\n"
+        f"Host {tag},Greet and seat guests at the door.,internship,\"Denver, CO\",\n"
+    )
+    response = upload(client, "jobs.csv", content)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["status"] == "completed"
+    assert (result["total_rows"], result["imported_rows"], result["failed_rows"]) == (4, 2, 2)
+    assert [error["row"] for error in result["errors"]] == [2, 3]
+    assert any("title" in message for message in result["errors"][0]["errors"])
+    assert any("job_type" in message for message in result["errors"][1]["errors"])
+
+    db = PrimarySessionLocal()
+    try:
+        jobs = {job.title: job for job in db.query(Jobs).filter(Jobs.title.like(f"% {tag}")).all()}
+    finally:
+        db.close()
+    assert set(jobs) == {f"Line cook {tag}", f"Host {tag}"}
+    # Prepared the same way as a single posting
+    assert jobs[f"Line cook {tag}"].pay_min == 15
+    assert jobs[f"Line cook {tag}"].expires_at is not None
+    assert jobs[f"Host {tag}"].is_active
+
+
+def test_ndjson_import_with_small_batches(client, monkeypatch):
+    """Test NDJSON lines are imported across several batches, with bad lines reported"""
+    monkeypatch.setattr(config, "JOB_IMPORT_BATCH_SIZE", 3)
+    employer(client)
+    tag = f"n{time.time_ns()}"
+    lines = [json.dumps(posting(tag, number)) for number in range(7)]
+    lines.insert(2, "{not json")
+    lines.insert(5, "[1, 2]")
+    response = upload(client, "jobs.ndjson", "\n".join(lines) + "\n")
+    result = response.json()
+    assert (result["total_rows"], result["imported_rows"], result["failed_rows"]) == (9, 7, 2)
+    assert [error["row"] for error in result["errors"]] == [3, 6]
+
+    db = PrimarySessionLocal()
+    try:
+        ids = [job_id for (job_id,) in db.query(Jobs.job_id).filter(Jobs.title.like(f"Courier {tag} %"))]
+        signed = db.query(JobSignatures).filter(JobSignatures.job_id.in_(ids)).count()
+    finally:
+        db.close()
+    assert len(ids) == 7
+    assert signed == 7
+
+
+def test_repeated_rows_are_flagged_as_duplicates(client):
+    """Test a row repeating an earlier row, or an existing posting, gets duplicate_of"""
+    employer(client)
+    tag = f"r{time.time_ns()}"
+    existing = client.post("/jobs/", json=posting(tag, 1)).json()["job_id"]
+    lines = [json.dumps(posting(tag, 1)), json.dumps(posting(tag, 2)), json.dumps(posting(tag, 2))]
+    assert upload(client, "jobs.ndjson", "\n".join(lines)).json()["imported_rows"] == 3
+
+    db = PrimarySessionLocal()
+    try:
+        rows = db.query(Jobs.job_id, Jobs.duplicate_of).filter(Jobs.title.like(f"Courier {tag} %")).order_by(Jobs.job_id).all()
+    finally:
+        db.close()
+    (_, none), (_, of_existing), (first_new, none_again), (_, of_first_new) = rows
+    assert none is None and none_again is None
+    assert of_existing == existing
+    assert of_first_new == first_new
+
+
+def test_reject_mode_reports_repeated_rows(client, monkeypatch):
+    """Test DEDUPE_MODE=reject turns repeated rows into row errors"""
+    monkeypatch.setattr(config, "DEDUPE_MODE", "reject")
+    employer(client)
+    tag = f"x{time.time_ns()}"
+    lines = [json.dumps(posting(tag, 1)), json.dumps(posting(tag, 1))]
+    result = upload(client, "jobs.ndjson", "\n".join(lines)).json()
+    assert result["imported_rows"] == 1
+    assert result["errors"] == [{"row": 2, "errors": ["Duplicates row 1"]}]
+
+
+def test_failing_batch_preparation_skips_only_that_batch(client, monkeypatch):
+    """Test a geocoding error fails its batch's rows and the other batches still load"""
+    monkeypatch.setattr(config, "JOB_IMPORT_BATCH_SIZE", 2)
+    real = geo.coordinates_for
+
+    def coordinates_for(value):
+        if value == "Nowhere":
+            raise RuntimeError("geocoder down")
+        return real(value)
+
+    monkeypatch.setattr(geo, "coordinates_for", coordinates_for)
+    employer(client)
+    tag = f"g{time.time_ns()}"
+    lines = [json.dumps(posting(tag, number)) for number in range(6)]
+    lines[3] = json.dumps(posting(tag, 3) | {"location": "Nowhere"})
+    result = upload(client, "jobs.ndjson", "\n".join(lines)).json()
+    assert result["status"] == "completed"
+    assert (result["imported_rows"], result["failed_rows"]) == (4, 2)
+    assert [error["row"] for error in result["errors"]] == [3, 4]
+
+
+def test_import_purges_the_employer_from_the_edge_cache(client, monkeypatch):
+    """Test a finished import purges the employer's Surrogate-Key"""
+    purger = edge_cache.LocalPurger()
+    monkeypatch.setattr(edge_cache, "get_purger", lambda: purger)
+    employer(client)
+    tag = f"e{time.time_ns()}"
+    result = upload(client, "jobs.ndjson", json.dumps(posting(tag, 1))).json()
+    assert result["imported_rows"] == 1
+    db = PrimarySessionLocal()
+    try:
+        employer_id = db.get(JobImports, result["import_id"]).employer_id
+    finally:
+        db.close()
+    assert purger.purged == [edge_cache.employer_key(employer_id)]
+
+def test_large_upload_is_imported_in_the_background(client, monkeypatch):
+    """Test files over JOB_IMPORT_SYNC_BYTES return 202 and report progress by id"""
+    monkeypatch.setattr(config, "JOB_IMPORT_SYNC_BYTES", 0)
+    employer(client)
+    tag = f"a{time.time_ns()}"
+    lines = [json.dumps(posting(tag, number)) for number in range(5)] + ['{"title": "No description"}']
+    response = upload(client, "big.jsonl", "\n".join(lines))
+    assert response.status_code == 202
+    assert response.json()["status"] in ("pending", "running", "completed")
+
+    # The test client runs background tasks before returning
+    status = client.get(f"/jobs/import/{response.json()['import_id']}").json()
+    assert status["status"] == "completed"
+    assert (status["imported_rows"], status["failed_rows"]) == (5, 1)
+    assert status["finished_at"] is not None
+    assert list(config.JOB_IMPORT_DIR.glob(f"import-{status['import_id']}.*")) == []
+
+
+def test_import_permissions_and_format(client):
+    """Test applicants cannot import, unknown formats are refused and imports are private"""
+    login(client, "applicant", "imp")
+    assert upload(client, "jobs.csv", "title\n").status_code == 403
+
+    employer(client)
+    assert upload(client, "jobs.xlsx", "title\n").status_code == 400
+    assert upload(client, "jobs.txt", '{"title": "x"}', format="ndjson").status_code == 200
+    import_id = upload(client, "jobs.csv", "title,description,job_type\n").json()["import_id"]
+    assert client.get(f"/jobs/import/{import_id}").status_code == 200
+
+    employer(client)
+    assert client.get(f"/jobs/import/{import_id}").status_code == 404
+
+
+def test_import_of_10k_rows(client, monkeypatch):
+    """Test a 10,000-row CSV imports within the request in reasonable time"""
+    monkeypatch.setattr(config, "JOB_IMPORT_SYNC_BYTES", 10 * 1024 * 1024)
+    employer(client)
+    tag = f"k{time.time_ns()}"
+    rows = "".join(
+        f"Picker {tag} {number},Order picking shift {number},part-time,,$16/hr\n"
+        for number in range(10_000)
+    )
+    content = "title,description,job_type,location,pay_range\n" + rows
+    started = time.perf_counter()
+    response = client.post("/jobs/import", files={"file": ("jobs.csv", content.encode())})
+    elapsed = time.perf_counter() - started
+    result = response.json()
+    assert result["status"] == "completed"
+    assert (result["total_rows"], result["imported_rows"], result["failed_rows"]) == (10_000, 10_000, 0)
+    assert elapsed < 60
@@ -0,0 +1,37 @@
+"""Prometheus metrics endpoint tests"""
+import pytest
+
+pytestmark = pytest.mark.integration
+
+pytest.importorskip("prometheus_client")
+
+
+def test_metrics_endpoint_exposes_route_templates(client):
+    """Test latency and DB metrics are labelled by route template"""
+    client.get("/jobs/999999")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    body = response.text
+
+    assert 'hustlehub_http_request_duration_seconds_count{method="GET",route="/jobs/{job_id}"}' in body
+    assert 'hustlehub_http_requests_total{method="GET",route="/jobs/{job_id}",status="404"}' in body
+    assert 'hustlehub_db_request_queries_count{route="/jobs/{job_id}"}' in body
+    assert "hustlehub_http_requests_in_progress" in body
+    assert "hustlehub_db_pool_connections_in_use" in body
+
+
+def test_unknown_paths_share_one_label(client):
+    """Test unmatched paths do not create unbounded label values"""
+    client.get("/definitely/not/a/route/12345")
+    body = client.get("/metrics").text
+    assert 'route="<unmatched>"' in body
+    assert "12345" not in body
+
+
+def test_db_queries_are_counted(client):
+    """Test per-request statement counts reach the histogram"""
+    client.get("/financial-literacy/credit")
+    body = client.get("/metrics").text
+    line = [l for l in body.splitlines()
+            if l.startswith('hustlehub_db_request_queries_sum{route="/financial-literacy/{resource_type}"}')]
+    assert line and float(line[0].split()[-1]) >= 1
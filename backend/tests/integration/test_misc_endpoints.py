@@ -179,6 +179,38 @@ def test_admin_get_jobs(client):
     assert response.status_code in [200, 403, 404]
 
 
+
+def test_admin_job_listing_fields(client):
+    """Test each admin job listing value lands under its own key"""
+    import time
+    from tests.conftest import login
+    tag = f"adm{time.time_ns()}"
+    
+    login(client, "employer", "adm")
+    client.post("/employers", json={"company_name": f"Admin List Co {tag}"})
+    job = {"title": f"Listing {tag}", "description": "Check the keys", "job_type": "gig", "location": "Austin, TX", "pay_range": "$20/hr"}
+    job_id = client.post("/jobs/", json=job).json()["job_id"]
+    
+    # Admins cannot register themselves; create one directly
+    from database import SessionLocal
+    from models import Users
+    from security import hash_password
+    db = SessionLocal()
+    try:
+        db.add(Users(username=tag, email=f"{tag}@test.com", password_hash=hash_password("Pass123!"), role="admin"))
+        db.commit()
+    finally:
+        db.close()
+    client.cookies.clear()
+    client.post("/auth/login", json={"email": f"{tag}@test.com", "password": "Pass123!"})
+    response = client.get("/admin/jobs")
+    assert response.status_code == 200
+    listed = next(row for row in response.json() if row["job_id"] == job_id)
+    assert {key: listed[key] for key in job} == job
+    assert listed["company_name"] == f"Admin List Co {tag}"
+    assert listed["is_active"] is True
+    assert listed["date_posted"] is not None
+
 def test_admin_get_dashboard(client):
     """Test admin dashboard"""
     setup_user(client, role="applicant")
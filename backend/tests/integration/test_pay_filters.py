@@ -0,0 +1,74 @@
+"""Pay filters and sort=pay on the job feed"""
+import time
+import pytest
+
+pytestmark = pytest.mark.integration
+
+import versions
+from database import PrimarySessionLocal
+from models import Jobs
+from pay import backfill
+
+
+def post_jobs(client, pay_ranges):
+    """Log in as a new employer and post one job per pay range"""
+    ts = int(time.time() * 1000000)
+    user = {"username": f"pay{ts}", "email": f"pay{ts}@test.com", "password": "Pass123!", "role": "employer"}
+    client.post("/auth/register", json=user)
+    client.post("/auth/login", json={"email": user["email"], "password": user["password"]})
+    client.post("/employers", json={"company_name": f"Pay Co {ts}"})
+    return {
+        pay_range: client.post("/jobs/", json={"title": f"Paid {pay_range}", "description": "Pay test", "job_type": "gig", "pay_range": pay_range}).json()["job_id"]
+        for pay_range in pay_ranges
+    }
+
+
+def feed_ids(client, query, job_ids):
+    """Ids from our own postings, in feed order"""
+    ours = set(job_ids.values())
+    return [job["job_id"] for job in client.get(f"/jobs/?{query}").json() if job["job_id"] in ours]
+
+
+def test_min_and_max_pay_filter_in_hourly_and_annual_units(client):
+    """Test ranges are matched on overlap, in either unit"""
+    job_ids = post_jobs(client, ["$15/hr", "$18-$22/hr", "$62,400/year", "Competitive"])
+
+    assert set(feed_ids(client, "min_pay=20", job_ids)) == {job_ids["$18-$22/hr"], job_ids["$62,400/year"]}
+    assert set(feed_ids(client, "max_pay=16", job_ids)) == {job_ids["$15/hr"]}
+    assert set(feed_ids(client, "min_pay=62400&pay_period=annual", job_ids)) == {job_ids["$62,400/year"]}
+    assert set(feed_ids(client, "min_pay=16&max_pay=25", job_ids)) == {job_ids["$18-$22/hr"]}
+
+
+def test_sort_by_pay_puts_unparsed_last(client):
+    """Test sort=pay orders by the top of the range, highest first"""
+    job_ids = post_jobs(client, ["Competitive", "$15/hr", "$62,400/year", "$18-$22/hr"])
+    assert feed_ids(client, "sort=pay", job_ids) == [
+        job_ids["$62,400/year"], job_ids["$18-$22/hr"], job_ids["$15/hr"], job_ids["Competitive"]
+    ]
+
+
+def test_invalid_pay_parameters_are_rejected(client):
+    """Test unknown sort keys and periods are 422s"""
+    post_jobs(client, [])
+    assert client.get("/jobs/?sort=salary").status_code == 422
+    assert client.get("/jobs/?min_pay=10&pay_period=weekly").status_code == 422
+    assert client.get("/jobs/?min_pay=-1").status_code == 422
+
+
+def test_backfill_parses_existing_rows(client):
+    """Test rows from before the pay columns get them from the backfill"""
+    job_ids = post_jobs(client, ["$17/hr"])
+    db = PrimarySessionLocal()
+    try:
+        db.query(Jobs).filter(Jobs.job_id == job_ids["$17/hr"]).update(
+            {"pay_min": None, "pay_max": None, "pay_period": None}, synchronize_session=False
+        )
+        db.commit()
+        before = versions.get_versions(db, versions.JOBS_CATALOG)[versions.JOBS_CATALOG]
+        assert backfill(db) >= 1
+        # Feed ETags must change once the filtered columns do
+        assert versions.get_versions(db, versions.JOBS_CATALOG)[versions.JOBS_CATALOG] > before
+        job = db.query(Jobs).filter(Jobs.job_id == job_ids["$17/hr"]).one()
+        assert (job.pay_min, job.pay_max, job.pay_period) == (17, 17, "hourly")
+    finally:
+        db.close()
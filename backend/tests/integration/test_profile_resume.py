@@ -117,6 +117,23 @@ def test_upload_resume_replaces_old(client):
         assert response2.status_code in [200, 201]
 
 
+
+def test_upload_resume_too_large(client, monkeypatch):
+    """Test an upload over MAX_RESUME_BYTES is refused and keeps the old resume"""
+    import config
+    monkeypatch.setattr(config, "MAX_RESUME_BYTES", 1024)
+    setup_applicant(client)
+    
+    first = client.post("/profile/resume", files={"file": ("resume.pdf", BytesIO(b"first"), "application/pdf")})
+    assert first.status_code == 200
+    
+    files = {"file": ("resume.pdf", BytesIO(b"x" * 2048), "application/pdf")}
+    response = client.post("/profile/resume", files=files)
+    assert response.status_code == 413
+    
+    with open(first.json()["resume_file"], "rb") as handle:
+        assert handle.read() == b"first"
+
 # Resume delete tests
 def test_delete_resume_requires_auth(client):
     """Test deleting resume requires authentication"""
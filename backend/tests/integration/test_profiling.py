@@ -0,0 +1,138 @@
+"""On-demand admin request profiling"""
+import pytest
+import profiling
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Point profile storage at a temporary directory"""
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path)
+    return profiling.ProfileStore(tmp_path)
+
+
+def login_admin(client):
+    """Create an admin directly in the database and log in"""
+    import time
+    from database import SessionLocal
+    from models import Users
+    from security import hash_password
+
+    ts = int(time.time() * 1000000)
+    email = f"profadmin{ts}@test.com"
+    db = SessionLocal()
+    try:
+        db.add(Users(username=f"profadmin{ts}", email=email, password_hash=hash_password("Pass123!"), role="admin"))
+        db.commit()
+    finally:
+        db.close()
+    client.post("/auth/login", json={"email": email, "password": "Pass123!"})
+
+
+def login_applicant(client):
+    """Register and log in an applicant"""
+    import time
+    ts = int(time.time() * 1000000)
+    user_data = {"username": f"prof{ts}", "email": f"prof{ts}@test.com", "password": "Pass123!", "role": "applicant"}
+    client.post("/auth/register", json=user_data)
+    client.post("/auth/login", json={"email": user_data["email"], "password": user_data["password"]})
+
+
+def test_admin_can_profile_a_request(client, store):
+    """Test ?profile=1 stores a report and names it in a header"""
+    login_admin(client)
+
+    response = client.get("/admin/users?profile=1")
+    assert response.status_code == 200
+    name = response.headers["x-profile-report"]
+    assert name in store.list()
+
+    report = client.get(f"/admin/profiles/{name}")
+    assert report.status_code == 200
+    html_report = client.get(f"/admin/profiles/{name}?format=html")
+    assert "samples" in html_report.text
+
+
+def test_html_mode_returns_report(client, store):
+    """Test ?profile=html replaces the response with the report"""
+    login_admin(client)
+
+    response = client.get("/jobs/employer/jobs", headers={"X-Profile": "html"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+
+
+def test_non_admin_flag_is_ignored(client, store):
+    """Test profiling requires the admin guard"""
+    login_applicant(client)
+
+    response = client.get("/profile/me?profile=1")
+    assert response.status_code == 200
+    assert "x-profile-report" not in response.headers
+    assert store.list() == []
+
+
+def test_ring_buffer_is_bounded(tmp_path):
+    """Test the store keeps only the newest reports"""
+    import os
+    store = profiling.ProfileStore(tmp_path, 2)
+    for i in range(4):
+        path = store.save(f"r{i}.folded", "a;b 1\n")
+        os.utime(path, (i, i))
+    assert store.list() == ["r3.folded", "r2.folded"]
+    assert store.read("../etc/passwd") is None
+
+
+def test_sampler_records_app_frames():
+    """Test the stack sampler captures frames from application code"""
+    import threading
+    import time
+
+    def busy():
+        end = time.perf_counter() + 0.05
+        while time.perf_counter() < end:
+            pass
+
+    sampler = profiling.StackSampler(interval=0.001).start()
+    worker = threading.Thread(target=busy)
+    worker.start()
+    worker.join()
+    sampler.stop()
+    assert "test_profiling.py:busy" in sampler.folded()
+
+
+def test_request_sampler_skips_other_threads():
+    """Test a request's sampler keeps its threadpool work and drops unrelated threads"""
+    import threading
+    import time
+    import anyio
+
+    def spin(seconds):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pass
+
+    def request_work():
+        spin(0.05)
+
+    def unrelated_work():
+        spin(0.1)
+
+    async def handle():
+        sampler = profiling.StackSampler(interval=0.001)
+        token = sampler.for_current_request()
+        sampler.start()
+        try:
+            await anyio.to_thread.run_sync(request_work)
+        finally:
+            sampler.stop()
+            profiling._profiled_request.reset(token)
+        return sampler.folded()
+
+    other = threading.Thread(target=unrelated_work)
+    other.start()
+    folded = anyio.run(handle)
+    other.join()
+    assert "test_profiling.py:request_work" in folded
+    assert "unrelated_work" not in folded
@@ -0,0 +1,79 @@
+"""Per-request SQL statement counting and query budgets"""
+import logging
+import pytest
+import query_debug
+
+pytestmark = pytest.mark.integration
+
+
+def setup_employer_with_jobs(client, job_count):
+    """Create an employer with a profile and several jobs"""
+    import time
+    ts = int(time.time() * 1000000)
+
+    user_data = {
+        "username": f"budget{ts}",
+        "email": f"budget{ts}@test.com",
+        "password": "Pass123!",
+        "role": "employer"
+    }
+    client.post("/auth/register", json=user_data)
+    client.post("/auth/login", json={"email": user_data["email"], "password": user_data["password"]})
+    client.post("/employers", json={"company_name": "Budget Co"})
+    for i in range(job_count):
+        client.post("/jobs/", json={
+            "title": f"Job {i}",
+            "description": "Work",
+            "job_type": "gig",
+            "location": "Remote"
+        })
+
+
+def test_debug_headers(client, monkeypatch):
+    """Test X-DB-Queries and X-DB-Time are returned when enabled"""
+    monkeypatch.setattr(query_debug, "DB_DEBUG_HEADERS", True)
+    response = client.get("/financial-literacy/credit")
+    assert int(response.headers["x-db-queries"]) >= 1
+    assert float(response.headers["x-db-time"]) >= 0
+
+
+def test_debug_headers_off_by_default(client, monkeypatch):
+    """Test debug headers are not sent unless enabled"""
+    monkeypatch.setattr(query_debug, "DB_DEBUG_HEADERS", False)
+    response = client.get("/financial-literacy/credit")
+    assert "x-db-queries" not in response.headers
+
+
+def test_employer_jobs_query_count_is_constant(client, query_budget):
+    """Test employer job listing does not run one query per job"""
+    setup_employer_with_jobs(client, 5)
+    # role and employer_id come from the token: only the jobs-with-counts query
+    with query_budget(1):
+        response = client.get("/jobs/employer/jobs")
+    assert len(response.json()) == 5
+
+
+def test_job_feed_query_budget(client, query_budget):
+    """Test the job feed stays within its query budget"""
+    setup_employer_with_jobs(client, 3)
+    # versions, jobs, applied ids (no user lookup)
+    with query_budget(3):
+        client.get("/jobs/")
+
+
+def test_query_budget_fails_when_exceeded(client, query_budget):
+    """Test the fixture fails a test that goes over budget"""
+    with pytest.raises(pytest.fail.Exception):
+        with query_budget(0):
+            client.get("/financial-literacy/credit")
+
+
+def test_slow_query_is_logged_with_redacted_params(client, monkeypatch, caplog):
+    """Test slow statements are logged without parameter values"""
+    monkeypatch.setattr(query_debug, "SLOW_QUERY_MS", 0.0)
+    with caplog.at_level(logging.WARNING, logger="hustlehub.slow_query"):
+        client.get("/financial-literacy/credit")
+    messages = [r.getMessage() for r in caplog.records if r.name == "hustlehub.slow_query"]
+    assert any("/financial-literacy/{resource_type}" in m for m in messages)
+    assert not any("'credit'" in m or " credit" in m for m in messages)
+    assert any("<str>" in m for m in messages)
@@ -0,0 +1,89 @@
+"""Token-bucket rate limiting and login throttling"""
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+
+pytestmark = pytest.mark.integration
+
+import rate_limit
+from main import app
+from rate_limit import InMemoryBackend, RateLimitMiddleware, Rule, take_token
+
+
+def test_bucket_refills_over_time():
+    """Test a drained bucket regains tokens at capacity/period per second"""
+    allowed, tokens, _ = take_token(None, None, 0.0, capacity=2, rate=1.0)
+    assert allowed and tokens == 1
+    allowed, tokens, _ = take_token(tokens, 0.0, 0.0, capacity=2, rate=1.0)
+    assert allowed and tokens == 0
+    allowed, tokens, retry_after = take_token(tokens, 0.0, 0.25, capacity=2, rate=1.0)
+    assert not allowed and retry_after == pytest.approx(0.75)
+    allowed, _, _ = take_token(tokens, 0.25, 1.0, capacity=2, rate=1.0)
+    assert allowed
+
+
+def test_redis_backend_shares_buckets():
+    """Test two backends on the same Redis see the same bucket"""
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    first = rate_limit.RedisBackend(client=fakeredis.FakeAsyncRedis(server=server))
+    second = rate_limit.RedisBackend(client=fakeredis.FakeAsyncRedis(server=server))
+
+    async def run():
+        results = [await first.take("k", 3, 0.001), await second.take("k", 3, 0.001)]
+        results += [await first.take("k", 3, 0.001), await second.take("k", 3, 0.001)]
+        return results
+
+    results = asyncio.run(run())
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[-1][1] > 0
+
+
+@pytest.fixture
+def limited_client(monkeypatch):
+    """App wrapped with a tight login rule and a counter on password checks"""
+    import routers.auth
+    calls = []
+    real_verify = routers.auth.verify_password
+
+    def counting_verify(plain, hashed):
+        calls.append(plain)
+        return real_verify(plain, hashed)
+
+    monkeypatch.setattr(routers.auth, "verify_password", counting_verify)
+    rules = [Rule("POST", "/auth/login", "email", capacity=2, period=60)]
+    with TestClient(RateLimitMiddleware(app, rules=rules, backend=InMemoryBackend())) as client:
+        yield client, calls
+
+
+def register(client):
+    ts = int(time.time() * 1000000)
+    user = {"username": f"rl{ts}", "email": f"rl{ts}@test.com", "password": "Pass123!", "role": "applicant"}
+    assert client.post("/auth/register", json=user).status_code == 200
+    return user
+
+
+def test_login_throttled_before_password_hashing(limited_client):
+    """Test the third attempt on one email is rejected without verifying the password"""
+    client, calls = limited_client
+    user = register(client)
+
+    assert client.post("/auth/login", json={"email": user["email"], "password": "wrong"}).status_code == 400
+    # The body was consumed by the limiter and replayed to the endpoint
+    assert client.post("/auth/login", json={"email": user["email"], "password": user["password"]}).status_code == 200
+    assert len(calls) == 2
+
+    response = client.post("/auth/login", json={"email": user["email"], "password": user["password"]})
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    assert len(calls) == 2
+
+
+def test_throttle_is_per_email(limited_client):
+    """Test another account is unaffected by a throttled one"""
+    client, _ = limited_client
+    first, second = register(client), register(client)
+    for _ in range(3):
+        client.post("/auth/login", json={"email": first["email"], "password": "wrong"})
+    assert client.post("/auth/login", json={"email": second["email"], "password": second["password"]}).status_code == 200
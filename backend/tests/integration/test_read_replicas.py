@@ -0,0 +1,96 @@
+"""Read-replica routing with two local SQLite databases"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+pytestmark = pytest.mark.integration
+
+from database import Base, ReplicaSet, RoutingSession, read_from_replica
+from models import FinancialResources
+from replica_routing import STICKY_COOKIE, ReplicaRoutingMiddleware
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """Primary and replica files; the replica is missing the primary's latest row"""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        Base.metadata.create_all(engine)
+    with primary.begin() as conn:
+        conn.execute(FinancialResources.__table__.insert().values(name="New", website="https://x", resource_type="credit", likes=0))
+
+    replica_set = ReplicaSet([replica], max_lag=5, check_interval=0)
+    session_class = type("TestRoutingSession", (RoutingSession,), {"primary": primary, "replica_set": replica_set})
+    yield sessionmaker(class_=session_class), replica_set
+    primary.dispose()
+    replica.dispose()
+
+
+def count_resources(make_session, replica_eligible):
+    token = read_from_replica.set(replica_eligible)
+    try:
+        with make_session() as db:
+            return db.query(FinancialResources).count()
+    finally:
+        read_from_replica.reset(token)
+
+
+def test_reads_go_to_replica_only_when_eligible(databases):
+    """Test replica-eligible reads hit the replica and others the primary"""
+    make_session, _ = databases
+    assert count_resources(make_session, True) == 0
+    assert count_resources(make_session, False) == 1
+
+
+def test_session_reads_its_own_writes(databases):
+    """Test a session that wrote keeps reading from the primary"""
+    make_session, _ = databases
+    token = read_from_replica.set(True)
+    try:
+        with make_session() as db:
+            db.add(FinancialResources(name="Mine", website="https://y", resource_type="budget", likes=0))
+            db.flush()
+            assert db.query(FinancialResources).count() == 2
+    finally:
+        read_from_replica.reset(token)
+
+
+def test_lagging_or_unreachable_replica_falls_back_to_primary(databases):
+    """Test reads move to the primary when the replica is too far behind or down"""
+    make_session, replica_set = databases
+    replica_set.lag_probe = lambda engine: 30.0
+    assert count_resources(make_session, True) == 1
+
+    def unreachable(engine):
+        raise ConnectionError("replica down")
+
+    replica_set.lag_probe = unreachable
+    assert count_resources(make_session, True) == 1
+
+    replica_set.lag_probe = lambda engine: 0.5
+    assert count_resources(make_session, True) == 0
+
+
+def test_writes_pin_client_to_primary():
+    """Test a mutation sets the sticky cookie and later reads skip the replica"""
+    app = FastAPI()
+
+    @app.get("/read")
+    def read():
+        return {"replica": read_from_replica.get()}
+
+    @app.post("/write")
+    def write():
+        return {}
+
+    client = TestClient(ReplicaRoutingMiddleware(app, sticky_seconds=30))
+    assert client.get("/read").json() == {"replica": True}
+    response = client.post("/write")
+    assert STICKY_COOKIE in response.cookies
+    assert client.get("/read").json() == {"replica": False}
+
+    client.cookies.clear()
+    assert client.get("/read").json() == {"replica": True}
@@ -0,0 +1,146 @@
+"""Personalized job recommendations"""
+import time
+import numpy as np
+import pytest
+
+pytestmark = pytest.mark.integration
+
+import recommender
+from database import PrimarySessionLocal
+from models import Jobs
+from recommender import RecommenderIndex
+from tests.conftest import login
+
+
+def post_jobs(client, jobs):
+    login(client, "employer", "rec")
+    client.post("/employers", json={"company_name": "Recommend Co"})
+    return [client.post("/jobs/", json=job).json()["job_id"] for job in jobs]
+
+
+def test_recommends_jobs_like_the_ones_applied_to(client):
+    """Test similar postings rank first and applied postings are left out"""
+    ts = int(time.time() * 1000000)
+    barista, espresso, courier = post_jobs(client, [
+        {"title": f"Barista q{ts}", "description": f"Pull espresso shots q{ts}", "job_type": "part-time"},
+        {"title": f"Espresso bar barista q{ts}", "description": f"Latte art and espresso q{ts}", "job_type": "part-time"},
+        {"title": f"Bike courier z{ts}", "description": f"Deliver parcels downtown z{ts}", "job_type": "gig"},
+    ])
+    login(client, "applicant", "rec")
+    client.post(f"/jobs/{barista}/apply", json={"cover_letter": "Coffee lover"})
+
+    response = client.get("/jobs/recommended?limit=50")
+    assert response.status_code == 200
+    ids = [job["job_id"] for job in response.json()]
+    assert barista not in ids
+    assert espresso in ids
+    assert courier not in ids or ids.index(espresso) < ids.index(courier)
+
+
+def test_closed_jobs_are_not_recommended(client):
+    """Test postings closed after indexing are filtered out by the database"""
+    ts = int(time.time() * 1000000)
+    first, second = post_jobs(client, [
+        {"title": f"Dog walker w{ts}", "description": f"Walk dogs w{ts}", "job_type": "gig"},
+        {"title": f"Dog sitter w{ts}", "description": f"Sit dogs w{ts}", "job_type": "gig"},
+    ])
+    client.put(f"/jobs/{second}/toggle-active")
+    login(client, "applicant", "rec")
+    client.post(f"/jobs/{first}/apply", json={"cover_letter": "Dogs!"})
+    assert second not in [job["job_id"] for job in client.get("/jobs/recommended").json()]
+
+
+def test_new_applicant_gets_recent_jobs(client):
+    """Test an applicant with no applications falls back to the newest postings"""
+    (job_id,) = post_jobs(client, [{"title": "Fresh posting", "description": "Just posted", "job_type": "gig"}])
+    login(client, "applicant", "rec")
+    response = client.get("/jobs/recommended")
+    assert response.status_code == 200
+    assert response.json()[0]["job_id"] == job_id
+
+
+def test_employers_cannot_get_recommendations(client):
+    """Test employers are refused"""
+    login(client, "employer", "rec")
+    assert client.get("/jobs/recommended").status_code == 403
+
+
+def test_index_generations_and_delta(tmp_path):
+    """Test a built generation is memory-mapped and new postings score from the delta"""
+    index = RecommenderIndex(directory=tmp_path, n_features=2 ** 12)
+    generation = index.write_generation([1, 2], [
+        ("Line cook", "Grill and prep", "full-time", "Austin, TX"),
+        ("Cashier", "Register and stocking", "part-time", "Denver, CO"),
+    ])
+    index.load(generation)
+    assert index.current_generation() == generation
+    base = index.snapshot.base
+    for array in (base.data, base.indices, base.indptr):
+        while not isinstance(array, np.memmap):
+            array = array.base
+
+    index.add_job(3, "Prep cook", "Grill line prep", "full-time", "Austin, TX")
+    columns, weights = index.profile([("Line cook", "Grill and prep", "full-time", "Austin, TX")])
+    ranked = [job_id for job_id, _ in index.score(columns, weights)]
+    assert ranked[:2] == [1, 3]
+    assert 2 not in ranked
+
+    # A rebuild replaces the generation and folds the delta into the base
+    index.write_generation([1, 2, 3], [("a", "b", None, None)] * 3)
+    assert index.current_generation() != generation
+    assert not (tmp_path / generation).exists()
+    assert len(recommender.tokens("The barista", "espresso", "gig", "Austin, TX")) == 6
+
+
+def test_app_import_leaves_numpy_and_scipy_unloaded():
+    """Test importing the app does not pull in numpy or scipy"""
+    import os
+    import subprocess
+    import sys
+
+    script = "import sys, main; print(sorted({'numpy', 'scipy'} & {name.split('.')[0] for name in sys.modules}))"
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True,
+        env={**os.environ, "SECRET_KEY": os.environ.get("SECRET_KEY", "test")},
+        cwd=os.path.dirname(recommender.__file__),
+    )
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_only_one_rebuild_holds_the_build_lock(tmp_path):
+    """Test the build lock is exclusive between open handles"""
+    with open(tmp_path / "build.lock", "w") as first, open(tmp_path / "build.lock", "w") as second:
+        assert recommender._try_lock(first)
+        assert not recommender._try_lock(second)
+
+
+def test_sync_picks_up_postings_committed_out_of_id_order(client, tmp_path):
+    """Test a posting whose lower id commits after a higher one still reaches the delta"""
+    (job_id,) = post_jobs(client, [{"title": "Anchor", "description": "Sets the employer", "job_type": "gig"}])
+    index = RecommenderIndex(directory=tmp_path, n_features=2 ** 12, rebuild_rows=10 ** 9)
+    index.load(index.write_generation([job_id], [("Anchor", "Sets the employer", "gig", None)]))
+
+    slow, fast = PrimarySessionLocal(), PrimarySessionLocal()
+    try:
+        employer_id = fast.get(Jobs, job_id).employer_id
+
+        def insert(session, title):
+            job = Jobs(employer_id=employer_id, title=title, description="Out of order", job_type="gig")
+            session.add(job)
+            session.flush()
+            return job.job_id
+
+        # The slow transaction takes its id first but commits last
+        slow_id = insert(slow, "Slow commit")
+        fast_id = insert(fast, "Fast commit")
+        fast.commit()
+        index.sync()
+        assert fast_id in index.pending
+        slow.commit()
+    finally:
+        slow.close()
+        fast.close()
+
+    index.sync()
+    assert slow_id in index.pending
+    assert list(index.snapshot.delta_ids).count(fast_id) == 1
@@ -0,0 +1,140 @@
+"""Applicant relevance scoring for employer review queues"""
+import io
+import zipfile
+import zlib
+import pytest
+
+pytestmark = pytest.mark.integration
+
+import config
+import relevance
+from database import PrimarySessionLocal
+from models import ApplicationScores
+from tests.conftest import login
+
+
+def docx(text):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", f"<w:document><w:body><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:body></w:document>")
+    return buffer.getvalue()
+
+
+def score(job_id):
+    db = PrimarySessionLocal()
+    try:
+        return relevance.score_job(db, job_id)
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def job_with_applicants(client, monkeypatch):
+    """A forklift job with a matching, a resume-matching and an unrelated applicant"""
+    queued = []
+    monkeypatch.setattr(config, "RELEVANCE_ENABLED", True)
+    monkeypatch.setattr(relevance.worker, "enqueue", lambda *job_ids: queued.extend(job_ids))
+    employer = login(client, "employer", "rel")
+    client.post("/employers", json={"company_name": "Relevance Co"})
+    job_id = client.post("/jobs/", json={
+        "title": "Forklift operator",
+        "description": "Operate forklifts and pallet jacks, load trailers and keep warehouse inventory accurate.",
+        "job_type": "full-time",
+    }).json()["job_id"]
+
+    applicants = {}
+    for name, letter, resume in [
+        ("match", "Certified forklift operator with years of warehouse inventory and trailer loading.", None),
+        ("resume", "Please see my resume.", "Forklift certification. Pallet jack and warehouse inventory experience."),
+        ("other", "I love baking bread and decorating cakes.", None),
+    ]:
+        login(client, "applicant", "rel")
+        if resume:
+            client.post("/profile/resume", files={"file": ("cv.docx", io.BytesIO(docx(resume)), "application/octet-stream")})
+        client.post(f"/jobs/{job_id}/apply", json={"cover_letter": letter})
+        applicants[name] = client.get("/profile/me").json()["user_id"]
+
+    client.cookies.clear()
+    client.cookies.update(employer)
+    return job_id, applicants, queued
+
+
+def test_relevance_sort_reads_precomputed_scores(client, job_with_applicants):
+    """Test applicants are ordered by score once the job has been scored"""
+    job_id, applicants, queued = job_with_applicants
+    assert queued.count(job_id) >= 3
+
+    # Not scored yet: date order, no scores, and the job is queued again
+    queued.clear()
+    unscored = client.get(f"/jobs/employer/applications/{job_id}?sort=relevance").json()
+    assert [app["relevance"] for app in unscored] == [None] * 3
+    assert queued == [job_id]
+
+    assert score(job_id) == 3
+    ranked = client.get(f"/jobs/employer/applications/{job_id}?sort=relevance").json()
+    order = [app["applicant_user_id"] for app in ranked]
+    assert order[-1] == applicants["other"]
+    assert set(order[:2]) == {applicants["match"], applicants["resume"]}
+    assert ranked[0]["relevance"] >= ranked[1]["relevance"] > ranked[2]["relevance"]
+
+    # Default order is unchanged
+    assert "relevance" not in client.get(f"/jobs/employer/applications/{job_id}").json()[0]
+
+
+def test_scores_are_per_job_version_and_resume(client, job_with_applicants):
+    """Test rescoring replaces old rows and records the resume version"""
+    job_id, applicants, _ = job_with_applicants
+    score(job_id)
+    score(job_id)
+    db = PrimarySessionLocal()
+    try:
+        rows = db.query(ApplicationScores).filter(ApplicationScores.job_id == job_id).all()
+    finally:
+        db.close()
+    assert len(rows) == 3
+    assert len({row.job_version for row in rows}) == 1
+    assert sum(row.resume_version is not None for row in rows) == 1
+
+
+def test_resume_upload_queues_rescoring(client, job_with_applicants, monkeypatch):
+    """Test changing a resume queues every job the applicant applied to"""
+    job_id, _, queued = job_with_applicants
+    login(client, "applicant", "rel")
+    other_job = client.get("/jobs/").json()[0]["job_id"]
+    client.post(f"/jobs/{other_job}/apply", json={"cover_letter": "Hi"})
+    queued.clear()
+    client.post("/profile/resume", files={"file": ("cv.docx", io.BytesIO(docx("Baker")), "application/octet-stream")})
+    assert queued == [other_job]
+    queued.clear()
+    client.delete("/profile/resume")
+    assert queued == [other_job]
+
+
+def test_resume_text_extraction(tmp_path):
+    """Test text comes out of .docx and simple .pdf resumes"""
+    path = tmp_path / "cv.docx"
+    path.write_bytes(docx("Forklift &amp; pallet jack"))
+    assert "Forklift & pallet jack" in relevance.resume_text(str(path))
+
+    pdf = tmp_path / "cv.pdf"
+    pdf.write_bytes(b"%PDF-1.4\n1 0 obj<<>>stream\nBT (Warehouse lead) Tj ET\nendstream\nendobj\n%%EOF")
+    assert "Warehouse lead" in relevance.resume_text(str(pdf))
+    assert relevance.resume_text(str(tmp_path / "missing.doc")) == ""
+
+
+def test_resume_bombs_are_read_bounded(tmp_path, monkeypatch):
+    """Test a highly compressed .docx or .pdf inflates no more than MAX_RESUME_BYTES"""
+    monkeypatch.setattr(config, "MAX_RESUME_BYTES", 64 * 1024)
+    path = tmp_path / "bomb.docx"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("word/document.xml", "<w:t>Forklift</w:t>" * 500_000)
+    text = relevance.resume_text(str(path))
+    assert "Forklift" in text
+    assert len(text) <= 64 * 1024
+
+    pdf = tmp_path / "bomb.pdf"
+    stream = zlib.compress(b"BT (Shift lead) Tj ET\n" * 500_000)
+    pdf.write_bytes(b"%PDF-1.4\n1 0 obj<<>>stream\n" + stream + b"\nendstream\nendobj\n%%EOF")
+    text = relevance.resume_text(str(pdf))
+    assert "Shift lead" in text
+    assert len(text) <= 64 * 1024
@@ -0,0 +1,64 @@
+"""Streaming ZIP download of a job's resumes"""
+import io
+import zipfile
+import pytest
+
+pytestmark = pytest.mark.integration
+
+import exports
+from tests.conftest import login
+
+
+def applicant(client, first_name):
+    login(client, "applicant", "zip")
+    client.put("/profile/me", json={"first_name": first_name, "last_name": "O'Neil"})
+
+
+def test_zip_contains_each_applicants_resume(client):
+    """Test every uploaded resume is in the archive, named by applicant"""
+    employer = login(client, "employer", "zip")
+    client.post("/employers", json={"company_name": "Zip Co"})
+    job_id = client.post("/jobs/", json={"title": "Mover", "description": "Lift boxes", "job_type": "gig"}).json()["job_id"]
+
+    contents = {}
+    for first_name, body in [("Ana", b"%PDF-1.4 ana"), ("Ben", b"%PDF-1.4 ben" * 50000), ("Cy", None)]:
+        applicant(client, first_name)
+        user_id = client.get("/profile/me").json()["user_id"]
+        if body:
+            client.post("/profile/resume", files={"file": ("cv.pdf", io.BytesIO(body), "application/pdf")})
+            contents[f"{first_name}_O_Neil_{user_id}.pdf"] = body
+        client.post(f"/jobs/{job_id}/apply", json={"cover_letter": "Hi"})
+
+    client.cookies.clear()
+    client.cookies.update(employer)
+    response = client.get(f"/jobs/employer/applications/{job_id}/resumes.zip")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert f'filename="job-{job_id}-resumes.zip"' in response.headers["content-disposition"]
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.testzip() is None
+    assert {name: archive.read(name) for name in archive.namelist()} == contents
+
+
+def test_zip_requires_job_ownership(client):
+    """Test other employers get 404 and applicants 403"""
+    login(client, "employer", "zip")
+    client.post("/employers", json={"company_name": "Zip Owner"})
+    job_id = client.post("/jobs/", json={"title": "Packer", "description": "Pack boxes", "job_type": "gig"}).json()["job_id"]
+    login(client, "employer", "zip")
+    client.post("/employers", json={"company_name": "Zip Other"})
+    assert client.get(f"/jobs/employer/applications/{job_id}/resumes.zip").status_code == 404
+    login(client, "applicant", "zip")
+    assert client.get(f"/jobs/employer/applications/{job_id}/resumes.zip").status_code == 403
+
+
+def test_zip_streams_in_bounded_chunks(tmp_path):
+    """Test no chunk is much larger than one read, and missing files are skipped"""
+    path = tmp_path / "big.pdf"
+    path.write_bytes(bytes(range(256)) * 4096 * 4)
+    chunks = list(exports.stream_zip([("a.pdf", str(path)), ("gone.pdf", str(tmp_path / "gone.pdf"))]))
+    assert len(chunks) > 2
+    assert max(len(chunk) for chunk in chunks) <= exports.ZIP_READ_BYTES * 2
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.namelist() == ["a.pdf"]
+    assert archive.read("a.pdf") == path.read_bytes()
@@ -0,0 +1,125 @@
+"""Server-side token revocation through the per-worker Bloom filter"""
+import time
+import pytest
+
+pytestmark = pytest.mark.integration
+
+from database import SessionLocal
+from revocation import BloomFilter, RevocationList, revocations, utcnow
+from routers.auth import COOKIE_NAME, REFRESH_COOKIE_NAME
+
+
+def cookie(client, name):
+    return next((c.value for c in client.cookies.jar if c.name == name), None)
+
+
+def register_and_login(client):
+    ts = int(time.time() * 1000000)
+    user = {"username": f"revoke{ts}", "email": f"revoke{ts}@test.com", "password": "Pass123!", "role": "applicant"}
+    client.post("/auth/register", json=user)
+    client.post("/auth/login", json={"email": user["email"], "password": user["password"]})
+    return user
+
+
+def use_access_token(client, token):
+    client.cookies.clear()
+    client.cookies.set(COOKIE_NAME, token)
+    return client.get("/jobs/")
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test every added key is found and unrelated keys rarely are"""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"jti-{i}")
+    assert all(f"jti-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_logout_revokes_access_token(client):
+    """Test a copied access token stops working after logout"""
+    register_and_login(client)
+    stolen = cookie(client, COOKIE_NAME)
+    assert client.post("/auth/logout").status_code == 200
+
+    response = use_access_token(client, stolen)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token revoked"
+
+
+def test_password_change_revokes_other_sessions_access_tokens(client):
+    """Test access tokens from another device die with the password change"""
+    user = register_and_login(client)
+    other_device = cookie(client, COOKIE_NAME)
+    client.post("/auth/login", json={"email": user["email"], "password": user["password"]})
+
+    client.put("/profile/change-password", json={"current_password": user["password"], "new_password": "NewPass123!"})
+    assert client.get("/jobs/").status_code == 200
+    assert use_access_token(client, other_device).status_code == 401
+
+
+def test_refresh_token_cannot_be_replayed(client):
+    """Test refresh rotation revokes the refresh token that was used"""
+    register_and_login(client)
+    used = cookie(client, REFRESH_COOKIE_NAME)
+    assert client.post("/auth/refresh").status_code == 200
+
+    client.cookies.clear()
+    client.cookies.set(REFRESH_COOKIE_NAME, used)
+    assert client.post("/auth/refresh").status_code == 401
+
+
+def test_other_workers_pick_up_revocations_on_sync():
+    """Test a second process-level list sees revocations after an incremental sync"""
+    other_worker = RevocationList()
+    other_worker.load()
+    key = f"test-jti-{time.time_ns()}"
+
+    db = SessionLocal()
+    try:
+        revocations.revoke(db, key, utcnow().replace(year=utcnow().year + 1))
+        db.commit()
+    finally:
+        db.close()
+
+    assert key in revocations.filter
+    assert key not in other_worker.filter
+    other_worker.sync()
+    assert key in other_worker.filter
+
+
+
+def test_sync_picks_up_revocations_committed_out_of_id_order():
+    """Test a revocation whose lower id commits after a higher one still reaches the filter"""
+    other_worker = RevocationList()
+    other_worker.load()
+    expires_at = utcnow().replace(year=utcnow().year + 1)
+    earlier, later = f"test-jti-a{time.time_ns()}", f"test-jti-b{time.time_ns()}"
+
+    slow, fast = SessionLocal(), SessionLocal()
+    try:
+        # The slow transaction takes its id first but commits last
+        revocations.revoke(slow, earlier, expires_at)
+        slow.flush()
+        revocations.revoke(fast, later, expires_at)
+        fast.commit()
+        other_worker.sync()
+        assert later in other_worker.filter
+        slow.commit()
+    finally:
+        slow.close()
+        fast.close()
+
+    other_worker.sync()
+    assert earlier in other_worker.filter
+
+def test_filter_hit_is_confirmed_against_database(client, monkeypatch):
+    """Test a Bloom false positive does not reject a valid token"""
+    class AlwaysMaybe:
+        def __contains__(self, item):
+            return True
+
+    register_and_login(client)
+    monkeypatch.setattr(revocations, "filter", AlwaysMaybe())
+    assert client.get("/jobs/").status_code == 200
@@ -0,0 +1,90 @@
+"""OpenTelemetry tracing tests"""
+import json
+import pytest
+
+pytestmark = pytest.mark.integration
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.sdk.trace.sampling import ALWAYS_ON
+import tracing
+
+
+@pytest.fixture
+def spans():
+    """Record spans in memory for the duration of a test"""
+    exporter = InMemorySpanExporter()
+    tracing.configure_tracing(exporter=exporter, sampler=ALWAYS_ON, batch=False)
+    yield exporter
+    tracing.disable_tracing()
+
+
+def register_and_login(client):
+    """Register and login an applicant"""
+    import time
+    ts = int(time.time() * 1000000)
+    user_data = {
+        "username": f"trace{ts}",
+        "email": f"trace{ts}@test.com",
+        "password": "Pass123!",
+        "role": "applicant"
+    }
+    client.post("/auth/register", json=user_data)
+    client.post("/auth/login", json={"email": user_data["email"], "password": user_data["password"]})
+
+
+def test_request_spans_nest_under_route_span(client, spans):
+    """Test auth, SQL and serialization spans are children of the request span"""
+    register_and_login(client)
+    spans.clear()
+
+    client.get("/jobs/")
+    finished = spans.get_finished_spans()
+    names = [s.name for s in finished]
+    root = next(s for s in finished if s.name == "GET /jobs/")
+
+    assert "auth.get_claims" in names
+    assert "db.query" in names
+    assert "response.serialize" in names
+    assert root.attributes["http.route"] == "/jobs/"
+    assert root.attributes["http.response.status_code"] == 200
+    assert all(s.context.trace_id == root.context.trace_id for s in finished)
+
+
+def test_login_traces_password_hashing(client, spans):
+    """Test password verification shows up in the login trace"""
+    register_and_login(client)
+    names = [s.name for s in spans.get_finished_spans()]
+    assert "security.hash_password" in names
+    assert "security.verify_password" in names
+
+
+def test_sql_spans_do_not_record_parameters(client, spans):
+    """Test bound parameter values never reach span attributes"""
+    client.get("/financial-literacy/credit")
+    sql_spans = [s for s in spans.get_finished_spans() if s.name == "db.query"]
+    assert sql_spans
+    assert all("credit" not in json.dumps(dict(s.attributes)) for s in sql_spans)
+
+
+def test_route_sampler_uses_longest_prefix():
+    """Test per-route head sampling ratios"""
+    sampler = tracing.RouteSampler(1.0, {"/jobs/": 0.0, "/jobs/employer": 1.0})
+    drop = sampler.should_sample(None, 2**64, "GET", attributes={"url.path": "/jobs/"})
+    keep = sampler.should_sample(None, 2**64, "GET", attributes={"url.path": "/jobs/employer/jobs"})
+    assert not drop.decision.is_sampled()
+    assert keep.decision.is_sampled()
+
+
+def test_file_exporter_writes_json_lines(tmp_path):
+    """Test the local file exporter"""
+    path = tmp_path / "traces.jsonl"
+    tracing.configure_tracing(exporter=tracing.JsonLinesFileExporter(str(path)), sampler=ALWAYS_ON, batch=False)
+    try:
+        with tracing.span("unit.test"):
+            pass
+    finally:
+        tracing.disable_tracing()
+    lines = path.read_text().splitlines()
+    assert json.loads(lines[0])["name"] == "unit.test"
@@ -0,0 +1,106 @@
+"""Unit tests for the response compression middleware"""
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+pytestmark = pytest.mark.unit
+
+from compression import CompressionMiddleware, choose_encoding, is_cacheable
+
+
+def make_client(**kwargs):
+    """Build a small app wrapped in the middleware"""
+    app = FastAPI()
+
+    @app.get("/big")
+    def big():
+        return Response("x" * 5000, media_type="application/json")
+
+    @app.get("/small")
+    def small():
+        return Response("{}", media_type="application/json")
+
+    @app.get("/cached")
+    def cached():
+        return Response("y" * 5000, media_type="application/json", headers={"Cache-Control": "public, max-age=60"})
+
+    @app.get("/revalidated")
+    def revalidated():
+        return Response("z" * 5000, media_type="application/json", headers={"Cache-Control": "private, no-cache", "ETag": '"v1"'})
+
+    middleware = CompressionMiddleware(app, **kwargs)
+    return TestClient(middleware), middleware
+
+
+def test_choose_encoding_respects_quality():
+    """Test Accept-Encoding negotiation"""
+    assert choose_encoding("gzip, br", brotli_available=True) == "br"
+    assert choose_encoding("gzip, br;q=0", brotli_available=True) == "gzip"
+    assert choose_encoding("br", brotli_available=False) is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("*", brotli_available=False) == "gzip"
+
+
+def test_is_cacheable():
+    """Test public or validated, storable responses are cached"""
+    assert is_cacheable("public, max-age=60")
+    assert not is_cacheable("private, max-age=60")
+    assert not is_cacheable("public, no-store")
+    assert is_cacheable("private, no-cache", has_validator=True)
+    assert is_cacheable("", has_validator=True)
+    assert not is_cacheable("private, no-store", has_validator=True)
+
+
+def test_large_response_is_gzipped():
+    """Test responses above the threshold are compressed"""
+    client, _ = make_client(minimum_size=1024)
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.text == "x" * 5000
+
+
+def test_small_response_is_not_compressed():
+    """Test responses below the threshold pass through"""
+    client, _ = make_client(minimum_size=1024)
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text == "{}"
+
+
+def test_identity_request_is_not_compressed():
+    """Test clients that do not accept compression get plain bodies"""
+    client, _ = make_client(minimum_size=10)
+    response = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+
+def test_brotli_when_available():
+    """Test Brotli is preferred when installed and accepted"""
+    pytest.importorskip("brotli")
+    client, _ = make_client(minimum_size=10)
+    response = client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert int(response.headers["content-length"]) < 5000
+
+
+def test_cacheable_response_is_compressed_once():
+    """Test public responses reuse cached compressed bytes"""
+    client, middleware = make_client(minimum_size=10)
+    first = client.get("/cached", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/cached", headers={"Accept-Encoding": "gzip"})
+    assert first.text == second.text == "y" * 5000
+    assert middleware.cache.misses == 1
+    assert middleware.cache.hits == 1
+    client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert middleware.cache.misses == 1
+
+
+def test_response_with_etag_is_compressed_once():
+    """Test private responses with a validator reuse cached compressed bytes"""
+    client, middleware = make_client(minimum_size=10)
+    for _ in range(2):
+        response = client.get("/revalidated", headers={"Accept-Encoding": "gzip"})
+        assert response.text == "z" * 5000
+        assert response.headers["etag"] == 'W/"v1"'
+    assert (middleware.cache.misses, middleware.cache.hits) == (1, 1)
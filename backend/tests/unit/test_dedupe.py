@@ -0,0 +1,43 @@
+"""MinHash signatures and the LSH index behind duplicate detection"""
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from dedupe import LSHIndex, NUM_PERM, shingles, signature, similarity
+
+DESCRIPTION = (
+    "Join our downtown cafe team pulling espresso shots, steaming milk and keeping the bar clean. "
+    "Morning and weekend shifts available with free drinks and flexible scheduling."
+)
+
+
+def test_signature_is_deterministic():
+    """Test the same text always gives the same signature"""
+    first = signature("Barista", DESCRIPTION)
+    assert first.shape == (NUM_PERM,)
+    assert (first == signature("Barista", DESCRIPTION)).all()
+
+
+def test_shingles_ignore_case_and_punctuation():
+    """Test shingling works on normalized words"""
+    assert shingles("Line Cook!", "grill, prep") == {"line cook grill", "cook grill prep"}
+    assert shingles("Cook", None) == {"cook"}
+
+
+def test_reposts_are_similar_and_different_jobs_are_not():
+    """Test small edits keep similarity high while unrelated postings score low"""
+    original = signature("Barista", DESCRIPTION)
+    repost = signature("Barista", DESCRIPTION + " Apply today.")
+    other = signature("Warehouse picker", "Pick and pack online orders on a fast paced warehouse floor, forklift a plus.")
+    assert similarity(original, repost) >= 0.8
+    assert similarity(original, other) < 0.2
+
+
+def test_index_matches_within_the_same_employer_only():
+    """Test LSH lookups find the repost for its employer and nobody else's"""
+    index = LSHIndex()
+    index.add(1, 10, signature("Barista", DESCRIPTION))
+    index.add(1, 11, signature("Dishwasher", "Wash dishes and keep the kitchen tidy during dinner service."))
+    repost = signature("Barista", "Now hiring! " + DESCRIPTION)
+    assert index.matches(1, repost) == [10]
+    assert index.matches(2, repost) == []
@@ -0,0 +1,33 @@
+"""Unit tests for the fast JSON list path"""
+import json
+import pytest
+from datetime import datetime
+
+pytestmark = pytest.mark.unit
+
+from fast_json import FastJSONResponse, dumps, rows_to_dicts
+import schemas_job
+
+
+def test_rows_to_dicts_zips_fields():
+    """Test projected tuples become dicts keyed by field name"""
+    rows = [(1, "a"), (2, "b")]
+    assert rows_to_dicts(rows, ["id", "name"]) == [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+
+
+def test_datetime_matches_pydantic_encoding():
+    """Test datetimes serialize the same way response_model validation would"""
+    posted = datetime(2025, 3, 4, 5, 6, 7, 890123)
+    card = schemas_job.JobCard(
+        job_id=1, employer_id=2, company_name="Co", title="T", description="D",
+        job_type="gig", location="Remote", pay_range=None, date_posted=posted, is_active=True
+    )
+    fast = json.loads(dumps(card.model_dump()))
+    assert fast == json.loads(card.model_dump_json())
+
+
+def test_fast_json_response_body():
+    """Test FastJSONResponse renders compact JSON with the JSON media type"""
+    response = FastJSONResponse([{"a": 1}])
+    assert response.body == b'[{"a":1}]'
+    assert response.media_type == "application/json"
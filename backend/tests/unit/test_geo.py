@@ -0,0 +1,53 @@
+"""Offline geocoding, geohashes and radius covers"""
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from geo import covering_cells, encode_geohash, geocode, haversine_miles
+
+
+def test_geocode_matches_city_state_aliases_and_addresses():
+    """Test free-text locations resolve against the gazetteer"""
+    assert geocode("Brooklyn, NY").name == "Brooklyn, NY"
+    assert geocode("boston").name == "Boston, MA"
+    assert geocode("SF").name == "San Francisco, CA"
+    assert geocode("123 Main St, San Francisco, CA 94105").name == "San Francisco, CA"
+    assert geocode("Portland, ME").name == "Portland, ME"
+    assert geocode("40.75, -73.99").latitude == 40.75
+
+
+def test_geocode_rejects_unknown_and_remote():
+    """Test unmatched text has no coordinates"""
+    assert geocode("Remote") is None
+    assert geocode("Test City") is None
+    assert geocode("") is None
+    assert geocode("95, 10") is None
+
+
+def test_geohash_known_value():
+    """Test encoding against a published reference point"""
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+def test_haversine_distance():
+    """Test New York to Los Angeles is about 2450 miles"""
+    nyc, la = geocode("New York, NY"), geocode("Los Angeles, CA")
+    assert 2400 < haversine_miles(nyc.latitude, nyc.longitude, la.latitude, la.longitude) < 2500
+
+
+@pytest.mark.parametrize("latitude,longitude,radius", [
+    (40.7128, -74.0060, 25),
+    (40.7128, -74.0060, 1),
+    (61.2181, -149.9003, 300),
+    (0.0, 179.9, 50),
+])
+def test_cover_contains_every_point_in_the_circle(latitude, longitude, radius):
+    """Test no point within the radius falls outside the covering cells"""
+    cells = covering_cells(latitude, longitude, radius)
+    assert 0 < len(cells) <= 16
+    for i in range(-20, 21):
+        for j in range(-20, 21):
+            lat = latitude + i * radius / 69.0 / 20
+            lon = ((longitude + j * radius / 20 / 30.0) + 180) % 360 - 180
+            if haversine_miles(latitude, longitude, lat, lon) <= radius:
+                assert any(encode_geohash(lat, lon).startswith(cell) for cell in cells)
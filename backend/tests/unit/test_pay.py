@@ -0,0 +1,37 @@
+"""Parsing free-text pay ranges into hourly-equivalent amounts"""
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from pay import parse_pay_range, to_hourly
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("$15.50/hr", (15.5, 15.5, "hourly")),
+    ("$16-$18/hr", (16.0, 18.0, "hourly")),
+    ("$15/hr + tips", (15.0, 15.0, "hourly")),
+    ("$12-$20/hr + per delivery bonus", (12.0, 20.0, "hourly")),
+    ("20 to 25 hourly", (20.0, 25.0, "hourly")),
+    ("$150/day", (18.75, 18.75, "hourly")),
+    ("$600 a week", (15.0, 15.0, "hourly")),
+    ("$52,000 - $62,400 per year", (25.0, 30.0, "annual")),
+    ("$60k-80k", (28.8462, 38.4615, "annual")),
+    ("$52k + 401k", (25.0, 25.0, "annual")),
+    ("$4,160/month", (24.0, 24.0, "annual")),
+])
+def test_parses_common_formats(text, expected):
+    """Test amounts become hourly equivalents and keep the quoted unit"""
+    parsed = parse_pay_range(text)
+    assert (parsed.pay_min, parsed.pay_max, parsed.pay_period) == expected
+
+
+@pytest.mark.parametrize("text", [None, "", "Competitive", "DOE", "$100 per shift", "$40/delivery"])
+def test_unparseable_pay_is_null(text):
+    """Test text without an hourly equivalent leaves the columns empty"""
+    assert parse_pay_range(text).columns() == {"pay_min": None, "pay_max": None, "pay_period": None}
+
+
+def test_filter_values_round_like_stored_values():
+    """Test an annual filter equal to a posted salary compares equal"""
+    assert to_hourly(50000, "annual") == parse_pay_range("$50,000/year").pay_min
+    assert to_hourly(18, "hourly") == 18
@@ -0,0 +1,45 @@
+"""Unit tests for the production server settings"""
+import os
+import types
+import pytest
+
+pytestmark = pytest.mark.unit
+
+import database
+import serve
+
+
+@pytest.mark.parametrize("workers,budget", [(1, 80), (5, 80), (9, 80), (40, 80), (3, 100)])
+def test_pool_settings_stay_within_connection_budget(workers, budget):
+    """Test all workers together never open more connections than the budget"""
+    pool = database.pool_settings(workers=workers, budget=budget)
+    assert pool["pool_size"] >= 1
+    per_worker = pool["pool_size"] + pool["max_overflow"]
+    assert workers * per_worker <= max(budget, 2 * workers)
+
+
+def test_gunicorn_options_preload_recycle_and_drain():
+    """Test the gunicorn master is configured from settings"""
+    config = types.SimpleNamespace(
+        HOST="127.0.0.1", PORT=9000, WEB_CONCURRENCY=3,
+        MAX_REQUESTS=500, MAX_REQUESTS_JITTER=50, GRACEFUL_TIMEOUT=20,
+    )
+    options = serve.gunicorn_options(config)
+    assert options["bind"] == "127.0.0.1:9000"
+    assert options["workers"] == 3
+    assert options["preload_app"] is True
+    assert options["max_requests"] == 500
+    assert options["max_requests_jitter"] == 50
+    assert options["graceful_timeout"] == 20
+    assert options["worker_class"].endswith("UvicornWorker")
+
+
+def test_cli_flags_override_environment(monkeypatch):
+    """Test flags are exported so every worker's config sees them"""
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.delenv("PORT", raising=False)
+    serve.apply_overrides(serve.parse_args(["--workers", "4", "--port", "8100"]))
+    assert os.environ["WEB_CONCURRENCY"] == "4"
+    assert os.environ["PORT"] == "8100"
+    monkeypatch.delenv("WEB_CONCURRENCY")
+    monkeypatch.delenv("PORT")
@@ -0,0 +1,154 @@
+"""OpenTelemetry tracing for requests, auth, password hashing, SQL and file I/O.
+
+Tracing is off unless ``TRACING_ENABLED=true`` and the OpenTelemetry SDK is
+installed; the app's lifespan handler then calls ``configure_tracing`` in each
+worker, and only then is the SDK (``tracing_sdk``) imported. Spans are
+exported with the exporter named by ``TRACE_EXPORTER``:
+    otlp  - OTLP/HTTP to OTEL_EXPORTER_OTLP_ENDPOINT (default)
+    file  - one JSON span per line appended to TRACE_FILE
+    console - printed to stdout
+
+Head sampling is decided once per trace at the root span. ``TRACE_SAMPLE_RATIO``
+sets the default ratio and ``TRACE_SAMPLE_ROUTES`` overrides it per path
+prefix, e.g. ``/jobs/=0.1,/auth/login=1.0`` (longest prefix wins). Incoming
+W3C ``traceparent`` headers are honoured so traces continue across services.
+"""
+import time
+from contextlib import nullcontext
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import TRACE_SAMPLE_RATIO, TRACE_SAMPLE_ROUTES
+
+# Set by configure_tracing(); None means tracing is off and span() is a no-op
+_tracer = None
+_provider = None
+# OpenTelemetry API modules once configured (imported lazily, like the SDK)
+_trace_api = None
+_propagate = None
+
+
+def __getattr__(name):
+    # Expose the SDK classes (RouteSampler, JsonLinesFileExporter) without importing them eagerly
+    if name in ("RouteSampler", "JsonLinesFileExporter"):
+        import tracing_sdk
+        return getattr(tracing_sdk, name)
+    raise AttributeError(f"module 'tracing' has no attribute {name!r}")
+
+
+def parse_route_ratios(spec: str) -> dict:
+    # "/jobs/=0.1,/auth/login=1" -> {"/jobs/": 0.1, "/auth/login": 1.0}
+    ratios = {}
+    for item in spec.split(","):
+        prefix, _, ratio = item.strip().partition("=")
+        if prefix and ratio:
+            ratios[prefix] = float(ratio)
+    return ratios
+
+
+def configure_tracing(exporter=None, sampler=None, batch: bool = True):
+    # Build a tracer provider for this process; returns False when the SDK is missing
+    global _tracer, _provider, _trace_api, _propagate
+    try:
+        import tracing_sdk
+        from opentelemetry import propagate, trace
+    except ImportError:
+        return False
+    if _provider is not None:
+        _provider.shutdown()
+    _trace_api, _propagate = trace, propagate
+    _provider = tracing_sdk.build_provider(
+        exporter, sampler, TRACE_SAMPLE_RATIO, parse_route_ratios(TRACE_SAMPLE_ROUTES), batch
+    )
+    _tracer = _provider.get_tracer("hustlehub")
+    return True
+
+
+def disable_tracing():
+    global _tracer, _provider
+    if _provider is not None:
+        _provider.shutdown()
+    _tracer = _provider = None
+
+
+def span(name: str, **attributes):
+    # Child span of the current request, or a no-op when tracing is off
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_sql_span(conn, cursor, statement, parameters, context, executemany):
+    if _tracer is None:
+        return
+    conn.info["trace_span"] = _tracer.start_span(
+        "db.query",
+        kind=_trace_api.SpanKind.CLIENT,
+        attributes={
+            "db.system": conn.dialect.name,
+            # Statement text only; bound parameters are never recorded
+            "db.statement": statement,
+        },
+    )
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_sql_span(conn, cursor, statement, parameters, context, executemany):
+    sql_span = conn.info.pop("trace_span", None)
+    if sql_span is not None:
+        sql_span.end()
+
+
+@event.listens_for(Engine, "handle_error")
+def _fail_sql_span(exception_context):
+    conn = exception_context.connection
+    sql_span = conn.info.pop("trace_span", None) if conn is not None else None
+    if sql_span is not None:
+        sql_span.set_status(_trace_api.Status(_trace_api.StatusCode.ERROR, str(exception_context.original_exception)))
+        sql_span.end()
+
+
+class TracingMiddleware:
+    # ASGI middleware opening the root server span for each request
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Imported here so security.py can use span() without pulling in the app
+        from metrics import route_template
+
+        carrier = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        parent = _propagate.extract(carrier)
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with _tracer.start_as_current_span(
+            f"{method} {scope['path']}",
+            context=parent,
+            kind=_trace_api.SpanKind.SERVER,
+            attributes={"http.request.method": method, "url.path": scope["path"]},
+        ) as root:
+            started = time.perf_counter()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = route_template(scope)
+                root.update_name(f"{method} {route}")
+                root.set_attribute("http.route", route)
+                root.set_attribute("http.response.status_code", status_code)
+                root.set_attribute("hustlehub.duration_ms", (time.perf_counter() - started) * 1000)
+                if status_code >= 500:
+                    root.set_status(_trace_api.Status(_trace_api.StatusCode.ERROR))
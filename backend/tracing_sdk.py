@@ -0,0 +1,73 @@
+"""OpenTelemetry SDK pieces used by ``tracing``.
+
+Kept separate so the SDK is only imported when tracing is switched on.
+"""
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SimpleSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, Sampler, TraceIdRatioBased
+
+from config import OTEL_SERVICE_NAME, TRACE_EXPORTER, TRACE_FILE
+
+
+class RouteSampler(Sampler):
+    # Root-span sampler choosing a trace-id ratio by request path prefix
+
+    def __init__(self, default_ratio: float = 1.0, route_ratios: dict | None = None):
+        self.default = TraceIdRatioBased(default_ratio)
+        self.routes = sorted(
+            ((prefix, TraceIdRatioBased(ratio)) for prefix, ratio in (route_ratios or {}).items()),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+
+    def should_sample(self, parent_context, trace_id, name, kind=None, attributes=None, links=None, trace_state=None):
+        path = (attributes or {}).get("url.path", "")
+        sampler = self.default
+        for prefix, candidate in self.routes:
+            if path.startswith(prefix):
+                sampler = candidate
+                break
+        return sampler.should_sample(parent_context, trace_id, name, kind, attributes, links, trace_state)
+
+    def get_description(self) -> str:
+        return "RouteSampler"
+
+
+class JsonLinesFileExporter(SpanExporter):
+    # Append finished spans to a local file, one JSON document per line
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans):
+        with open(self.path, "a", encoding="utf-8") as handle:
+            for finished in spans:
+                handle.write(finished.to_json(indent=None) + "\n")
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+
+def default_exporter():
+    if TRACE_EXPORTER == "file":
+        return JsonLinesFileExporter(TRACE_FILE)
+    if TRACE_EXPORTER == "console":
+        return ConsoleSpanExporter()
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    return OTLPSpanExporter()
+
+
+def build_provider(exporter, sampler, default_ratio: float, route_ratios: dict, batch: bool) -> TracerProvider:
+    sampler = sampler or ParentBased(RouteSampler(default_ratio, route_ratios))
+    provider = TracerProvider(sampler=sampler, resource=Resource.create({"service.name": OTEL_SERVICE_NAME}))
+    exporter = exporter or default_exporter()
+    provider.add_span_processor(BatchSpanProcessor(exporter) if batch else SimpleSpanProcessor(exporter))
+    return provider
@@ -0,0 +1,63 @@
+"""Monotonic version counters for conditional GETs.
+
+Writers bump a named counter in the same transaction as their change, and
+readers build an ETag from the counters instead of from the response body.
+That lets an unchanged job feed answer 304 Not Modified without running the
+jobs query at all. Counters live in the ``cache_versions`` table so every
+worker process sees the same values.
+"""
+from sqlalchemy.orm import Session
+
+from models import CacheVersions
+
+# Bumped whenever the set or content of visible job postings changes
+JOBS_CATALOG = "jobs:catalog"
+
+
+def applications_key(user_id: int) -> str:
+    # Per-user counter bumped when that user applies or withdraws
+    return f"applications:user:{user_id}"
+
+
+def _upsert(db: Session):
+    # Dialect-specific INSERT supporting ON CONFLICT (Postgres and SQLite)
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(CacheVersions)
+
+
+def bump(db: Session, *names: str) -> None:
+    # Increment counters atomically inside the caller's transaction
+    insert = _upsert(db)
+    for name in names:
+        stmt = insert.values(name=name, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CacheVersions.name],
+            set_={"version": CacheVersions.version + 1},
+        )
+        db.execute(stmt)
+
+
+def get_versions(db: Session, *names: str) -> dict:
+    # Current value of each counter; counters never bumped read as 0
+    rows = db.query(CacheVersions.name, CacheVersions.version).filter(CacheVersions.name.in_(names)).all()
+    found = dict(rows)
+    return {name: found.get(name, 0) for name in names}
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # Weak comparison per RFC 9110: W/ prefixes are ignored
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
@@ -0,0 +1,7 @@
+-- db/migrations/001_users_token_version.sql
+-- Per-user token version: bumping it invalidates every refresh token issued
+-- to that user (password change). New databases get the column from
+-- create_all at startup; run this once against existing ones:
+--   psql -d hustlehub -f db/migrations/001_users_token_version.sql
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
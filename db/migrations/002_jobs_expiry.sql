@@ -0,0 +1,16 @@
+-- db/migrations/002_jobs_expiry.sql
+-- Job expiry column plus partial indexes over live postings only. New
+-- databases get both from create_all at startup; run this once against
+-- existing ones (outside a transaction, CONCURRENTLY cannot run inside one):
+--   psql -d hustlehub -f db/migrations/002_jobs_expiry.sql
+
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP;
+
+-- Existing live postings expire JOB_TTL_DAYS (30 by default) after they were posted
+UPDATE jobs SET expires_at = date_posted + INTERVAL '30 days'
+WHERE expires_at IS NULL AND is_active;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_active_date_posted
+    ON jobs (date_posted DESC) WHERE is_active;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_active_expires_at
+    ON jobs (expires_at) WHERE is_active;
@@ -0,0 +1,24 @@
+-- db/migrations/003_jobs_geo.sql
+-- Geocoded coordinates for radius search (backend/geo.py). New databases get
+-- the columns and the geohash index from create_all at startup; run this once
+-- against existing ones (outside a transaction), then geocode existing rows:
+--   psql -d hustlehub -f db/migrations/003_jobs_geo.sql
+--   cd backend && python geo.py backfill
+
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS geohash VARCHAR(12) COLLATE "C";
+ALTER TABLE employers ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION;
+ALTER TABLE employers ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION;
+ALTER TABLE employers ADD COLUMN IF NOT EXISTS geohash VARCHAR(12) COLLATE "C";
+
+-- Fallback used when PostGIS is not installed: geohash prefix ranges
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_active_geohash
+    ON jobs (geohash) WHERE is_active;
+
+-- With PostGIS, radius queries use ST_DWithin on this GiST expression index
+-- instead. Uncomment where the extension is available:
+-- CREATE EXTENSION IF NOT EXISTS postgis;
+-- CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_active_geography
+--     ON jobs USING gist (geography(ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)))
+--     WHERE is_active;
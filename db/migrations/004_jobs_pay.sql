@@ -0,0 +1,14 @@
+-- db/migrations/004_jobs_pay.sql
+-- Structured pay parsed from pay_range (backend/pay.py). New databases get
+-- the columns and index from create_all at startup; run this once against
+-- existing ones (outside a transaction), then parse existing rows:
+--   psql -d hustlehub -f db/migrations/004_jobs_pay.sql
+--   cd backend && python pay.py backfill
+
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS pay_min NUMERIC(12, 4);
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS pay_max NUMERIC(12, 4);
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS pay_period VARCHAR(10)
+    CONSTRAINT jobs_pay_period_check CHECK (pay_period IN ('hourly', 'annual'));
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_jobs_active_pay
+    ON jobs (pay_max DESC NULLS LAST, pay_min) WHERE is_active;
@@ -0,0 +1,16 @@
+-- db/migrations/005_jobs_dedupe.sql
+-- Near-duplicate posting detection (backend/dedupe.py). New databases get
+-- the column and table from create_all at startup; run this once against
+-- existing ones, then sign and deduplicate the existing catalog:
+--   psql -d hustlehub -f db/migrations/005_jobs_dedupe.sql
+--   cd backend && python dedupe.py scan
+
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS duplicate_of INT REFERENCES jobs(job_id) ON DELETE SET NULL;
+
+CREATE TABLE IF NOT EXISTS job_signatures (
+    job_id INT PRIMARY KEY REFERENCES jobs(job_id) ON DELETE CASCADE,
+    employer_id INT NOT NULL REFERENCES employers(employer_id) ON DELETE CASCADE,
+    signature BYTEA NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_signatures_employer ON job_signatures (employer_id, job_id);
@@ -0,0 +1,17 @@
+-- db/migrations/006_application_scores.sql
+-- Precomputed applicant relevance for ?sort=relevance (backend/relevance.py).
+-- New databases get the table from create_all at startup; existing ones need
+-- this once. Scores fill in by themselves as the workers sweep.
+--   psql -d hustlehub -f db/migrations/006_application_scores.sql
+
+CREATE TABLE IF NOT EXISTS application_scores (
+    application_id INT NOT NULL,
+    job_version VARCHAR(16) NOT NULL,
+    job_id INT NOT NULL REFERENCES jobs(job_id) ON DELETE CASCADE,
+    resume_version VARCHAR(40),
+    score DOUBLE PRECISION NOT NULL,
+    computed_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (application_id, job_version)
+);
+
+CREATE INDEX IF NOT EXISTS idx_application_scores_job ON application_scores (job_id);
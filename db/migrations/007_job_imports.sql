@@ -0,0 +1,21 @@
+-- db/migrations/007_job_imports.sql
+-- Bulk job imports (POST /jobs/import, backend/job_import.py).
+-- New databases get the table from create_all at startup; existing ones need
+-- this once.
+--   psql -d hustlehub -f db/migrations/007_job_imports.sql
+
+CREATE TABLE IF NOT EXISTS job_imports (
+    import_id SERIAL PRIMARY KEY,
+    employer_id INT NOT NULL REFERENCES employers(employer_id) ON DELETE CASCADE,
+    filename VARCHAR(255),
+    status VARCHAR(20) NOT NULL DEFAULT 'pending'
+        CONSTRAINT job_imports_status_check CHECK (status IN ('pending', 'running', 'completed', 'failed')),
+    total_rows INT NOT NULL DEFAULT 0,
+    imported_rows INT NOT NULL DEFAULT 0,
+    failed_rows INT NOT NULL DEFAULT 0,
+    errors TEXT NOT NULL DEFAULT '[]',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_imports_employer ON job_imports (employer_id);
@@ -7,7 +7,9 @@ CREATE TABLE users (
     role VARCHAR(20)
         CHECK (role IN ('applicant', 'employer', 'admin'))
         DEFAULT 'applicant',
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Bumped to invalidate every refresh token issued to the user
+    token_version INT NOT NULL DEFAULT 0
 );
 
 -- Employers
@@ -17,7 +19,10 @@ CREATE TABLE employers (
     company_name VARCHAR(150) NOT NULL,
     description TEXT,
     website VARCHAR(200),
-    location VARCHAR(100)
+    location VARCHAR(100),
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
+    geohash VARCHAR(12) COLLATE "C"
 );
 
 -- Jobs
@@ -30,8 +35,38 @@ CREATE TABLE jobs (
         CHECK (job_type IN ('full-time', 'part-time', 'gig', 'temporary', 'internship')),
     location VARCHAR(100),
     pay_range VARCHAR(50),
+    pay_min NUMERIC(12, 4),
+    pay_max NUMERIC(12, 4),
+    pay_period VARCHAR(10) CHECK (pay_period IN ('hourly', 'annual')),
     date_posted TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    is_active BOOLEAN DEFAULT TRUE
+    is_active BOOLEAN DEFAULT TRUE,
+    expires_at TIMESTAMP,
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
+    geohash VARCHAR(12) COLLATE "C",
+    duplicate_of INT REFERENCES jobs(job_id) ON DELETE SET NULL
+);
+
+-- MinHash signatures for near-duplicate detection (backend/dedupe.py)
+CREATE TABLE job_signatures (
+    job_id INT PRIMARY KEY REFERENCES jobs(job_id) ON DELETE CASCADE,
+    employer_id INT NOT NULL REFERENCES employers(employer_id) ON DELETE CASCADE,
+    signature BYTEA NOT NULL
+);
+
+-- Bulk job imports and their progress (backend/job_import.py)
+CREATE TABLE job_imports (
+    import_id SERIAL PRIMARY KEY,
+    employer_id INT NOT NULL REFERENCES employers(employer_id) ON DELETE CASCADE,
+    filename VARCHAR(255),
+    status VARCHAR(20) NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'running', 'completed', 'failed')),
+    total_rows INT NOT NULL DEFAULT 0,
+    imported_rows INT NOT NULL DEFAULT 0,
+    failed_rows INT NOT NULL DEFAULT 0,
+    errors TEXT NOT NULL DEFAULT '[]',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP
 );
 
 -- Applications
@@ -47,6 +82,17 @@ CREATE TABLE applications (
     UNIQUE (job_id, user_id)
 );
 
+-- Applicant relevance per job version (backend/relevance.py)
+CREATE TABLE application_scores (
+    application_id INT NOT NULL,
+    job_version VARCHAR(16) NOT NULL,
+    job_id INT NOT NULL REFERENCES jobs(job_id) ON DELETE CASCADE,
+    resume_version VARCHAR(40),
+    score DOUBLE PRECISION NOT NULL,
+    computed_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (application_id, job_version)
+);
+
 -- Notifications
 CREATE TABLE notifications (
     notification_id SERIAL PRIMARY KEY,
@@ -56,6 +102,24 @@ CREATE TABLE notifications (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Archived applications and notifications (backend/archival.py)
+CREATE TABLE applications_archive (
+    application_id INT PRIMARY KEY,
+    job_id INT NOT NULL REFERENCES jobs(job_id) ON DELETE CASCADE,
+    user_id INT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    cover_letter TEXT,
+    status VARCHAR(20),
+    date_applied TIMESTAMP
+);
+
+CREATE TABLE notifications_archive (
+    notification_id INT PRIMARY KEY,
+    user_id INT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    message TEXT NOT NULL,
+    is_read BOOLEAN,
+    created_at TIMESTAMP
+);
+
 -- Financial Resources
 CREATE TABLE financial_resources (
     resource_id SERIAL PRIMARY KEY,
@@ -65,9 +129,35 @@ CREATE TABLE financial_resources (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Version counters behind feed ETags (backend/versions.py)
+CREATE TABLE cache_versions (
+    name VARCHAR(100) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+-- Revoked token ids and user versions (backend/revocation.py)
+CREATE TABLE revoked_tokens (
+    revoked_id BIGSERIAL PRIMARY KEY,
+    jti VARCHAR(64) UNIQUE NOT NULL,
+    expires_at TIMESTAMP NOT NULL,
+    revoked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- 3. Indexes
 CREATE INDEX idx_jobs_location     ON jobs(location);
 CREATE INDEX idx_jobs_type         ON jobs(job_type);
+CREATE INDEX idx_jobs_active_date_posted ON jobs(date_posted DESC) WHERE is_active;
+CREATE INDEX idx_jobs_active_expires_at  ON jobs(expires_at) WHERE is_active;
+CREATE INDEX idx_jobs_active_geohash     ON jobs(geohash) WHERE is_active;
+CREATE INDEX idx_jobs_active_pay         ON jobs(pay_max DESC NULLS LAST, pay_min) WHERE is_active;
+CREATE INDEX idx_job_signatures_employer ON job_signatures(employer_id, job_id);
+CREATE INDEX idx_job_imports_employer ON job_imports(employer_id);
+CREATE INDEX idx_application_scores_job ON application_scores(job_id);
 CREATE INDEX idx_applications_user ON applications(user_id);
 CREATE INDEX idx_notifications_user ON notifications(user_id);
+CREATE INDEX idx_applications_archive_user ON applications_archive(user_id);
+CREATE INDEX idx_applications_archive_job  ON applications_archive(job_id);
+CREATE INDEX idx_notifications_archive_user ON notifications_archive(user_id);
+CREATE INDEX idx_revoked_tokens_expires_at ON revoked_tokens(expires_at);
+CREATE INDEX idx_revoked_tokens_revoked_at ON revoked_tokens(revoked_at);
 
@@ -0,0 +1,32 @@
+import { HttpBackend, HttpClient, HttpErrorResponse, HttpInterceptorFn, HttpRequest } from '@angular/common/http';
+import { inject } from '@angular/core';
+import { Observable, catchError, finalize, shareReplay, switchMap, throwError } from 'rxjs';
+import { environment } from '../../environments/environment';
+
+// Access tokens are short-lived; on a 401 trade the refresh cookie for new
+// cookies once and replay the request. Concurrent 401s share one refresh call.
+let refreshInFlight: Observable<unknown> | null = null;
+
+const isAuthCall = (req: HttpRequest<unknown>) =>
+  ['/auth/login', '/auth/register', '/auth/refresh', '/auth/logout'].some(path => req.url.endsWith(path));
+
+export const refreshInterceptor: HttpInterceptorFn = (req, next) => {
+  // HttpBackend bypasses interceptors so the refresh call cannot loop
+  const http = new HttpClient(inject(HttpBackend));
+
+  return next(req).pipe(
+    catchError((error: HttpErrorResponse) => {
+      if (error.status !== 401 || isAuthCall(req)) {
+        return throwError(() => error);
+      }
+      refreshInFlight ??= http.post(`${environment.apiUrl}/auth/refresh`, {}, { withCredentials: true }).pipe(
+        finalize(() => (refreshInFlight = null)),
+        shareReplay(1)
+      );
+      return refreshInFlight.pipe(
+        switchMap(() => next(req)),
+        catchError(() => throwError(() => error))
+      );
+    })
+  );
+};